@@ -1,12 +1,114 @@
-from django.contrib import admin
-from .models import Event, Venue, Category  # adjust to match your models
+import string
+
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.views.main import ChangeList
+from django.db import connections
+from django.db.models import Q
+from django.db.models.functions import Upper
+from django.template.response import TemplateResponse
+from .bulk import chunked_delete, run_in_chunks
+from .models import Event, EventPost, Task, Venue, Category  # adjust to match your models
+from .paginators import EstimatedCountPaginator
+
+
+ASCII_UPPER = str.maketrans(string.ascii_lowercase, string.ascii_uppercase)
+
+
+def upper(value, vendor):
+    """``value`` upper-cased the way the database's ``UPPER()`` does it
+
+    SQLite's ``UPPER()`` only changes ASCII letters, so there other letters
+    are left as typed and only match titles with the same case.
+    """
+    if vendor == 'sqlite':
+        return value.translate(ASCII_UPPER)
+    return value.upper()
+
+
+def prefix_range(prefix):
+    """Bounds ``(low, high)`` such that ``low <= s < high`` for strings starting with ``prefix``"""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class EstimatedCountChangeList(ChangeList):
+    """Changelist whose result count follows its paginator
+
+    The count is read before the page, which may replace an estimate with
+    an exact count when the page is past the estimated ones.
+    """
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.result_count = self.paginator.count
+
 
 # Register your models here.
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
+    """Changelist tuned for large event tables
+
+    Venues and categories are joined rather than fetched per row, picked
+    with autocomplete widgets rather than full dropdowns, and row counts are
+    estimated. Search is a title prefix (or an event ID) so it can use
+    ``event_title_upper_idx`` instead of scanning descriptions.
+    """
     list_display = ('title', 'venue', 'start_date', 'end_date')
-    list_filter = ('venue', 'category')
-    search_fields = ('title', 'description')
+    list_filter = ('category', ('duplicate_of', admin.EmptyFieldListFilter))
+    list_select_related = ('venue',)
+    autocomplete_fields = ('venue', 'category', 'duplicate_of')
+    date_hierarchy = 'start_date'
+    search_fields = ('title',)
+    search_help_text = 'Start of the event title, or an event ID'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['delete_in_chunks', 'clear_category']
+
+    def get_changelist(self, request, **kwargs):
+        return EstimatedCountChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+
+        vendor = connections[queryset.db].vendor
+        low, high = prefix_range(upper(search_term, vendor))
+        matches = Q(title_upper__gte=low, title_upper__lt=high)
+        if search_term.isdigit():
+            matches |= Q(pk=int(search_term))
+        return queryset.alias(title_upper=Upper('title')).filter(matches), False
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Collects every related object up front to build its confirmation page
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(permissions=['delete'], description='Delete selected events in batches')
+    def delete_in_chunks(self, request, queryset):
+        if not request.POST.get('post'):
+            context = {
+                **self.admin_site.each_context(request),
+                'title': 'Are you sure?',
+                'opts': self.model._meta,
+                'count': queryset.count(),
+                'queryset': queryset[:20],
+                'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+                'select_across': request.POST.get('select_across'),
+                'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            }
+            return TemplateResponse(
+                request, 'admin/eventlist/event/delete_in_chunks_confirmation.html', context
+            )
+
+        deleted = chunked_delete(queryset)[self.model._meta.label]
+        self.message_user(request, f'Deleted {deleted} events.', messages.SUCCESS)
+
+    @admin.action(permissions=['change'], description='Remove category from selected events')
+    def clear_category(self, request, queryset):
+        updated = run_in_chunks(queryset, lambda chunk: chunk.update(category=None))
+        self.message_user(request, f'Updated {updated} events.', messages.SUCCESS)
 
 @admin.register(Venue)
 class VenueAdmin(admin.ModelAdmin):
@@ -15,4 +117,19 @@ class VenueAdmin(admin.ModelAdmin):
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ('name',)
\ No newline at end of file
+    list_display = ('name',)
+    # Needed by the event autocomplete widget
+    search_fields = ('name',)
+
+@admin.register(EventPost)
+class EventPostAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'created_at')
+    # __str__ reads the event title; join it instead of a query per post
+    list_select_related = ('event',)
+    raw_id_fields = ('event',)
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_after', 'created_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('dedupe_key', 'claimed_by', 'locked_at', 'last_error', 'created_at')
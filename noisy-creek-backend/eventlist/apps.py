@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class EventlistConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'eventlist'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import signals  # noqa: F401
+        from .taskqueue import start_worker_threads
+
+        if settings.EVENT_TASK_WORKER_THREADS:
+            start_worker_threads(settings.EVENT_TASK_WORKER_THREADS)
@@ -0,0 +1,123 @@
+"""Hot/cold split of the event table
+
+Events that started before the retention horizon are moved from ``Event``
+into ``ArchivedEvent`` in small transactions, so the hot table and its
+indexes only hold recent and upcoming events. The list API reads the archive
+only when a requested date range reaches into it.
+"""
+from heapq import merge
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .changes import unrecorded
+from .models import ArchivedEvent, Event, EventPost
+
+# Event.clean rejects start dates more than 30 days in the past, so anything
+# older than this can no longer be created or moved back into the hot table.
+MIN_RETENTION_DAYS = 30
+
+
+def archivable_events(horizon):
+    """Hot events that started before ``horizon`` and have no posts
+
+    Events with posts stay in the hot table so their feed keeps working.
+    """
+    has_posts = Exists(EventPost.objects.filter(event=OuterRef('pk')))
+    return Event.objects.filter(start_date__lt=horizon).filter(~has_posts)
+
+
+def archive_events(retention_days, chunk_size=500, dry_run=False):
+    """Move events older than ``retention_days`` into the archive
+
+    Each chunk is copied and deleted in its own transaction. Returns the number
+    of events moved (or that would be moved, for a dry run).
+    """
+    if retention_days < MIN_RETENTION_DAYS:
+        raise ValueError(f'Retention must be at least {MIN_RETENTION_DAYS} days')
+
+    horizon = timezone.now() - timezone.timedelta(days=retention_days)
+    if dry_run:
+        return archivable_events(horizon).count()
+
+    moved = 0
+    while True:
+        with transaction.atomic():
+            events = list(archivable_events(horizon).order_by('start_date')[:chunk_size])
+            if not events:
+                break
+            ArchivedEvent.objects.bulk_create(
+                [ArchivedEvent.from_event(event) for event in events]
+            )
+            # Still served from the archive, so mirrors must not drop them;
+            # cache and calendar receivers still run
+            with unrecorded():
+                Event.objects.filter(pk__in=[event.pk for event in events]).delete()
+        moved += len(events)
+    return moved
+
+
+def reaches_archive(start_date, end_date=None):
+    """Whether a list from ``start_date`` to ``end_date`` includes archived
+    events; None leaves that end of the range open"""
+    archived = ArchivedEvent.objects.all()
+    if start_date is not None:
+        archived = archived.filter(start_date__gte=start_date)
+    if end_date is not None:
+        archived = archived.filter(start_date__lte=end_date)
+    return archived.exists()
+
+
+class MergedQuerySet:
+    """Read-only merge of event querysets, newest first
+
+    Each part is ordered by ``(-start_date, -pk)``, so events starting at the
+    same time keep one order and every page cuts the parts the same way.
+    Supports what pagination needs (``count()`` and slicing). A slice first
+    merges the ``(start_date, pk)`` keys of each part up to the slice end, then
+    loads just the rows on the page. Events with posts are never archived, so
+    hot and archived start dates can interleave and a plain chain would be
+    out of order.
+    """
+    ordered = True
+
+    def __init__(self, *querysets):
+        self.querysets = [queryset.order_by('-start_date', '-pk') for queryset in querysets]
+        self._count = None
+
+    @property
+    def model(self):
+        return self.querysets[0].model
+
+    def count(self):
+        if self._count is None:
+            self._count = sum(queryset.count() for queryset in self.querysets)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.step is not None:
+            raise TypeError('MergedQuerySet only supports slices without a step')
+        start = key.start or 0
+        stop = self.count() if key.stop is None else key.stop
+        if stop <= start:
+            return []
+
+        keys = [
+            [(start_date, pk, index) for start_date, pk in queryset.values_list('start_date', 'pk')[:stop]]
+            for index, queryset in enumerate(self.querysets)
+        ]
+        page = list(merge(*keys, reverse=True))[start:stop]
+
+        rows = {}
+        for index, queryset in enumerate(self.querysets):
+            pks = [pk for _, pk, part in page if part == index]
+            if pks:
+                rows.update(((index, row.pk), row) for row in queryset.filter(pk__in=pks))
+        return [rows[(index, pk)] for _, pk, index in page]
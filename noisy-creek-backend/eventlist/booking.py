@@ -0,0 +1,145 @@
+"""Venue double-booking detection
+
+Events at the same venue conflict when their times overlap, unless the venue
+has a ``capacity`` and the events running at once all have an
+``expected_attendance`` that fits in it together. Events that only touch
+(one ends when the next starts) don't overlap.
+
+Checking is opt-in with ``EVENT_PREVENT_DOUBLE_BOOKING``:
+
+* a single save reads just the events overlapping it, using the
+  ``(venue, end_date)`` index;
+* a bulk import sorts the batch and the existing events around it once per
+  venue and sweeps through them, O(n log n) per venue instead of one
+  query per event;
+* ``manage.py report_venue_conflicts`` sweeps the whole catalog.
+"""
+from collections import namedtuple
+from itertools import groupby
+
+# ``event`` is the event whose start pushed the venue over; ``overlapping``
+# are the events already running then, and ``load`` their combined attendance
+# (None when any of them has no expected attendance)
+Conflict = namedtuple('Conflict', ['venue', 'event', 'overlapping', 'load'])
+
+
+def fits(load, attendance, capacity):
+    """Whether an event with ``attendance`` can join events totalling ``load``"""
+    if capacity is None or load is None or attendance is None:
+        return False
+    return load + attendance <= capacity
+
+
+def sweep(venue, events):
+    """Conflicts among ``events``, all at ``venue``, in O(n log n)
+
+    Ends sort before starts at the same instant so back-to-back events don't
+    count as overlapping.
+    """
+    points = []
+    for index, event in enumerate(events):
+        points.append((event.start_date, 1, index))
+        points.append((event.end_date, 0, index))
+    points.sort(key=lambda point: (point[0], point[1]))
+
+    conflicts = []
+    active = {}
+    load = 0  # None once an active event has no expected attendance
+    unknown = 0
+    for _, is_start, index in points:
+        event = events[index]
+        attendance = event.expected_attendance
+        if not is_start:
+            del active[index]
+            if attendance is None:
+                unknown -= 1
+            else:
+                load -= attendance
+            continue
+
+        current = None if unknown else load
+        if active and not fits(current, attendance, venue.capacity):
+            conflicts.append(Conflict(venue, event, list(active.values()), current))
+        active[index] = event
+        if attendance is None:
+            unknown += 1
+        else:
+            load += attendance
+    return conflicts
+
+
+def overlapping(queryset, start, end):
+    """Events in ``queryset`` that overlap ``[start, end)``
+
+    ``end_date > start`` is the indexed bound; it keeps past events at the
+    venue out of the scan.
+    """
+    return queryset.filter(end_date__gt=start, start_date__lt=end)
+
+
+def find_conflicts(event):
+    """Conflicts a saved ``event`` would cause at its venue"""
+    from .models import Event
+
+    others = overlapping(
+        Event.objects.filter(venue_id=event.venue_id).exclude(pk=event.pk),
+        event.start_date,
+        event.end_date,
+    )
+    others = list(others.only('title', 'start_date', 'end_date', 'expected_attendance', 'venue_id'))
+    if not others:
+        return []
+    conflicts = sweep(event.venue, [event] + others)
+    return [
+        conflict for conflict in conflicts
+        if conflict.event is event or event in conflict.overlapping
+    ]
+
+
+def find_batch_conflicts(events):
+    """Conflicts a batch of new ``events`` would cause, with each other or
+    with saved events, reading the saved ones with one query per venue"""
+    from .models import Event, Venue
+
+    conflicts = []
+    by_venue = sorted(events, key=lambda event: event.venue_id)
+    venues = Venue.objects.in_bulk({event.venue_id for event in events})
+    for venue_id, group in groupby(by_venue, key=lambda event: event.venue_id):
+        group = list(group)
+        start = min(event.start_date for event in group)
+        end = max(event.end_date for event in group)
+        saved = overlapping(Event.objects.filter(venue_id=venue_id), start, end)
+        saved = saved.exclude(pk__in=[event.pk for event in group if event.pk is not None])
+        batch = set(map(id, group))
+        conflicts += [
+            conflict for conflict in sweep(venues[venue_id], group + list(saved))
+            if id(conflict.event) in batch or any(id(other) in batch for other in conflict.overlapping)
+        ]
+    return conflicts
+
+
+def all_conflicts(queryset):
+    """Every conflict among the events in ``queryset``, venue by venue
+
+    Streams events ordered by venue so only one venue is held in memory.
+    """
+    from .models import Venue
+
+    events = queryset.order_by('venue_id', 'start_date').only(
+        'title', 'start_date', 'end_date', 'expected_attendance', 'venue_id'
+    )
+    for venue_id, group in groupby(events.iterator(), key=lambda event: event.venue_id):
+        group = list(group)
+        if len(group) > 1:
+            venue = Venue.objects.get(pk=venue_id)
+            yield from sweep(venue, group)
+
+
+def label(event):
+    return f'"{event.title}"' + (f' (#{event.pk})' if event.pk is not None else '')
+
+
+def describe(conflict):
+    """One-line description of a conflict"""
+    others = ', '.join(map(label, conflict.overlapping))
+    return f'{label(conflict.event)} overlaps {others} at {conflict.venue.name}'
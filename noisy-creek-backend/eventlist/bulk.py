@@ -0,0 +1,352 @@
+"""Helpers for changing many rows without one huge transaction
+
+Work is split into primary key ranges so each chunk holds its locks briefly
+and a failure part way through leaves the finished chunks committed.
+"""
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, models, transaction
+from django.db.models.deletion import get_candidate_relations_to_delete
+from django.db.models.signals import post_delete, pre_delete
+from django.utils import timezone
+
+from .models import ChangeTrackingQuerySet, Event, local_date_fields, post_bulk_change
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def pk_chunks(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield lists of primary keys from ``queryset`` in ascending order
+
+    Uses keyset pagination (``pk > last``) so later chunks don't get slower
+    the way ``OFFSET`` does, and rows removed by an earlier chunk don't shift
+    the ones after them.
+    """
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        pks = list(page[:chunk_size])
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+def run_in_chunks(queryset, operation, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Call ``operation`` on each chunk of ``queryset`` in its own transaction
+
+    ``operation`` receives a queryset of the chunk's rows and returns the
+    number of rows it changed. Returns the total.
+    """
+    model = queryset.model
+    total = 0
+    for pks in pk_chunks(queryset, chunk_size):
+        with transaction.atomic():
+            total += operation(model._default_manager.filter(pk__in=pks))
+    return total
+
+
+def chunked_delete(queryset, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Delete ``queryset`` and everything that cascades from it, a chunk at a time
+
+    Unlike ``QuerySet.delete()``, which collects every related row into
+    memory first, this walks the cascade depth first: for each chunk of
+    rows, their children are deleted in chunks of their own, then the chunk
+    itself. Memory stays bounded by ``chunk_size`` however large the tables.
+
+    Rows are deleted with raw ``DELETE``s. Models with a change tracking
+    manager get one ``post_bulk_change`` per chunk instead of a
+    ``post_delete`` per row; other models with delete receivers are deleted
+    through the ORM a chunk at a time so their receivers still run.
+
+    ``progress`` is called with the model label and its running count after
+    each chunk. Returns ``{label: deleted}``.
+    """
+    model = queryset.model
+    relations = list(get_candidate_relations_to_delete(model._meta))
+    deleted = Counter()
+    for pks in pk_chunks(queryset, chunk_size):
+        for relation in relations:
+            related = relation.related_model._base_manager.filter(
+                **{f'{relation.field.name}__in': pks}
+            )
+            if relation.on_delete is models.CASCADE:
+                deleted.update(chunked_delete(related, chunk_size, progress))
+            elif relation.on_delete is models.SET_NULL:
+                cleared = {relation.field.name: None}
+                run_in_chunks(related, lambda chunk: chunk.update(**cleared), chunk_size)
+            elif relation.on_delete is not models.DO_NOTHING:
+                raise ValueError(
+                    f'{relation.field} has on_delete={relation.on_delete.__name__}, '
+                    'which chunked_delete does not support'
+                )
+
+        with transaction.atomic():
+            delete_rows(model, pks)
+        label = model._meta.label
+        deleted[label] += len(pks)
+        if progress is not None:
+            progress(label, deleted[label])
+    return deleted
+
+
+def delete_rows(model, pks):
+    """Delete rows whose related rows are already gone"""
+    rows = model._base_manager.filter(pk__in=pks)
+    if isinstance(model._default_manager.all(), ChangeTrackingQuerySet):
+        rows._raw_delete(rows.db)
+        post_bulk_change.send(sender=model, pks=pks, action='delete')
+    elif pre_delete.has_listeners(model) or post_delete.has_listeners(model):
+        rows.delete()
+    else:
+        rows._raw_delete(rows.db)
+
+
+def refresh_local_dates(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Recompute ``local_date``/``local_weekday`` of ``queryset`` from
+    ``start_date``, a chunk at a time; returns the number of rows changed
+
+    Writes through the base manager, so no change signals are sent: the
+    columns are derived, nothing anyone sees has changed.
+    """
+    model = queryset.model
+    changed = 0
+    for pks in pk_chunks(queryset, chunk_size):
+        rows = model._base_manager.filter(pk__in=pks).only('start_date', 'local_date', 'local_weekday')
+        stale = []
+        for row in rows:
+            fields = local_date_fields(row.start_date)
+            if any(getattr(row, name) != value for name, value in fields.items()):
+                for name, value in fields.items():
+                    setattr(row, name, value)
+                stale.append(row)
+        with transaction.atomic():
+            model._base_manager.bulk_update(stale, ['local_date', 'local_weekday'])
+        changed += len(stale)
+    return changed
+
+
+# Fields a bulk create or update may set; foreign keys take primary keys
+EVENT_WRITE_FIELDS = [
+    'title', 'description', 'start_date', 'end_date', 'category', 'venue', 'expected_attendance',
+]
+EVENT_FOREIGN_KEYS = ['category', 'venue']
+
+
+def apply_event_operations(create=(), update=(), delete=(), chunk_size=DEFAULT_CHUNK_SIZE):
+    """Create, update and delete events in chunks, each in its own transaction
+
+    ``create`` holds dicts of ``EVENT_WRITE_FIELDS``, ``update`` the same with
+    an ``id`` and only the fields to change, and ``delete`` event ids. A chunk
+    is validated with one query per related model and one double-booking
+    sweep instead of ``Event.full_clean()`` per event, then written with
+    ``bulk_create``/``bulk_update``/``chunked_delete``.
+
+    Invalid items are left out of their chunk; if writing a chunk fails, none
+    of its items are written but earlier chunks stay committed. Returns
+    ``{'create': [...], 'update': [...], 'delete': [...]}`` with a result per
+    item, in order: its ``index``, ``id`` when known, a ``status`` (created,
+    updated, deleted, invalid, not_found or failed) and ``errors`` for
+    the ones that weren't written.
+    """
+    operations = [
+        ('create', create, create_events),
+        ('update', update, update_events),
+        ('delete', delete, delete_events),
+    ]
+    results = {}
+    for action, items, apply in operations:
+        results[action] = []
+        for start in range(0, len(items), chunk_size):
+            results[action] += apply(items[start:start + chunk_size], start)
+    return results
+
+
+def item_result(index, status, pk=None, errors=None):
+    result = {'index': index, 'id': pk, 'status': status}
+    if errors:
+        result['errors'] = errors
+    return result
+
+
+def set_event_fields(event, data):
+    """Set ``data`` on ``event``; returns validation errors by field
+
+    Foreign keys are only converted, ``check_references`` looks them up
+    for the whole batch.
+    """
+    errors = {
+        name: ['Unknown or read-only field.'] for name in data if name not in EVENT_WRITE_FIELDS
+    }
+    for name in EVENT_WRITE_FIELDS:
+        if name not in data:
+            continue
+        field = Event._meta.get_field(name)
+        if field.is_relation:
+            try:
+                setattr(event, field.attname, None if data[name] is None else field.to_python(data[name]))
+            except ValidationError as error:
+                errors[name] = error.messages
+        else:
+            setattr(event, name, data[name])
+    try:
+        # Validating a foreign key would query for it, event by event
+        relations = [field.name for field in Event._meta.concrete_fields if field.is_relation]
+        event.clean_fields(exclude=relations + list(errors))
+    except ValidationError as error:
+        errors.update(error.message_dict)
+    for name in ('start_date', 'end_date'):
+        value = getattr(event, name)
+        if isinstance(value, datetime) and timezone.is_naive(value):
+            setattr(event, name, timezone.make_aware(value))
+    # Updates that leave the dates alone can still edit past events
+    rescheduled = event.pk is None or not {'start_date', 'end_date'}.isdisjoint(data)
+    if rescheduled and not errors:
+        try:
+            event.clean_schedule()
+        except ValidationError as error:
+            errors.update(error.message_dict)
+    return errors
+
+
+def check_references(events, errors):
+    """Add errors for foreign keys of ``events`` that point nowhere, with one
+    query per related model"""
+    for name in EVENT_FOREIGN_KEYS:
+        field = Event._meta.get_field(name)
+        values = {getattr(event, field.attname) for event in events.values()} - {None}
+        found = field.related_model._base_manager.in_bulk(values)
+        for index, event in events.items():
+            value = getattr(event, field.attname)
+            if value is None and not field.null:
+                errors.setdefault(index, {})[name] = ['This field cannot be null.']
+            elif value is not None and value not in found:
+                errors.setdefault(index, {})[name] = [f'No {name} with id {value}.']
+
+
+def check_bookings(events, errors):
+    """Add errors for events that would double-book a venue, checking the
+    batch at once (see ``booking.find_batch_conflicts``)"""
+    if not settings.EVENT_PREVENT_DOUBLE_BOOKING or not events:
+        return
+    from .booking import describe, find_batch_conflicts
+
+    indexes = {id(event): index for index, event in events.items()}
+    for conflict in find_batch_conflicts(list(events.values())):
+        for event in [conflict.event] + conflict.overlapping:
+            if id(event) in indexes:
+                errors.setdefault(indexes[id(event)], {}).setdefault('start_date', []).append(
+                    describe(conflict)
+                )
+
+
+def validate_events(events, errors):
+    """Drop the events that failed validation from ``events``"""
+    check_references({i: event for i, event in events.items() if i not in errors}, errors)
+    check_bookings({i: event for i, event in events.items() if i not in errors}, errors)
+    return {i: event for i, event in events.items() if i not in errors}
+
+
+def write_chunk(results, valid, status, write):
+    """Run ``write`` in a transaction and record ``status`` for the ``valid``
+    events, or ``failed`` for all of them if it raises"""
+    try:
+        with transaction.atomic():
+            write(list(valid.values()))
+    except (DatabaseError, ValidationError) as error:
+        messages = error.messages if isinstance(error, ValidationError) else [str(error)]
+        for index, event in valid.items():
+            results[index] = item_result(index, 'failed', event.pk, {'non_field_errors': messages})
+        return
+    for index, event in valid.items():
+        results[index] = item_result(index, status, event.pk)
+
+
+def create_events(items, offset):
+    events, errors = {}, {}
+    for index, data in enumerate(items, offset):
+        if not isinstance(data, dict):
+            errors[index] = {'non_field_errors': ['Expected an object of event fields.']}
+            continue
+        event = Event()
+        events[index] = event
+        item_errors = set_event_fields(event, data)
+        if item_errors:
+            errors[index] = item_errors
+
+    valid = validate_events(events, errors)
+    results = {index: item_result(index, 'invalid', errors=item_errors) for index, item_errors in errors.items()}
+    write_chunk(results, valid, 'created', Event.objects.bulk_create)
+    return [results[index] for index in sorted(results)]
+
+
+def update_events(items, offset):
+    pks = {}
+    errors = {}
+    for index, data in enumerate(items, offset):
+        if not isinstance(data, dict) or 'id' not in data:
+            errors[index] = {'id': ['Expected an object with the id of the event to update.']}
+            continue
+        try:
+            pks[index] = Event._meta.pk.to_python(data['id'])
+        except ValidationError as error:
+            errors[index] = {'id': error.messages}
+    saved = Event.objects.in_bulk(set(pks.values()))
+
+    results = {}
+    events = {}
+    changed = {}
+    seen = set()
+    for index, pk in pks.items():
+        if pk not in saved:
+            results[index] = item_result(index, 'not_found', pk, {'id': [f'No event with id {pk}.']})
+            continue
+        if pk in seen:
+            errors[index] = {'id': ['Event updated more than once in this chunk.']}
+            continue
+        seen.add(pk)
+        data = {name: value for name, value in items[index - offset].items() if name != 'id'}
+        events[index] = saved[pk]
+        changed[index] = data.keys()
+        item_errors = set_event_fields(saved[pk], data)
+        if item_errors:
+            errors[index] = item_errors
+
+    valid = validate_events(events, errors)
+    for index, item_errors in errors.items():
+        results[index] = item_result(index, 'invalid', pks.get(index), item_errors)
+    # The other events keep their values in fields only some of them change.
+    # EventQuerySet.update moves the local dates along with start_date
+    fields = sorted(set().union(*(changed[index] for index in valid)))
+    write_chunk(results, valid, 'updated', lambda objs: fields and Event.objects.bulk_update(objs, fields))
+    return [results[index] for index in sorted(results)]
+
+
+def delete_events(items, offset):
+    pks = {}
+    results = {}
+    for index, value in enumerate(items, offset):
+        try:
+            pks[index] = Event._meta.pk.to_python(value)
+        except ValidationError as error:
+            results[index] = item_result(index, 'invalid', errors={'id': error.messages})
+    found = set(Event.objects.filter(pk__in=set(pks.values())).values_list('pk', flat=True))
+    for index, pk in pks.items():
+        if pk not in found:
+            results[index] = item_result(index, 'not_found', pk, {'id': [f'No event with id {pk}.']})
+
+    try:
+        with transaction.atomic():
+            chunked_delete(Event.objects.filter(pk__in=found))
+    except DatabaseError as error:
+        status, errors = 'failed', {'non_field_errors': [str(error)]}
+    else:
+        status, errors = 'deleted', None
+    for index, pk in pks.items():
+        if pk in found:
+            results[index] = item_result(index, status, pk, errors)
+    return [results[index] for index in sorted(results)]
@@ -0,0 +1,193 @@
+"""Response cache for the event API
+
+Entries are tagged with a data generation number. Any write to events,
+venues, categories or posts bumps the generation, and bumps it again once
+the write commits (see ``signals.py``). That makes every existing entry stale
+at once instead of tracking what each entry depends on. Calendar months are
+the exception: each has its own generation, bumped only by writes to events
+in that month (see ``calendar.py``).
+
+Misses are coalesced so that a popular page is computed once, not once per
+concurrent request:
+
+* within a process, the first thread to miss a key computes it and the
+  others wait for its result;
+* across processes, the computing worker holds a lock key added to the
+  cache, so this needs a shared cache backend (Redis, Memcached, file or
+  database cache) to span processes;
+* while a stale entry is being refreshed, everyone else is served the stale
+  data. Entries are kept ``EVENT_CACHE_STALE_TTL`` seconds past their
+  timeout for this.
+"""
+import hashlib
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+GENERATION_KEY = 'eventlist:generation'
+LOCK_POLL_INTERVAL = 0.05
+
+# key -> Future for computations running in this process
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+# Set while responses are computed without the cache
+_bypass = ContextVar('cache_bypass', default=False)
+
+
+@contextmanager
+def bypass_cache():
+    """Compute every entry requested inside afresh, without reading or
+    storing it, e.g. for a request being profiled"""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def is_shared_cache():
+    """Whether other processes see this cache; a local memory cache is
+    private to its process, so generation bumps made in one process (a
+    management command, another server worker) never reach the others"""
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def private_cache_warning():
+    """Warning for commands that write cached data while the cache is
+    private to their process, or None"""
+    if is_shared_cache():
+        return None
+    ttl = settings.EVENT_CACHE_TIMEOUT + settings.EVENT_CACHE_STALE_TTL
+    return (
+        'The cache is local memory, private to this process: running servers keep '
+        f'their cached pages for up to {ttl}s. Configure a shared backend in CACHES.'
+    )
+
+
+def get_generation(key=GENERATION_KEY):
+    generation = cache.get(key)
+    if generation is None:
+        # Start from the clock so an evicted counter never reuses old values
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(key=GENERATION_KEY):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def request_key(namespace, request, *parts):
+    """Cache key for a DRF request, independent of query param order
+
+    Includes scheme and host because paginated responses embed absolute
+    ``next``/``previous`` links.
+    """
+    params = urlencode(sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    ))
+    raw = '|'.join([request.scheme, request.get_host(), *map(str, parts), params])
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'eventlist:{namespace}:{digest}'
+
+
+def _is_fresh(entry, generation):
+    return (
+        entry is not None
+        and entry['generation'] == generation
+        and entry['fresh_until'] > time.time()
+    )
+
+
+def _store(key, data, generation):
+    cache.set(
+        key,
+        {
+            'generation': generation,
+            'fresh_until': time.time() + settings.EVENT_CACHE_TIMEOUT,
+            'data': data,
+        },
+        settings.EVENT_CACHE_TIMEOUT + settings.EVENT_CACHE_STALE_TTL,
+    )
+
+
+def get_or_compute(key, compute, generation_key=GENERATION_KEY):
+    """Return the cached data for ``key``, computing it at most once at a time
+
+    ``generation_key`` names the generation counter the entry is tagged
+    with, for entries invalidated more narrowly than by every write.
+    """
+    if _bypass.get():
+        return compute()
+    generation = get_generation(generation_key)
+    entry = cache.get(key)
+    if _is_fresh(entry, generation):
+        return entry['data']
+
+    with _in_flight_lock:
+        flight = _in_flight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _in_flight[key] = Future()
+
+    if not leader:
+        if entry is not None:
+            return entry['data']  # Stale while the leader revalidates
+        return flight.result()
+
+    try:
+        data = _compute_with_lock(key, compute, generation, entry)
+    except BaseException as exc:
+        flight.set_exception(exc)
+        raise
+    else:
+        flight.set_result(data)
+        return data
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+
+
+def _compute_with_lock(key, compute, generation, stale_entry):
+    """Compute ``key`` while holding its cross-process lock
+
+    If another process holds the lock, serve the stale entry when there is one,
+    otherwise wait for that process to store a result. Waiting is bounded by
+    ``EVENT_CACHE_LOCK_TIMEOUT`` in case the lock holder died.
+    """
+    lock_key = f'{key}:lock'
+    lock_timeout = settings.EVENT_CACHE_LOCK_TIMEOUT
+    deadline = time.monotonic() + lock_timeout
+
+    while not cache.add(lock_key, 1, lock_timeout):
+        if stale_entry is not None:
+            return stale_entry['data']
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if _is_fresh(entry, generation):
+            return entry['data']
+        if time.monotonic() > deadline:
+            return compute()
+
+    try:
+        # Another process may have stored a result before we got the lock
+        entry = cache.get(key)
+        if _is_fresh(entry, generation):
+            return entry['data']
+        data = compute()
+        _store(key, data, generation)
+        return data
+    finally:
+        cache.delete(lock_key)
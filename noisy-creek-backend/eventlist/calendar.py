@@ -0,0 +1,117 @@
+"""Month calendar of events, bucketed by day in a client's time zone
+
+One query per table returns, for every day of the month, the number of
+events starting that day and the first few of them: window functions rank
+and count the events of each local day, and only the top ranks are read.
+
+Calendar responses are cached per month. Each month has its own cache
+generation, bumped only by writes to events that start in or near it, so
+editing an event in March leaves every other month cached. Bulk updates
+don't say where events were before the update, so they bump a generation
+shared by all months instead.
+"""
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber, TruncDate
+from django.utils import timezone
+
+from .cache import bump_generation, get_generation
+
+CALENDAR_GENERATION_KEY = 'eventlist:calendar:generation'
+
+# Largest UTC offset in use (UTC+14, UTC-12); an event within this of a
+# month boundary in UTC can fall in the neighbouring month locally
+MAX_UTC_OFFSET = timedelta(hours=14)
+
+
+def parse_timezone(name):
+    """``ZoneInfo`` for ``name``, or None if it isn't a known zone"""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def month_bounds(year, month, tz):
+    """Aware datetimes of the first instant of ``month`` and of the next month"""
+    start = datetime(year, month, 1, tzinfo=tz)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=tz)
+    return start, end
+
+
+def month_generation_key(year, month):
+    # Includes the calendar-wide generation so bumping it resets every month
+    return f'eventlist:calendar:{get_generation(CALENDAR_GENERATION_KEY)}:{year}-{month:02d}'
+
+
+def months_around(start_date):
+    """Months an event starting at ``start_date`` can fall in, in any time zone"""
+    return {
+        (moment.year, moment.month)
+        for moment in (start_date - MAX_UTC_OFFSET, start_date + MAX_UTC_OFFSET)
+    }
+
+
+def invalidate_months(start_dates):
+    """Make cached calendars stale for the months of these start dates"""
+    months = set()
+    for start_date in start_dates:
+        if start_date is not None:
+            months |= months_around(start_date)
+    for year, month in months:
+        bump_generation(month_generation_key(year, month))
+
+
+def invalidate_all_months():
+    bump_generation(CALENDAR_GENERATION_KEY)
+
+
+def day_buckets(queryset, start, end, tz, per_day):
+    """``{date: (count, events)}`` for events starting in ``[start, end)``
+
+    ``events`` are the first ``per_day`` events of each local day.
+    """
+    day = TruncDate('start_date', tzinfo=tz)
+    ranked = (
+        queryset.filter(start_date__gte=start, start_date__lt=end)
+        .annotate(
+            day=day,
+            rank=Window(RowNumber(), partition_by=[day], order_by=[F('start_date').asc(), F('pk').asc()]),
+            day_count=Window(Count('pk'), partition_by=[day]),
+        )
+        .filter(rank__lte=per_day)
+        .order_by('start_date', 'pk')
+    )
+    buckets = {}
+    for event in ranked:
+        count, events = buckets.setdefault(event.day, (event.day_count, []))
+        events.append(event)
+    return buckets
+
+
+def merge_buckets(buckets, other, per_day):
+    """Combine day buckets read from two tables"""
+    for day, (count, events) in other.items():
+        if day in buckets:
+            ours, our_events = buckets[day]
+            merged = sorted(our_events + events, key=lambda event: (event.start_date, event.pk))
+            buckets[day] = (ours + count, merged[:per_day])
+        else:
+            buckets[day] = (count, events)
+    return buckets
+
+
+def month_days(year, month, tz):
+    """Every local date in the month"""
+    start, end = month_bounds(year, month, tz)
+    day = start.date()
+    while day < end.date():
+        yield day
+        day += timedelta(days=1)
+
+
+def current_month(tz):
+    now = timezone.localtime(timezone.now(), tz)
+    return now.year, now.month
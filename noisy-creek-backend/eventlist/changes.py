@@ -0,0 +1,132 @@
+"""Change feed over events, venues and categories
+
+Every write to a tracked model adds a ``Change`` row (see ``signals.py``,
+which also covers the bulk paths of ``ChangeTrackingQuerySet``). Mirrors
+read the rows after the last ``seq`` they saw and get each changed object's
+current state, so an incremental sync costs the size of the change rather
+than of the data set.
+
+Creates and updates both carry the current object and should be applied as
+upserts: after compaction a mirror may see an ``update`` for a row it never
+saw created. Deletes are tombstones with no data. Moving events into the
+archive is not recorded (see ``unrecorded()``): the API still serves them,
+and so does the feed, from the archive.
+
+``seq`` is assigned when a change is inserted, not when its transaction
+commits. SQLite runs one write transaction at a time, so changes commit in
+``seq`` order and ``since=`` never skips one. On a database with concurrent
+writers a change could commit after a later ``seq`` was already read, so
+the feed is only ordered correctly on SQLite.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .bulk import DEFAULT_CHUNK_SIZE
+from .models import ArchivedEvent, Category, Change, Event, Venue
+from .serializers import CategorySerializer, NormalizedEventSerializer, VenueSerializer
+
+# Set while writes are left out of the feed
+_unrecorded = ContextVar('changes_unrecorded', default=False)
+
+# Model name -> (queryset of current rows, serializer)
+FEED_MODELS = {
+    'event': (Event.objects.all, NormalizedEventSerializer),
+    'venue': (Venue.objects.all, VenueSerializer),
+    'category': (Category.objects.all, CategorySerializer),
+}
+# Model name -> queryset of rows moved out of the current table
+ARCHIVED_MODELS = {
+    'event': ArchivedEvent.objects.all,
+}
+
+
+@contextmanager
+def unrecorded():
+    """Leave the writes made inside out of the change feed"""
+    token = _unrecorded.set(True)
+    try:
+        yield
+    finally:
+        _unrecorded.reset(token)
+
+
+def is_recording():
+    return not _unrecorded.get()
+
+
+def current_data(changes, context=None):
+    """Serialized current state of the objects in ``changes``, by (model, id)
+
+    Archived objects are read from the archive. Objects that no longer exist
+    are missing; a later tombstone covers them.
+    """
+    wanted = {}
+    for change in changes:
+        if change.action != Change.DELETE:
+            wanted.setdefault(change.model, set()).add(change.object_id)
+
+    data = {}
+    for model_name, pks in wanted.items():
+        get_queryset, serializer_class = FEED_MODELS[model_name]
+        objects = list(get_queryset().filter(pk__in=pks))
+        missing = pks - {obj.pk for obj in objects}
+        if missing and model_name in ARCHIVED_MODELS:
+            objects += ARCHIVED_MODELS[model_name]().filter(pk__in=missing)
+        for item in serializer_class(objects, many=True, context=context or {}).data:
+            data[(model_name, item['id'])] = item
+    return data
+
+
+def changes_since(since, limit, context=None):
+    """Up to ``limit`` changes after ``since``, oldest first
+
+    Reads by primary key range (``seq > since``), so the cost doesn't grow
+    with the length of the log. ``next_since`` is the value to pass next time.
+    """
+    page = list(Change.objects.filter(seq__gt=since).order_by('seq')[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    data = current_data(page, context)
+    return {
+        'changes': [
+            {
+                'seq': change.seq,
+                'model': change.model,
+                'id': change.object_id,
+                'action': change.action,
+                'changed_at': change.changed_at,
+                'data': data.get((change.model, change.object_id)),
+            }
+            for change in page
+        ],
+        'next_since': page[-1].seq if page else since,
+        'has_more': has_more,
+    }
+
+
+def superseded_changes():
+    """Changes followed by a later change to the same object"""
+    later = Change.objects.filter(
+        model=OuterRef('model'),
+        object_id=OuterRef('object_id'),
+        seq__gt=OuterRef('seq'),
+    )
+    return Change.objects.filter(Exists(later))
+
+
+def compact_changes(chunk_size=DEFAULT_CHUNK_SIZE):
+    """Delete superseded changes in small transactions; returns the number removed
+
+    Only the latest change of each object is needed to bring a mirror up to
+    date, whatever ``since`` it reads from, so this never loses information.
+    """
+    removed = 0
+    while True:
+        with transaction.atomic():
+            seqs = list(superseded_changes().order_by('seq').values_list('seq', flat=True)[:chunk_size])
+            if not seqs:
+                return removed
+            removed += Change.objects.filter(seq__in=seqs).delete()[0]
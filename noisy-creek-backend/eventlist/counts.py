@@ -0,0 +1,83 @@
+"""Estimated event counts for paginated lists
+
+``EventDayCount`` holds the number of events starting on each day in each
+category. Any combination of the list filters (category, date range,
+upcoming) is estimated by summing a few hundred of its rows instead of
+counting the matching events. The table is refreshed in the background:
+writes queue the days they touched when ``EVENT_COUNT_REFRESH_ON_WRITE`` is
+set, and ``manage.py refresh_event_counts`` rebuilds it all.
+
+Days are dates in ``TIME_ZONE``, matching how the list filters read dates.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Event, EventDayCount
+
+# Refreshing more days than this at once rebuilds the whole table instead
+MAX_REFRESH_DAYS = 100
+
+
+def day_range(day):
+    """Aware datetimes of the start of ``day`` and of the next day"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def local_day(value):
+    return timezone.localtime(value).date()
+
+
+def refresh_day_counts(days=None):
+    """Recount events for ``days`` (every day when None) from ``Event``
+
+    Returns the number of ``EventDayCount`` rows written.
+    """
+    if days is not None and len(days) > MAX_REFRESH_DAYS:
+        days = None
+
+    events = Event.objects.all()
+    stale = EventDayCount.objects.all()
+    if days is not None:
+        if not days:
+            return 0
+        in_days = Q()
+        for day in days:
+            start, end = day_range(day)
+            in_days |= Q(start_date__gte=start, start_date__lt=end)
+        events = events.filter(in_days)
+        stale = stale.filter(day__in=days)
+
+    counts = (
+        events.annotate(day=TruncDate('start_date'))
+        .values('day', 'category_id')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+    with transaction.atomic():
+        stale.delete()
+        created = EventDayCount.objects.bulk_create([EventDayCount(**row) for row in counts])
+    return len(created)
+
+
+def estimate_event_count(category=None, start=None, end=None):
+    """Estimated number of events the list filters match, or None if the
+    table has never been built
+
+    ``start`` and ``end`` are dates: events from ``start`` on and before
+    ``end``.
+    """
+    if not EventDayCount.objects.exists():
+        return None
+    rows = EventDayCount.objects.all()
+    if category:
+        rows = rows.filter(category__name__iexact=category)
+    if start is not None:
+        rows = rows.filter(day__gte=start)
+    if end is not None:
+        rows = rows.filter(day__lt=end)
+    return rows.aggregate(total=Sum('count'))['total'] or 0
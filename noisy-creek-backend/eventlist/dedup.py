@@ -0,0 +1,204 @@
+"""Near-duplicate event detection with MinHash and locality-sensitive hashing
+
+Partner feeds send the same event with small differences ("Summer Music
+Festival" vs "Summer Music Fest 2026"). Each event's title and description
+become a set of character shingles, summarized by a MinHash signature whose
+matching positions estimate the Jaccard similarity of two sets. Signatures
+are cut into bands; events at the same venue on the same day that share any
+band land in the same bucket and become a candidate pair, so work grows
+with the number of events rather than the number of pairs. Candidates are
+then confirmed with the exact Jaccard similarity of their shingles.
+
+Duplicates are grouped, and the oldest event of each group (the lowest id)
+is kept as canonical. The others can be flagged with ``duplicate_of`` or
+merged into it.
+"""
+import random
+import re
+import zlib
+from collections import defaultdict, namedtuple
+from itertools import combinations, groupby
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Event, EventPost, local_date_fields
+
+SHINGLE_SIZE = 4
+BANDS = 16
+ROWS_PER_BAND = 4
+DEFAULT_THRESHOLD = 0.6
+# Groups this small compare every pair exactly; signatures cost more
+SMALL_GROUP = 8
+
+_PRIME = (1 << 61) - 1
+# Fixed seed so signatures are comparable between runs
+_random = random.Random(2026)
+PERMUTATIONS = [
+    (_random.randrange(1, _PRIME), _random.randrange(0, _PRIME))
+    for _ in range(BANDS * ROWS_PER_BAND)
+]
+
+NON_WORD_RE = re.compile(r'[\W_]+')
+
+Duplicate = namedtuple('Duplicate', ['event', 'canonical', 'similarity'])
+
+
+def shingles(title, description):
+    """Character shingles of the normalized title and description"""
+    text = NON_WORD_RE.sub(' ', f'{title} {description or ""}'.lower()).strip()
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set):
+    hashes = [zlib.crc32(shingle.encode()) for shingle in shingle_set]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in PERMUTATIONS)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def bucket(event):
+    """Venue and date in ``EVENT_LOCAL_TIME_ZONE`` an event is bucketed under"""
+    return event.venue_id, local_date_fields(event.start_date)['local_date']
+
+
+def candidate_pairs(signatures):
+    """Index pairs sharing at least one band of their ``signatures``"""
+    buckets = defaultdict(list)
+    for index, signature in enumerate(signatures):
+        for band in range(BANDS):
+            rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+            buckets[(band, rows)].append(index)
+    pairs = set()
+    for members in buckets.values():
+        pairs.update(combinations(members, 2))
+    return pairs
+
+
+def find_in_group(events, threshold):
+    """Confirmed duplicates among ``events``, all at one venue on one day
+
+    ``events`` are ordered oldest first; each duplicate points at the
+    oldest event of its group.
+    """
+    sets = [shingles(event.title, event.description) for event in events]
+    if len(events) <= SMALL_GROUP:
+        pairs = combinations(range(len(events)), 2)
+    else:
+        pairs = sorted(candidate_pairs([minhash(shingle_set) for shingle_set in sets]))
+
+    parent = list(range(len(events)))
+
+    def root(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    similarity = {}  # index -> best confirmed score with another event
+    for i, j in pairs:
+        score = jaccard(sets[i], sets[j])
+        if score >= threshold:
+            for index in (i, j):
+                similarity[index] = max(similarity.get(index, 0), score)
+            low, high = sorted((root(i), root(j)))
+            parent[high] = low
+
+    return [
+        Duplicate(events[index], events[root(index)], similarity[index])
+        for index in sorted(similarity)
+        if root(index) != index
+    ]
+
+
+def find_duplicates(events, threshold=DEFAULT_THRESHOLD):
+    """Duplicates among ``events``, an iterable ordered by venue and start date"""
+    for _, group in groupby(events, key=bucket):
+        group = sorted(group, key=lambda event: (event.pk is None, event.pk or 0))
+        if len(group) > 1:
+            yield from find_in_group(group, threshold)
+
+
+def find_duplicate_events(queryset=None, threshold=DEFAULT_THRESHOLD):
+    """Duplicates among saved events, streamed a venue at a time"""
+    if queryset is None:
+        queryset = Event.objects.all()
+    events = queryset.order_by('venue_id', 'start_date').only(
+        'title', 'description', 'start_date', 'venue', 'duplicate_of'
+    )
+    return find_duplicates(events.iterator(), threshold)
+
+
+def drop_duplicates(events, threshold=DEFAULT_THRESHOLD):
+    """Import stage: the unsaved ``events`` that don't duplicate a saved event
+    or an earlier event of the batch, plus the ``Duplicate``s dropped"""
+    events = list(events)
+    days = {bucket(event) for event in events}
+    saved = []
+    for venue_id in {venue_id for venue_id, _ in days}:
+        starts = [event.start_date for event in events if event.venue_id == venue_id]
+        saved += Event.objects.filter(
+            venue_id=venue_id,
+            start_date__gte=min(starts) - timezone.timedelta(days=1),
+            start_date__lte=max(starts) + timezone.timedelta(days=1),
+        ).only('title', 'description', 'start_date', 'venue')
+    saved = sorted((event for event in saved if bucket(event) in days), key=lambda event: event.pk)
+
+    # Saved events sort first, then the batch in its own order
+    order = {id(event): position for position, event in enumerate(saved + events)}
+    duplicates = []
+    for _, group in groupby(sorted(saved + events, key=bucket), key=bucket):
+        group = sorted(group, key=lambda event: order[id(event)])
+        if len(group) > 1:
+            duplicates += find_in_group(group, threshold)
+
+    batch = set(map(id, events))
+    duplicates = [duplicate for duplicate in duplicates if id(duplicate.event) in batch]
+    dropped = {id(duplicate.event) for duplicate in duplicates}
+    return [event for event in events if id(event) not in dropped], duplicates
+
+
+def flag_duplicates(duplicates):
+    """Point each duplicate's ``duplicate_of`` at its canonical event"""
+    by_canonical = defaultdict(list)
+    for duplicate in duplicates:
+        if duplicate.event.duplicate_of_id != duplicate.canonical.pk:
+            by_canonical[duplicate.canonical.pk].append(duplicate.event.pk)
+    flagged = 0
+    for canonical_pk, pks in by_canonical.items():
+        flagged += Event.objects.filter(pk__in=pks).update(duplicate_of_id=canonical_pk)
+    return flagged
+
+
+MERGED_FIELDS = ('description', 'category_id', 'expected_attendance')
+
+
+def merge_duplicate(duplicate):
+    """Move a duplicate's posts to its canonical event, fill in fields the
+    canonical event is missing, and delete the duplicate"""
+    event = Event.objects.get(pk=duplicate.event.pk)
+    canonical = Event.objects.get(pk=duplicate.canonical.pk)
+    missing = {
+        name: getattr(event, name)
+        for name in MERGED_FIELDS
+        if getattr(canonical, name) in (None, '') and getattr(event, name) not in (None, '')
+    }
+    with transaction.atomic():
+        EventPost.objects.filter(event=event).update(event=canonical)
+        Event.objects.filter(duplicate_of=event).update(duplicate_of=canonical)
+        if missing:
+            # update() rather than save(): old events no longer pass Event.clean
+            Event.objects.filter(pk=canonical.pk).update(**missing)
+        event.delete()
+
+
+def merge_duplicates(duplicates):
+    merged = 0
+    for duplicate in duplicates:
+        merge_duplicate(duplicate)
+        merged += 1
+    return merged
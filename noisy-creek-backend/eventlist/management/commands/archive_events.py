@@ -0,0 +1,54 @@
+# management/commands/archive_events.py
+# Meant to run on a schedule, e.g. nightly from cron:
+#   0 3 * * * cd /path/to/noisy-creek-backend && python manage.py archive_events
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from eventlist.archive import MIN_RETENTION_DAYS, archive_events
+from eventlist.cache import private_cache_warning
+
+class Command(BaseCommand):
+    help = 'Move events past the retention horizon into the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.EVENT_ARCHIVE_RETENTION_DAYS,
+            help=f'Archive events that started more than this many days ago (min {MIN_RETENTION_DAYS})'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Events moved per transaction'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many events would be archived'
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            moved = archive_events(
+                options['days'],
+                chunk_size=options['chunk_size'],
+                dry_run=options['dry_run']
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        elapsed = time.monotonic() - started
+        if options['dry_run']:
+            self.stdout.write(f"Would archive {moved} events")
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Archived {moved} events in {elapsed:.2f}s")
+            )
+            warning = private_cache_warning()
+            if warning:
+                self.stdout.write(self.style.WARNING(warning))
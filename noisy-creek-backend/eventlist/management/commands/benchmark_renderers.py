@@ -0,0 +1,94 @@
+# management/commands/benchmark_renderers.py
+
+import io
+import timeit
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from eventlist.models import Category, Event, Venue
+from eventlist.renderers import (
+    FastJSONParser,
+    FastJSONRenderer,
+    MessagePackParser,
+    MessagePackRenderer,
+    msgpack,
+    orjson,
+)
+from eventlist.serializers import EventSerializer
+
+def sample_page(size, native_datetimes=False):
+    """Serialized page of ``size`` unsaved events, like a full /api/events/ page"""
+    category = Category(id=1, name="Música & Dança", description="Music and dance events")
+    venue = Venue(id=1, name="Gas Works Park", address="2101 N Northlake Way, Seattle, WA 98103", capacity=800)
+    now = timezone.now()
+    events = [
+        Event(
+            id=i,
+            title=f"Música & Dança no Parque {i}",
+            description="Live music, dancing and food trucks by the lake. " * 20,
+            start_date=now + timedelta(days=i, microseconds=i),
+            end_date=now + timedelta(days=i, hours=3),
+            category=category,
+            venue=venue
+        )
+        for i in range(size)
+    ]
+    context = {'native_datetimes': native_datetimes}
+    return {
+        'count': 12000,
+        'next': 'http://localhost:8000/api/events/?page=2&page_size=100',
+        'previous': None,
+        'results': EventSerializer(events, many=True, context=context).data,
+    }
+
+class Command(BaseCommand):
+    help = 'Compare API renderers and parsers on a page of events (throughput and output size)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--iterations', type=int, default=500)
+
+    def formats(self):
+        """(name, renderer, parser, native datetimes) to compare; the first is the baseline"""
+        formats = [
+            ('JSONRenderer', JSONRenderer(), JSONParser(), False),
+            ('FastJSONRenderer', FastJSONRenderer(), FastJSONParser(), False),
+        ]
+        if msgpack is not None:
+            formats.append(('MessagePackRenderer', MessagePackRenderer(), MessagePackParser(), True))
+        return formats
+
+    def time_per_call(self, func, iterations):
+        return timeit.timeit(func, number=iterations) / iterations
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed; FastJSONRenderer falls back to json"))
+        if msgpack is None:
+            self.stdout.write(self.style.WARNING("msgpack is not installed; skipping MessagePack"))
+
+        self.stdout.write(
+            f"{'format':<22} {'encode us':>10} {'encode/s':>9} {'decode us':>10} "
+            f"{'decode/s':>9} {'bytes':>8} {'encode x':>8}"
+        )
+        baseline = None
+        for name, renderer, parser, native_datetimes in self.formats():
+            data = sample_page(options['page_size'], native_datetimes)
+            body = renderer.render(data)
+            encode = self.time_per_call(lambda: renderer.render(data), iterations)
+            decode = self.time_per_call(lambda: parser.parse(io.BytesIO(body)), iterations)
+            baseline = baseline or encode
+            self.stdout.write(
+                f"{name:<22} {encode * 1e6:10.1f} {1 / encode:9.0f} {decode * 1e6:10.1f} "
+                f"{1 / decode:9.0f} {len(body):8d} {baseline / encode:7.2f}x"
+            )
+
+        data = sample_page(options['page_size'])
+        if FastJSONRenderer().render(data) == JSONRenderer().render(data):
+            self.stdout.write(self.style.SUCCESS("FastJSONRenderer output is identical to JSONRenderer on this page"))
+        else:
+            self.stdout.write(self.style.ERROR("FastJSONRenderer output differs from JSONRenderer on this page"))
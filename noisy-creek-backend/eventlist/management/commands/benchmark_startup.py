@@ -0,0 +1,147 @@
+# management/commands/benchmark_startup.py
+# Starts the pre-fork server (eventsite/serve.py) cold, with each worker
+# loading the app itself, and preloaded, and compares time to first byte of
+# the workers' first requests and memory per worker, e.g.:
+#   python manage.py benchmark_startup --workers 4
+# Memory is read from /proc, so it is only reported on Linux. PSS counts
+# pages shared copy-on-write once, split between the processes sharing them.
+# The workers run on whatever cache is configured, even the local memory
+# cache the server otherwise refuses for several workers.
+
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+MODES = [('cold', ['--no-preload']), ('preload', [])]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_byte(port, path):
+    """Seconds until the first byte of the response to ``GET path``"""
+    started = time.monotonic()
+    with socket.create_connection(('127.0.0.1', port), timeout=60) as sock:
+        sock.sendall(f'GET {path} HTTP/1.0\r\nHost: localhost\r\n\r\n'.encode())
+        first = sock.recv(1)
+        elapsed = time.monotonic() - started
+        while sock.recv(65536):
+            pass
+    if not first:
+        raise CommandError(f'No response to GET {path}')
+    return elapsed
+
+
+def children(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as children_file:
+            return [int(child) for child in children_file.read().split()]
+    except OSError:
+        return []
+
+
+def memory_kb(pid):
+    """``(rss, pss)`` in KB, None where /proc doesn't say"""
+    rss = pss = None
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            rss = next((int(line.split()[1]) for line in status if line.startswith('VmRSS:')), None)
+        with open(f'/proc/{pid}/smaps_rollup') as rollup:
+            pss = next((int(line.split()[1]) for line in rollup if line.startswith('Pss:')), None)
+    except OSError:
+        pass
+    return rss, pss
+
+
+class Command(BaseCommand):
+    help = 'Compare cold and preloaded pre-fork workers: first-request latency and memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--path', default='/api/events/', help='Path requested (default: /api/events/)')
+        parser.add_argument('--requests', type=int, default=50, help='Requests after the first ones, for the steady state')
+
+    def handle(self, *args, **options):
+        results = {mode: self.measure(flags, options) for mode, flags in MODES}
+
+        self.stdout.write(
+            f"{'mode':<8} {'ready':>8} {'first p50':>10} {'first max':>10} {'steady p50':>11} "
+            f"{'RSS/worker':>11} {'PSS/worker':>11} {'PSS total':>10}"
+        )
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<8} {result['ready']:>7.2f}s {result['first_p50']:>8.1f}ms {result['first_max']:>8.1f}ms "
+                f"{result['steady_p50']:>9.1f}ms {self.mb(result['rss']):>11} {self.mb(result['pss']):>11} "
+                f"{self.mb(result['pss_total']):>10}"
+            )
+        cold, preload = results['cold'], results['preload']
+        self.stdout.write(self.style.SUCCESS(
+            f"First request p50 {cold['first_p50']:.1f}ms -> {preload['first_p50']:.1f}ms with preloading"
+        ))
+
+    @staticmethod
+    def mb(kb):
+        return '-' if kb is None else f'{kb / 1024:.1f}MB'
+
+    def measure(self, flags, options):
+        port = free_port()
+        started = time.monotonic()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'eventsite.serve', '--bind', f'127.0.0.1:{port}',
+             '--workers', str(options['workers']), '--allow-local-cache', *flags],
+            cwd=settings.BASE_DIR,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            ready = self.wait_for_port(server, port) - started
+
+            # One connection per worker at once, so each worker's first
+            # request is among them
+            with ThreadPoolExecutor(options['workers']) as pool:
+                first = list(pool.map(
+                    lambda _: time_to_first_byte(port, options['path']), range(options['workers'])
+                ))
+                steady = list(pool.map(
+                    lambda _: time_to_first_byte(port, options['path']), range(options['requests'])
+                ))
+
+            memory = [memory_kb(pid) for pid in children(server.pid)]
+            rss = [kb for kb, _ in memory if kb is not None]
+            pss = [kb for _, kb in memory if kb is not None]
+            return {
+                'ready': ready,
+                'first_p50': statistics.median(first) * 1000,
+                'first_max': max(first) * 1000,
+                'steady_p50': statistics.median(steady) * 1000,
+                'rss': statistics.mean(rss) if rss else None,
+                'pss': statistics.mean(pss) if pss else None,
+                'pss_total': sum(pss) + (memory_kb(server.pid)[1] or 0) if pss else None,
+            }
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+    @staticmethod
+    def wait_for_port(server, port, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError('Server exited; run python -m eventsite.serve to see why')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return time.monotonic()
+            except OSError:
+                time.sleep(0.01)
+        raise CommandError(f'Server did not listen on port {port} within {timeout}s')
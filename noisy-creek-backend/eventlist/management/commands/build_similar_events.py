@@ -0,0 +1,51 @@
+# management/commands/build_similar_events.py
+# Adds new events to the similar-events index; a nightly full rebuild keeps
+# edited events and weights current, e.g. from cron:
+#   */15 * * * * cd /path/to/noisy-creek-backend && python manage.py build_similar_events
+#   30 3 * * *   cd /path/to/noisy-creek-backend && python manage.py build_similar_events --full
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from eventlist.cache import private_cache_warning
+from eventlist.similarity import DEFAULT_BLOCK_SIZE, DEFAULT_TOP_K, build_similar_events, np
+
+class Command(BaseCommand):
+    help = 'Precompute the most similar events of each event for /api/events/<id>/similar/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute every event instead of only adding events without neighbours'
+        )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=DEFAULT_TOP_K,
+            help='Neighbours stored per event'
+        )
+        parser.add_argument(
+            '--block-size',
+            type=int,
+            default=DEFAULT_BLOCK_SIZE,
+            help='Events scored per matrix multiplication'
+        )
+
+    def handle(self, *args, **options):
+        if np is None:
+            raise CommandError('numpy is required: pip install numpy')
+
+        started = time.monotonic()
+        updated = build_similar_events(
+            top_k=options['top_k'],
+            block_size=options['block_size'],
+            full=options['full'],
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated neighbours of {updated} events in {elapsed:.2f}s")
+        )
+        warning = private_cache_warning()
+        if warning:
+            self.stdout.write(self.style.WARNING(warning))
@@ -0,0 +1,36 @@
+# management/commands/compact_changes.py
+# Meant to run on a schedule, e.g. hourly from cron:
+#   0 * * * * cd /path/to/noisy-creek-backend && python manage.py compact_changes
+
+import time
+
+from django.core.management.base import BaseCommand
+from eventlist.changes import compact_changes, superseded_changes
+
+class Command(BaseCommand):
+    help = 'Remove change feed entries superseded by a later change to the same object'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Entries removed per transaction'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many entries would be removed'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(f"Would remove {superseded_changes().count()} changes")
+            return
+
+        started = time.monotonic()
+        removed = compact_changes(chunk_size=options['chunk_size'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Removed {removed} changes in {elapsed:.2f}s")
+        )
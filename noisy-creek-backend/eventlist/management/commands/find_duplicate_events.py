@@ -0,0 +1,74 @@
+# management/commands/find_duplicate_events.py
+# Run after partner feed imports, e.g. hourly from cron:
+#   0 * * * * cd /path/to/noisy-creek-backend && python manage.py find_duplicate_events --upcoming
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from eventlist.cache import private_cache_warning
+from eventlist.dedup import DEFAULT_THRESHOLD, find_duplicate_events, flag_duplicates, merge_duplicates
+from eventlist.models import Event
+
+class Command(BaseCommand):
+    help = 'Find near-duplicate events at the same venue and day, and flag or merge them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help='Minimum Jaccard similarity of title and description shingles (0-1)'
+        )
+        parser.add_argument(
+            '--upcoming',
+            action='store_true',
+            help='Only check events that have not started yet'
+        )
+        parser.add_argument(
+            '--merge',
+            action='store_true',
+            help='Merge duplicates into the oldest event instead of flagging them'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only list the duplicates'
+        )
+
+    def handle(self, *args, **options):
+        if not 0 < options['threshold'] <= 1:
+            raise CommandError('--threshold must be between 0 and 1')
+
+        events = Event.objects.all()
+        if options['upcoming']:
+            events = events.filter(start_date__gte=timezone.now())
+
+        started = time.monotonic()
+        duplicates = [
+            duplicate for duplicate in find_duplicate_events(events, options['threshold'])
+            # Already flagged on an earlier run
+            if options['merge'] or duplicate.event.duplicate_of_id != duplicate.canonical.pk
+        ]
+        for duplicate in duplicates:
+            self.stdout.write(
+                f'"{duplicate.event.title}" (#{duplicate.event.pk}) duplicates '
+                f'"{duplicate.canonical.title}" (#{duplicate.canonical.pk}), '
+                f'similarity {duplicate.similarity:.2f}'
+            )
+
+        if options['dry_run']:
+            self.stdout.write(f"Found {len(duplicates)} duplicates")
+            return
+
+        if options['merge']:
+            count = merge_duplicates(duplicates)
+            verb = 'Merged'
+        else:
+            count = flag_duplicates(duplicates)
+            verb = 'Flagged'
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"{verb} {count} duplicates in {elapsed:.2f}s"))
+        warning = private_cache_warning()
+        if warning:
+            self.stdout.write(self.style.WARNING(warning))
@@ -0,0 +1,464 @@
+# management/commands/load_test_api.py
+# Measures API throughput and tail latency. Generates a dataset into a
+# scratch SQLite database, serves it from a separate process and replays a
+# weighted mix of requests against it, e.g.:
+#   python manage.py load_test_api --events 50000 --concurrency 32 --output load.json
+#   python manage.py load_test_api --server asgi --mix list=5,deep_page=1
+# --url targets a server that is already running on this database instead.
+
+import asyncio
+import json
+import logging
+import math
+import multiprocessing
+import random
+import socket
+import tempfile
+import time
+import warnings
+from datetime import timedelta
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+from eventlist.counts import refresh_day_counts
+from eventlist.models import Category, Event, EventPost, Venue
+from eventlist.views import EventPagination
+
+try:
+    import uvicorn
+except ImportError:  # Optional; --server asgi needs it
+    uvicorn = None
+
+CATEGORIES = ['Music', 'Food & Drink', 'Outdoor', 'Art & Culture', 'Sports', 'Community']
+WORDS = (
+    'jazz summer night market festival tasting trail run gallery opening '
+    'workshop league final community garden cleanup brewery tour film '
+    'screening poetry reading family picnic craft fair lakeside concert'
+).split()
+BATCH_SIZE = 1000
+
+# Scenario name -> default weight
+DEFAULT_MIX = {
+    'list': 20,
+    'list_upcoming': 10,
+    'list_category': 15,
+    'list_dates': 10,
+    'list_fields': 5,
+    'list_normalized': 5,
+    'deep_page': 10,
+    'detail': 15,
+    'detail_posts': 5,
+    'calendar': 5,
+}
+
+
+class Dataset:
+    """What the scenarios need to know about the data being served"""
+
+    def __init__(self):
+        self.pks = list(Event.objects.values_list('pk', flat=True))
+        if not self.pks:
+            raise CommandError('No events to load test; drop --url or populate the database')
+        self.categories = list(Category.objects.values_list('name', flat=True))
+        bounds = Event.objects.order_by('start_date').values_list('start_date', flat=True)
+        self.first_day = timezone.localdate(bounds.first())
+        self.last_day = timezone.localdate(bounds.last())
+        self.pages = max(1, math.ceil(len(self.pks) / EventPagination.page_size))
+
+    def path(self, scenario, rng):
+        """Request path of one ``scenario`` request"""
+        if scenario == 'list':
+            return '/api/events/'
+        if scenario == 'list_upcoming':
+            return self.list_path(upcoming='true')
+        if scenario == 'list_category':
+            return self.list_path(category=rng.choice(self.categories))
+        if scenario == 'list_dates':
+            start = self.first_day + timedelta(days=rng.randrange((self.last_day - self.first_day).days + 1))
+            return self.list_path(start_date=start, end_date=start + timedelta(days=7))
+        if scenario == 'list_fields':
+            return self.list_path(fields='id,title,start_date,venue.name')
+        if scenario == 'list_normalized':
+            return self.list_path(normalize='true')
+        if scenario == 'deep_page':
+            return self.list_path(page=rng.randint(self.pages // 2 + 1, self.pages))
+        if scenario == 'detail':
+            return f'/api/events/{rng.choice(self.pks)}/'
+        if scenario == 'detail_posts':
+            return f'/api/events/{rng.choice(self.pks)}/?include_posts=true'
+        if scenario == 'calendar':
+            day = self.first_day + timedelta(days=rng.randrange((self.last_day - self.first_day).days + 1))
+            return '/api/events/calendar/?' + urlencode({'year': day.year, 'month': day.month})
+        raise ValueError(scenario)
+
+    @staticmethod
+    def list_path(**params):
+        return '/api/events/?' + urlencode(params)
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 client connection"""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        """Status code and body size of ``GET path``"""
+        reused = self.writer is not None
+        if not reused:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: {self.host}\r\n'
+            'Accept: application/json\r\nConnection: keep-alive\r\n\r\n'.encode()
+        )
+        status_line = await self.reader.readline()
+        if not status_line:
+            self.close()
+            if reused:
+                # The server dropped an idle connection; retry on a new one
+                return await self.get(path)
+            raise ConnectionError('closed by server')
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip().lower()
+
+        if 'content-length' in headers:
+            size = len(await self.reader.readexactly(int(headers['content-length'])))
+        elif headers.get('transfer-encoding') == 'chunked':
+            size = await self.read_chunked()
+        else:
+            size = len(await self.reader.read())
+            headers['connection'] = 'close'
+        if headers.get('connection') == 'close':
+            self.close()
+        return status, size
+
+    async def read_chunked(self):
+        size = 0
+        while True:
+            length = int((await self.reader.readline()).split(b';')[0], 16)
+            size += len(await self.reader.readexactly(length + 2)) - 2
+            if length == 0:
+                return size
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def percentile(ordered, percent):
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def summarize(results, seconds):
+    """Counts, rates and latency percentiles (ms) of ``(status, latency)`` results"""
+    latencies = sorted(latency * 1000 for _, latency in results)
+    errors = sum(1 for status, _ in results if not isinstance(status, int) or status >= 400)
+    summary = {
+        'requests': len(results),
+        'errors': errors,
+        'error_rate': round(errors / len(results), 4) if results else 0,
+        'rps': round(len(results) / seconds, 1),
+        'latency_ms': None,
+    }
+    if latencies:
+        summary['latency_ms'] = {
+            'mean': round(sum(latencies) / len(latencies), 2),
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'max': round(latencies[-1], 2),
+        }
+    return summary
+
+
+def serve(server, port):
+    """Child process entry point: serve the app until terminated"""
+    # No access log or warnings per request; writing them skews timings
+    logging.disable(logging.WARNING)
+    warnings.simplefilter('ignore')
+    if server == 'asgi':
+        from django.core.asgi import get_asgi_application
+        uvicorn.run(get_asgi_application(), host='127.0.0.1', port=port, log_level='error', access_log=False)
+    else:
+        from django.core.servers.basehttp import run
+        from django.core.wsgi import get_wsgi_application
+        run('127.0.0.1', port, get_wsgi_application(), threading=True)
+
+
+class Command(BaseCommand):
+    help = 'Load test the API with a weighted mix of requests and report RPS and latency as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--events',
+            type=int,
+            default=20000,
+            help='Events to generate into the scratch database (default: 20000)'
+        )
+        parser.add_argument(
+            '--database',
+            help='SQLite file for the generated data; reused if it exists (default: a temporary file)'
+        )
+        parser.add_argument(
+            '--server',
+            choices=['wsgi', 'asgi'],
+            default='wsgi',
+            help='Serve with Django\'s threaded WSGI server or uvicorn (default: wsgi)'
+        )
+        parser.add_argument(
+            '--url',
+            help='Base URL of a running server on this database; skips generating and serving'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help='Concurrent connections (default: 16)'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=30,
+            help='Seconds of measured load (default: 30)'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=float,
+            default=3,
+            help='Seconds of unmeasured load first, to fill caches (default: 3)'
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=10,
+            help='Seconds before a request counts as an error (default: 10)'
+        )
+        parser.add_argument(
+            '--mix',
+            help=f'Scenario weights, e.g. list=5,detail=1; one of {", ".join(DEFAULT_MIX)}'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=2026,
+            help='Random seed for the data and the request sequence'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the JSON report to this file instead of stdout'
+        )
+
+    def handle(self, *args, **options):
+        mix = self.parse_mix(options['mix'])
+        if options['duration'] <= 0 or options['concurrency'] < 1:
+            raise CommandError('--duration and --concurrency must be positive')
+        if options['server'] == 'asgi' and uvicorn is None and not options['url']:
+            raise CommandError('--server asgi needs uvicorn installed')
+
+        process = None
+        scratch = None
+        if options['url']:
+            url = urlsplit(options['url'])
+            if url.scheme != 'http':
+                raise CommandError('Only http:// URLs are supported')
+            host, port = url.hostname, url.port or 80
+        else:
+            if options['database']:
+                database = Path(options['database'])
+            else:
+                scratch = tempfile.TemporaryDirectory()
+                database = Path(scratch.name) / 'load_test.sqlite3'
+            self.use_database(database, options['events'], options['seed'])
+            host, port = '127.0.0.1', self.free_port()
+            process = self.start_server(options['server'], port)
+
+        try:
+            dataset = Dataset()
+            if process is not None:
+                asyncio.run(self.wait_for_server(host, port))
+            report = asyncio.run(self.run(host, port, dataset, mix, options))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.join()
+            if scratch is not None:
+                scratch.cleanup()
+
+        report['config'] = {
+            'server': options['url'] or options['server'],
+            'events': len(dataset.pks),
+            'concurrency': options['concurrency'],
+            'duration': options['duration'],
+            'warmup': options['warmup'],
+            'seed': options['seed'],
+            'mix': mix,
+        }
+        report['created'] = timezone.now().isoformat()
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(output + '\n')
+            total = report['total']
+            latency = total['latency_ms'] or {}
+            self.stdout.write(self.style.SUCCESS(
+                f"{total['requests']} requests, {total['rps']} rps, "
+                f"p50 {latency.get('p50')}ms, p99 {latency.get('p99')}ms, "
+                f"{total['errors']} errors; report written to {options['output']}"
+            ))
+        else:
+            self.stdout.write(output)
+
+    @staticmethod
+    def parse_mix(value):
+        if not value:
+            return dict(DEFAULT_MIX)
+        mix = {}
+        for item in value.split(','):
+            name, _, weight = item.partition('=')
+            name = name.strip()
+            if name not in DEFAULT_MIX:
+                raise CommandError(f"Unknown scenario {name!r}; choose from {', '.join(DEFAULT_MIX)}")
+            try:
+                mix[name] = float(weight) if weight else 1.0
+            except ValueError:
+                raise CommandError(f"Invalid weight for {name}: {weight!r}")
+        if not any(weight > 0 for weight in mix.values()):
+            raise CommandError('--mix needs a positive weight')
+        return mix
+
+    def use_database(self, path, events, seed):
+        """Point the default database at ``path``, generating data if it's new"""
+        exists = path.exists()
+        connections.close_all()
+        connection.settings_dict['NAME'] = str(path)
+        if exists:
+            self.stderr.write(f"Using {Event.objects.count()} events in {path}")
+            return
+
+        started = time.monotonic()
+        call_command('migrate', verbosity=0, interactive=False)
+        self.generate(events, random.Random(seed))
+        refresh_day_counts()
+        self.stderr.write(f"Generated {events} events in {time.monotonic() - started:.1f}s")
+
+    @staticmethod
+    def generate(events, rng):
+        categories = [Category.objects.create(name=name) for name in CATEGORIES]
+        venues = Venue.objects.bulk_create([
+            Venue(name=f'Venue {number}', address=f'{number} Main St', capacity=rng.choice([100, 300, 1000]))
+            for number in range(1, 51)
+        ])
+        # A year either side of now, so upcoming and archive-free past pages both exist
+        start = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=365)
+        for offset in range(0, events, BATCH_SIZE):
+            batch = []
+            for _ in range(min(BATCH_SIZE, events - offset)):
+                begins = start + timedelta(hours=rng.randrange(2 * 365 * 24))
+                batch.append(Event(
+                    title=' '.join(rng.sample(WORDS, 3)).title(),
+                    description=' '.join(rng.choices(WORDS, k=rng.randint(10, 60))),
+                    start_date=begins,
+                    end_date=begins + timedelta(hours=rng.randint(1, 6)),
+                    category=rng.choice(categories + [None]),
+                    venue=rng.choice(venues),
+                    expected_attendance=rng.randint(10, 500),
+                ))
+            batch = Event.objects.bulk_create(batch)
+            EventPost.objects.bulk_create([
+                EventPost(event=event, content=' '.join(rng.choices(WORDS, k=20)))
+                for event in batch
+                for _ in range(rng.choice([0, 0, 0, 1, 3]))
+            ])
+
+    @staticmethod
+    def free_port():
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    @staticmethod
+    def start_server(server, port):
+        # Forked so the child serves the database this process just switched to
+        connections.close_all()
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            raise CommandError('Serving needs fork(); start a server yourself and pass --url')
+        process = context.Process(target=serve, args=(server, port), daemon=True)
+        process.start()
+        return process
+
+    @staticmethod
+    async def wait_for_server(host, port, timeout=30):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                _, writer = await asyncio.open_connection(host, port)
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise CommandError(f'Server did not start on port {port}')
+                await asyncio.sleep(0.1)
+            else:
+                writer.close()
+                return
+
+    async def run(self, host, port, dataset, mix, options):
+        rng = random.Random(options['seed'])
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        results = {name: [] for name in names}
+        statuses = {}
+
+        async def worker(stop_at, measure):
+            client = Connection(host, port)
+            try:
+                while time.monotonic() < stop_at:
+                    scenario = rng.choices(names, weights)[0]
+                    path = dataset.path(scenario, rng)
+                    started = time.monotonic()
+                    try:
+                        status, _ = await asyncio.wait_for(client.get(path), options['timeout'])
+                    except asyncio.TimeoutError:
+                        status = 'timeout'
+                        client.close()
+                    except (OSError, ValueError, asyncio.IncompleteReadError) as exc:
+                        status = type(exc).__name__
+                        client.close()
+                    if measure:
+                        results[scenario].append((status, time.monotonic() - started))
+                        statuses[str(status)] = statuses.get(str(status), 0) + 1
+            finally:
+                client.close()
+
+        for seconds, measure in ((options['warmup'], False), (options['duration'], True)):
+            if seconds <= 0:
+                continue
+            started = time.monotonic()
+            await asyncio.gather(*(
+                worker(started + seconds, measure) for _ in range(options['concurrency'])
+            ))
+        elapsed = time.monotonic() - started
+
+        every = [result for scenario in results.values() for result in scenario]
+        return {
+            'total': summarize(every, elapsed),
+            'status_codes': dict(sorted(statuses.items())),
+            'scenarios': {
+                name: summarize(scenario, elapsed) for name, scenario in results.items() if scenario
+            },
+        }
@@ -0,0 +1,184 @@
+# management/commands/load_test_stream.py
+# Holds many idle connections open on /api/events/stream/ against a running
+# ASGI server and reports how changes reach them, e.g.:
+#   uvicorn eventsite.asgi:application --port 8000 &
+#   python manage.py load_test_stream --clients 2000 --duration 30 --touch 5
+# Both processes must use the same database so the server sees the touches.
+
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from eventlist.models import Event
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+class StreamClient:
+    """One simulated EventSource connection"""
+
+    def __init__(self, host, port, path):
+        self.host, self.port, self.path = host, port, path
+        self.connected = False
+        self.error = None
+        self.heartbeats = 0
+        self.received = {}  # event id -> monotonic receive time
+
+    async def run(self, stop):
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        except OSError as exc:
+            self.error = str(exc)
+            return
+        # HTTP/1.0 keeps the body free of chunked transfer framing
+        writer.write(
+            f'GET {self.path} HTTP/1.0\r\nHost: {self.host}\r\n'
+            'Accept: text/event-stream\r\n\r\n'.encode()
+        )
+        try:
+            status = await reader.readline()
+            if b' 200 ' not in status:
+                self.error = status.decode(errors='replace').strip() or 'no response'
+                return
+            self.connected = True
+            read = asyncio.ensure_future(self.read(reader))
+            await stop.wait()
+            read.cancel()
+        except OSError as exc:
+            self.error = str(exc)
+        finally:
+            writer.close()
+
+    async def read(self, reader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                self.error = 'closed by server'
+                return
+            if line.startswith(b': heartbeat'):
+                self.heartbeats += 1
+            elif line.startswith(b'data: '):
+                message = json.loads(line[6:])
+                if message.get('model') == 'event':
+                    self.received.setdefault(message['id'], time.monotonic())
+
+
+class Command(BaseCommand):
+    help = 'Load test the event stream with many simulated SSE clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            default=settings.EVENT_CACHE_WARM_BASE_URL.rstrip('/') + '/api/events/stream/',
+            help='Stream URL of the running ASGI server'
+        )
+        parser.add_argument(
+            '--clients',
+            type=int,
+            default=1000,
+            help='Number of concurrent connections'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=30,
+            help='Seconds to hold the connections open'
+        )
+        parser.add_argument(
+            '--touch',
+            type=int,
+            default=0,
+            help='Update this many events during the run and measure delivery'
+        )
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http':
+            raise CommandError('Only http:// URLs are supported')
+        self.raise_file_limit(options['clients'])
+        path = url.path + (f'?{url.query}' if url.query else '')
+        clients = [
+            StreamClient(url.hostname, url.port or 80, path)
+            for _ in range(options['clients'])
+        ]
+        touched = asyncio.run(self.run(clients, options['duration'], options['touch']))
+        self.report(clients, touched)
+
+    def raise_file_limit(self, clients):
+        if resource is None:
+            return
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < clients + 100:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    async def run(self, clients, duration, touch):
+        stop = asyncio.Event()
+        tasks = [asyncio.ensure_future(client.run(stop)) for client in clients]
+        started = time.monotonic()
+
+        # Let connections open before changing anything
+        while time.monotonic() - started < duration:
+            settled = sum(client.connected or client.error is not None for client in clients)
+            if settled == len(clients):
+                break
+            await asyncio.sleep(0.5)
+        connected = sum(client.connected for client in clients)
+        self.stdout.write(
+            f"{connected}/{len(clients)} clients connected in {time.monotonic() - started:.1f}s"
+        )
+
+        touched = {}
+        pks = await sync_to_async(list)(Event.objects.order_by('pk').values_list('pk', flat=True)[:touch])
+        for pk in pks:
+            touched[pk] = time.monotonic()
+            await sync_to_async(self.touch)(pk)
+            await asyncio.sleep(0.2)
+
+        await asyncio.sleep(max(0, duration - (time.monotonic() - started)))
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return touched
+
+    @staticmethod
+    def touch(pk):
+        # update() records the change without running Event.full_clean
+        Event.objects.filter(pk=pk).update(title=F('title'))
+
+    def report(self, clients, touched):
+        connected = [client for client in clients if client.connected]
+        errors = {}
+        for client in clients:
+            if client.error:
+                errors[client.error] = errors.get(client.error, 0) + 1
+
+        self.stdout.write(f"Connected: {len(connected)}/{len(clients)}")
+        for error, count in sorted(errors.items(), key=lambda item: -item[1]):
+            self.stdout.write(f"  {count} x {error}")
+        if connected:
+            heartbeats = statistics.mean(client.heartbeats for client in connected)
+            self.stdout.write(f"Heartbeats per client: {heartbeats:.1f}")
+
+        if touched and connected:
+            latencies = sorted(
+                client.received[pk] - touched_at
+                for client in connected
+                for pk, touched_at in touched.items()
+                if pk in client.received
+            )
+            expected = len(connected) * len(touched)
+            self.stdout.write(f"Delivered: {len(latencies)}/{expected}")
+            if latencies:
+                p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+                self.stdout.write(self.style.SUCCESS(
+                    f"Latency p50 {statistics.median(latencies) * 1000:.0f}ms, "
+                    f"p95 {p95 * 1000:.0f}ms, max {latencies[-1] * 1000:.0f}ms"
+                ))
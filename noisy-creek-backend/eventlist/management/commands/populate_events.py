@@ -1,21 +1,46 @@
 # management/commands/populate_events.py
 # Save this file as: your_app/management/commands/populate_events.py
 
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import datetime, timedelta
 import random
+from eventlist.bulk import DEFAULT_CHUNK_SIZE, chunked_delete
+from eventlist.cache import private_cache_warning
 from eventlist.models import Event, Category, Venue, EventPost 
 
 class Command(BaseCommand):
     help = 'Populate the database with sample events'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-warm',
+            action='store_true',
+            help='Skip warming the event cache after the import'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Rows deleted per transaction when clearing existing data'
+        )
+        parser.add_argument(
+            '--reset-only',
+            action='store_true',
+            help='Only clear existing data'
+        )
+
     def handle(self, *args, **options):
-        # Clear existing data
-        Event.objects.all().delete()
-        Category.objects.all().delete()
-        Venue.objects.all().delete()
-        EventPost.objects.all().delete()
+        # Clear existing data, children first, in bounded chunks
+        for model in (EventPost, Event, Category, Venue):
+            deleted = chunked_delete(
+                model.objects.all(), options['chunk_size'], progress=self.report_progress
+            )
+            for label, count in deleted.items():
+                self.stdout.write(f"Deleted {count} {label} rows")
+        if options['reset_only']:
+            return
 
         # Create Categories
         categories_data = [
@@ -250,8 +275,7 @@ class Command(BaseCommand):
                 start_date=start_date,
                 end_date=end_date,
                 category=categories[event_data['category']],
-                venue=venues[event_data['venue']],
-                location=f"{venues[event_data['venue']].name}, {venues[event_data['venue']].address}"
+                venue=venues[event_data['venue']]
             )
             events.append(event)
             self.stdout.write(f"Created event: {event.title}")
@@ -282,3 +306,15 @@ class Command(BaseCommand):
                 f'{len(venues)} venues, {len(events)} events, and 8 event posts'
             )
         )
+
+        # Post-import hook: precompute the hot pages for the new data
+        warning = private_cache_warning()
+        if warning:
+            self.stdout.write(self.style.WARNING(warning))
+        elif not options['no_warm']:
+            call_command('warm_event_cache', stdout=self.stdout)
+
+    def report_progress(self, label, count):
+        # Overwritten in place; the totals are written once each model is done
+        self.stdout.write(f"Deleting {label}: {count}", ending='\r')
+        self.stdout.flush()
@@ -0,0 +1,26 @@
+# management/commands/publish_read_snapshot.py
+# Publishes a new read-only snapshot of the event tables for read requests
+# (see eventlist/snapshots.py). Run it after imports when no worker is
+# running, or on a schedule, e.g. every 5 minutes:
+#   */5 * * * * cd /path/to/noisy-creek-backend && python manage.py publish_read_snapshot
+
+import time
+
+from django.core.management.base import BaseCommand
+from eventlist.cache import private_cache_warning
+from eventlist.snapshots import publish_snapshot
+
+class Command(BaseCommand):
+    help = 'Publish a read-only snapshot of the event tables for read requests'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        path = publish_snapshot()
+        elapsed = time.monotonic() - started
+        size = path.stat().st_size / 1024 / 1024
+        self.stdout.write(
+            self.style.SUCCESS(f"Published {path.name} ({size:.1f}MB) in {elapsed:.2f}s")
+        )
+        warning = private_cache_warning()
+        if warning:
+            self.stdout.write(self.style.WARNING(warning))
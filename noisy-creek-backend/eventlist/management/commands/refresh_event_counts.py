@@ -0,0 +1,20 @@
+# management/commands/refresh_event_counts.py
+# Rebuilds the per-day counts behind estimated list counts. Meant to run on a
+# schedule unless EVENT_COUNT_REFRESH_ON_WRITE is set, e.g. every 10 minutes:
+#   */10 * * * * cd /path/to/noisy-creek-backend && python manage.py refresh_event_counts
+
+import time
+
+from django.core.management.base import BaseCommand
+from eventlist.counts import refresh_day_counts
+
+class Command(BaseCommand):
+    help = 'Recount events per day and category for estimated list counts'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        rows = refresh_day_counts()
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {rows} day counts in {elapsed:.2f}s")
+        )
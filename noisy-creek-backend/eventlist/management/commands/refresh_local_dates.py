@@ -0,0 +1,28 @@
+# management/commands/refresh_local_dates.py
+# Recomputes the local_date/local_weekday columns of events and archived
+# events from start_date. Saves and bulk writes keep them current; run this
+# after changing EVENT_LOCAL_TIME_ZONE:
+#   python manage.py refresh_local_dates
+
+import time
+
+from django.core.management.base import BaseCommand
+from eventlist.bulk import DEFAULT_CHUNK_SIZE, refresh_local_dates
+from eventlist.models import ArchivedEvent, Event
+
+class Command(BaseCommand):
+    help = 'Recompute local dates and weekdays of events in EVENT_LOCAL_TIME_ZONE'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        changed = sum(
+            refresh_local_dates(model._base_manager.all(), options['chunk_size'])
+            for model in (Event, ArchivedEvent)
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated local dates of {changed} events in {elapsed:.2f}s")
+        )
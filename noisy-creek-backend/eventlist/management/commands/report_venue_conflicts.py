@@ -0,0 +1,38 @@
+# management/commands/report_venue_conflicts.py
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from eventlist.booking import all_conflicts, describe
+from eventlist.models import Event
+
+class Command(BaseCommand):
+    help = 'List events that overlap another event at the same venue beyond its capacity'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--venue',
+            type=int,
+            help='Only check the venue with this id'
+        )
+        parser.add_argument(
+            '--upcoming',
+            action='store_true',
+            help='Only check events that have not ended yet'
+        )
+
+    def handle(self, *args, **options):
+        events = Event.objects.all()
+        if options['venue'] is not None:
+            events = events.filter(venue_id=options['venue'])
+        if options['upcoming']:
+            events = events.filter(end_date__gt=timezone.now())
+
+        count = 0
+        for conflict in all_conflicts(events):
+            self.stdout.write(describe(conflict))
+            count += 1
+
+        if count:
+            self.stdout.write(self.style.WARNING(f"Found {count} conflicts"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No conflicts found"))
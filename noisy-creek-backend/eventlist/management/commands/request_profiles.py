@@ -0,0 +1,75 @@
+# management/commands/request_profiles.py
+# Lists and shows request profiles written by ProfilerMiddleware, and prints
+# tokens for the X-Profile header, e.g.:
+#   curl -H "X-Profile: $(python manage.py request_profiles --token)" http://localhost:8000/api/events/
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from eventlist.profiling import load_profile, make_token, profile_paths
+
+class Command(BaseCommand):
+    help = 'List stored request profiles, show one, or print a profiling token'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--show',
+            metavar='ID',
+            help='Print the top functions and slowest queries of one profile'
+        )
+        parser.add_argument(
+            '--token',
+            action='store_true',
+            help='Print a signed value for the X-Profile request header'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help='Functions and queries shown by --show (default: 10)'
+        )
+
+    def handle(self, *args, **options):
+        if options['token']:
+            self.stdout.write(make_token())
+        elif options['show']:
+            self.show(options['show'], options['limit'])
+        else:
+            self.list()
+
+    def list(self):
+        paths = profile_paths()
+        for path in reversed(paths):
+            profile = load_profile(path.stem)
+            created = datetime.fromtimestamp(profile['created']).strftime('%Y-%m-%d %H:%M:%S')
+            self.stdout.write(
+                f"{profile['id']}  {created}  {profile['status']}  {profile['ms']:>9.1f}ms  "
+                f"{len(profile['queries']):>4} queries  {profile['method']} {profile['path']}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"{len(paths)} profiles"))
+
+    def show(self, profile_id, limit):
+        try:
+            profile = load_profile(profile_id)
+        except FileNotFoundError:
+            raise CommandError(f"No profile {profile_id}")
+
+        query_ms = sum(query['ms'] for query in profile['queries'])
+        self.stdout.write(
+            f"{profile['method']} {profile['path']} -> {profile['status']} in {profile['ms']:.1f}ms, "
+            f"{len(profile['queries'])} queries taking {query_ms:.1f}ms"
+        )
+        self.stdout.write("")
+        if profile['profiler'] == 'pyinstrument':
+            self.stdout.write(profile['text'])
+        else:
+            self.stdout.write(f"{'cumtime':>10} {'tottime':>10} {'calls':>8}  function")
+            for row in profile['functions'][:limit]:
+                self.stdout.write(
+                    f"{row['cumtime'] * 1000:>8.1f}ms {row['tottime'] * 1000:>8.1f}ms "
+                    f"{row['calls']:>8}  {row['function']}"
+                )
+        self.stdout.write("")
+        self.stdout.write("Slowest queries:")
+        for query in sorted(profile['queries'], key=lambda query: -query['ms'])[:limit]:
+            self.stdout.write(f"{query['ms']:>8.1f}ms  {query['sql']}")
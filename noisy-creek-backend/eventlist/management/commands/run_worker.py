@@ -0,0 +1,53 @@
+# management/commands/run_worker.py
+# Runs queued background tasks; keep one or more running next to the web
+# processes, e.g. under systemd or supervisor:
+#   python manage.py run_worker --threads 2
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from eventlist.taskqueue import run_pending, start_worker_threads
+
+class Command(BaseCommand):
+    help = 'Run background tasks from the database task queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=1,
+            help='Worker threads in this process'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between checks when the queue is empty'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EVENT_TASK_BATCH_SIZE,
+            help='Tasks of one batch task run together'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run the tasks that are due now, then exit'
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            ran = run_pending(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Ran {ran} tasks"))
+            return
+
+        stop = start_worker_threads(
+            options['threads'], options['poll_interval'], options['batch_size']
+        )
+        self.stdout.write(f"Working the task queue with {options['threads']} threads (Ctrl+C to stop)")
+        try:
+            while not stop.wait(3600):
+                pass
+        except KeyboardInterrupt:
+            stop.set()
+            self.stdout.write("Stopping")
@@ -0,0 +1,71 @@
+# management/commands/warm_event_cache.py
+# Needs a shared cache backend (file, database, Memcached, Redis): warming a
+# local memory cache would only fill this command's own process. The
+# pre-fork server (eventsite/serve.py) warms its workers itself.
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from eventlist.cache import is_shared_cache
+from eventlist.warming import default_manifest, load_manifest, manifest_from_log, warm
+
+class Command(BaseCommand):
+    help = 'Precompute the most requested event list pages and event details into the cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--manifest',
+            default=settings.EVENT_CACHE_WARM_MANIFEST,
+            help='JSON file with "lists" (query param dicts) and "details" (event ids)'
+        )
+        parser.add_argument(
+            '--from-log',
+            help='Warm the most requested event URLs found in this access log'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=50,
+            help='Number of URLs to take from --from-log'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Size of the warming thread pool'
+        )
+        parser.add_argument(
+            '--base-url',
+            default=settings.EVENT_CACHE_WARM_BASE_URL,
+            help='Scheme and host clients use, e.g. https://events.example.com'
+        )
+
+    def handle(self, *args, **options):
+        if not is_shared_cache():
+            raise CommandError(
+                'The cache is local memory, private to this process, so warming it '
+                'does nothing for the web server. Configure a shared backend in CACHES.'
+            )
+        try:
+            if options['from_log']:
+                with open(options['from_log']) as log_file:
+                    manifest = manifest_from_log(log_file, top=options['top'])
+            elif options['manifest']:
+                manifest = load_manifest(options['manifest'])
+            else:
+                manifest = default_manifest()
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Could not read warm list: {exc}")
+
+        started = time.monotonic()
+        warmed, failed = warm(
+            manifest, base_url=options['base_url'], workers=max(options['workers'], 1)
+        )
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Warmed {warmed} cache entries in {elapsed:.2f}s")
+        )
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} entries did not return 200"))
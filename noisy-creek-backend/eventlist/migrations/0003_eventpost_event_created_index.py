@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventlist', '0002_remove_location_field'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventpost',
+            index=models.Index(fields=['event', '-created_at'], name='eventpost_event_created_idx'),
+        ),
+    ]
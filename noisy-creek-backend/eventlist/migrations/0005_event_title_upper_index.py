@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:32
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventlist', '0004_archivedevent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(django.db.models.functions.text.Upper('title'), name='event_title_upper_idx'),
+        ),
+    ]
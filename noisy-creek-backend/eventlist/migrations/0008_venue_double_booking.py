@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventlist', '0007_change'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedevent',
+            name='expected_attendance',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='expected_attendance',
+            field=models.PositiveIntegerField(blank=True, help_text="Expected number of attendees; lets overlapping events share a venue's capacity", null=True),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['venue', 'end_date'], name='event_venue_end_date_idx'),
+        ),
+    ]
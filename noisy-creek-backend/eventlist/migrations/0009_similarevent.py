@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventlist', '0008_venue_double_booking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text="Cosine similarity of the two events' vectors")),
+                ('rank', models.PositiveSmallIntegerField(help_text='1 for the most similar event')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='eventlist.event')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='eventlist.event')),
+            ],
+            options={
+                'ordering': ['event', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('event', 'rank'), name='similarevent_event_rank_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventlist', '0009_similarevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Event this one was flagged as a near-duplicate of', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='eventlist.event'),
+        ),
+    ]
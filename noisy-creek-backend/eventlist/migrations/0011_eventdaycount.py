@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventlist', '0010_event_duplicate_of'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventDayCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField()),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='eventlist.category')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'category'], name='eventdaycount_day_cat_idx')],
+            },
+        ),
+    ]
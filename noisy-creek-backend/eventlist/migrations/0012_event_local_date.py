@@ -0,0 +1,69 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:17
+
+import zoneinfo
+
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_local_dates(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    time_zone = zoneinfo.ZoneInfo(settings.EVENT_LOCAL_TIME_ZONE)
+    for model_name in ('Event', 'ArchivedEvent'):
+        model = apps.get_model('eventlist', model_name)
+        rows = model.objects.using(alias).order_by('pk').only('start_date')
+        last_pk = None
+        while True:
+            batch = list((rows if last_pk is None else rows.filter(pk__gt=last_pk))[:BATCH_SIZE])
+            if not batch:
+                break
+            for row in batch:
+                local = row.start_date.astimezone(time_zone)
+                row.local_date, row.local_weekday = local.date(), local.isoweekday()
+            model.objects.db_manager(alias).bulk_update(batch, ['local_date', 'local_weekday'])
+            last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventlist', '0011_eventdaycount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedevent',
+            name='local_date',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedevent',
+            name='local_weekday',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='local_date',
+            field=models.DateField(editable=False, help_text='Day the event starts on in EVENT_LOCAL_TIME_ZONE', null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='local_weekday',
+            field=models.PositiveSmallIntegerField(editable=False, help_text='ISO weekday of local_date (1 = Monday, 7 = Sunday)', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='archivedevent',
+            index=models.Index(fields=['local_date'], name='archivedevent_local_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['local_date'], name='event_local_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['local_weekday', 'start_date'], name='event_local_weekday_idx'),
+        ),
+        migrations.RunPython(backfill_local_dates, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,110 @@
-from django.db import models
+import functools
+import zoneinfo
+from datetime import datetime
+
+from django.conf import settings
+from django.db import models, transaction
 from django.core.validators import MinLengthValidator, MaxLengthValidator
 from django.core.exceptions import ValidationError
+from django.db.models.functions import Upper
+from django.dispatch import Signal
 from django.utils import timezone
 
-class Event(models.Model):
+# Sent by ChangeTrackingQuerySet after bulk writes, which don't send
+# post_save, with the ``pks`` written and the ``action`` ('create' or 'update').
+# ``bulk.chunked_delete`` sends it with 'delete' for its raw deletes.
+post_bulk_change = Signal()
+
+
+@functools.lru_cache
+def _time_zone(name):
+    return zoneinfo.ZoneInfo(name)
+
+
+def local_date_fields(start_date):
+    """``local_date`` and ``local_weekday`` (ISO, 1 is Monday) of an event
+    starting at ``start_date``, in ``EVENT_LOCAL_TIME_ZONE``"""
+    if start_date is None:
+        return {'local_date': None, 'local_weekday': None}
+    if timezone.is_naive(start_date):
+        start_date = timezone.make_aware(start_date)
+    local = timezone.localtime(start_date, _time_zone(settings.EVENT_LOCAL_TIME_ZONE))
+    return {'local_date': local.date(), 'local_weekday': local.isoweekday()}
+
+
+class LocalDateMixin:
+    """Keeps the ``local_date``/``local_weekday`` columns in step with ``start_date``"""
+
+    def set_local_date(self):
+        for name, value in local_date_fields(self.start_date).items():
+            setattr(self, name, value)
+
+    def save(self, *args, **kwargs):
+        self.set_local_date()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'start_date' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'local_date', 'local_weekday'}
+        super().save(*args, **kwargs)
+
+
+class ChangeTrackingQuerySet(models.QuerySet):
+    """QuerySet whose bulk writes send ``post_bulk_change``
+
+    ``bulk_create``, ``bulk_update`` and ``update`` skip the model signals the
+    change feed and the response cache listen to. ``bulk_update`` is covered
+    by ``update``, which it calls. Bulk deletes already send ``post_delete``
+    for every row, except for ``bulk.chunked_delete``, which sends this.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        # Rows skipped by ignore_conflicts come back without a pk
+        self._send_bulk_change([obj.pk for obj in objs if obj.pk is not None], 'create')
+        return objs
+
+    def update(self, **kwargs):
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list('pk', flat=True))
+            rows = super().update(**kwargs)
+            self._send_bulk_change(pks, 'update')
+        return rows
+
+    def _send_bulk_change(self, pks, action):
+        if pks:
+            post_bulk_change.send(sender=self.model, pks=pks, action=action)
+
+
+class EventQuerySet(ChangeTrackingQuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """Also fills in local dates, and checks the whole batch for venue
+        double-booking when enabled"""
+        objs = list(objs)
+        for obj in objs:
+            obj.set_local_date()
+        if settings.EVENT_PREVENT_DOUBLE_BOOKING:
+            from .booking import describe, find_batch_conflicts
+            conflicts = find_batch_conflicts(objs)
+            if conflicts:
+                raise ValidationError([describe(conflict) for conflict in conflicts])
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def update(self, **kwargs):
+        """Also moves the local dates along with a new ``start_date``"""
+        if 'start_date' not in kwargs:
+            return super().update(**kwargs)
+        if isinstance(kwargs['start_date'], datetime) or kwargs['start_date'] is None:
+            return super().update(**kwargs, **local_date_fields(kwargs['start_date']))
+
+        # An expression or string: read the new start dates back
+        from .bulk import refresh_local_dates
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list('pk', flat=True))
+            rows = super().update(**kwargs)
+            refresh_local_dates(self.model._base_manager.filter(pk__in=pks))
+        return rows
+
+
+class Event(LocalDateMixin, models.Model):
     title = models.CharField(
         max_length=200,
         validators=[MinLengthValidator(1)],
@@ -30,6 +131,33 @@ class Event(models.Model):
         blank=False,
         help_text="Event venue (required)"
     )
+    expected_attendance = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Expected number of attendees; lets overlapping events share a venue's capacity"
+    )
+    duplicate_of = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='duplicates',
+        help_text="Event this one was flagged as a near-duplicate of"
+    )
+    # Derived from start_date on every write, for day filters without
+    # per-row time zone math; see local_date_fields()
+    local_date = models.DateField(
+        null=True,
+        editable=False,
+        help_text="Day the event starts on in EVENT_LOCAL_TIME_ZONE"
+    )
+    local_weekday = models.PositiveSmallIntegerField(
+        null=True,
+        editable=False,
+        help_text="ISO weekday of local_date (1 = Monday, 7 = Sunday)"
+    )
+
+    objects = EventQuerySet.as_manager()
 
     def clean(self):
         """Custom validation for the Event model
@@ -38,7 +166,21 @@ class Event(models.Model):
         No additional sanitization needed for admin-only input.
         """
         super().clean()
-        
+        self.clean_schedule()
+
+        # Optionally reject overlaps with other events at the same venue
+        if (
+            settings.EVENT_PREVENT_DOUBLE_BOOKING
+            and self.start_date and self.end_date and self.venue_id
+        ):
+            from .booking import describe, find_conflicts
+            conflicts = find_conflicts(self)
+            if conflicts:
+                raise ValidationError({'start_date': [describe(c) for c in conflicts]})
+
+    def clean_schedule(self):
+        """Date rules that need no queries; ``bulk.apply_event_operations``
+        checks venue overlaps for a whole batch at once instead"""
         # Validate that end_date is after start_date
         if self.start_date and self.end_date:
             if self.end_date <= self.start_date:
@@ -52,6 +194,13 @@ class Event(models.Model):
                 'start_date': 'Events cannot be created more than 30 days in the past.'
             })
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets a save tell which calendar month the event moved out of
+        instance._loaded_start_date = dict(zip(field_names, values)).get('start_date')
+        return instance
+
     def save(self, *args, **kwargs):
         """Override save to run full validation"""
         self.full_clean()
@@ -63,6 +212,16 @@ class Event(models.Model):
     class Meta:
         ordering = ['-start_date']  # Order events by start date, newest first
         verbose_name_plural = "Events"
+        indexes = [
+            models.Index(fields=['start_date'], name='event_start_date_idx'),
+            # ?on= and ?weekend=/?weekday= filters
+            models.Index(fields=['local_date'], name='event_local_date_idx'),
+            models.Index(fields=['local_weekday', 'start_date'], name='event_local_weekday_idx'),
+            # Case-insensitive title prefix search in the admin
+            models.Index(Upper('title'), name='event_title_upper_idx'),
+            # Overlap lookups for double-booking checks
+            models.Index(fields=['venue', 'end_date'], name='event_venue_end_date_idx'),
+        ]
 
 
 class Category(models.Model):
@@ -78,6 +237,8 @@ class Category(models.Model):
         help_text="Category description (max 1000 characters)"
     )
 
+    objects = ChangeTrackingQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
@@ -101,6 +262,8 @@ class Venue(models.Model):
         help_text="Venue capacity (positive integer)"
     )
 
+    objects = ChangeTrackingQuerySet.as_manager()
+
     def __str__(self):
         return self.name
     
@@ -121,6 +284,8 @@ class EventPost(models.Model):
         help_text="Post creation timestamp"
     )
 
+    objects = ChangeTrackingQuerySet.as_manager()
+
     def clean(self):
         """Custom validation for EventPost model
         
@@ -138,4 +303,184 @@ class EventPost(models.Model):
         return f"Post for {self.event.title} at {self.created_at.strftime('%Y-%m-%d %H:%M:%S')}"
     
     class Meta:
-        ordering = ['-created_at']  
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            # Per-event feed pagination and latest-post lookups
+            models.Index(fields=['event', '-created_at'], name='eventpost_event_created_idx'),
+        ]
+
+
+class ArchivedEvent(LocalDateMixin, models.Model):
+    """Past events moved out of ``Event`` by the ``archive_events`` command
+
+    Keeps the original primary key and the same columns as ``Event`` so the
+    event serializers work unchanged on either table. Rows are never edited
+    once archived.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    start_date = models.DateTimeField()
+    end_date = models.DateTimeField()
+    category = models.ForeignKey(
+        'Category',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    venue = models.ForeignKey(
+        'Venue',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    expected_attendance = models.PositiveIntegerField(null=True, blank=True)
+    local_date = models.DateField(null=True, editable=False)
+    local_weekday = models.PositiveSmallIntegerField(null=True, editable=False)
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When the event was moved to the archive"
+    )
+
+    # Columns copied over from Event
+    EVENT_FIELDS = (
+        'id', 'title', 'description', 'start_date', 'end_date', 'category_id', 'venue_id',
+        'expected_attendance', 'local_date', 'local_weekday',
+    )
+
+    @classmethod
+    def from_event(cls, event):
+        return cls(**{name: getattr(event, name) for name in cls.EVENT_FIELDS})
+
+    def __str__(self):
+        return self.title
+
+    class Meta:
+        ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['start_date'], name='archivedevent_start_date_idx'),
+            models.Index(fields=['local_date'], name='archivedevent_local_date_idx'),
+        ]
+
+
+
+class Task(models.Model):
+    """Background work queued by ``taskqueue.enqueue`` and run by ``run_worker``
+
+    Finished tasks are deleted; failed ones are kept for inspection.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=200, help_text="Registered task name")
+    payload = models.JSONField(default=dict, blank=True)
+    dedupe_key = models.CharField(
+        max_length=64,
+        help_text="Hash of name and payload; identical pending tasks are queued once"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=32, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+    class Meta:
+        ordering = ['run_after']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='task_status_run_after_idx'),
+            models.Index(fields=['claimed_by'], name='task_claimed_by_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=models.Q(status='pending'),
+                name='task_unique_pending'
+            ),
+        ]
+
+
+class Change(models.Model):
+    """One create, update or delete of a tracked row, for the change feed
+
+    ``seq`` only ever grows, so a mirror can ask for everything after the last
+    ``seq`` it saw. Deletes are kept as tombstones. ``compact_changes`` drops
+    entries superseded by a later change to the same row.
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTION_CHOICES = [
+        (CREATE, 'Create'),
+        (UPDATE, 'Update'),
+        (DELETE, 'Delete'),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=20, help_text="Model name, e.g. event")
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=6, choices=ACTION_CHOICES)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    @classmethod
+    def record(cls, model, pks, action):
+        name = model._meta.model_name
+        return cls.objects.bulk_create(
+            [cls(model=name, object_id=pk, action=action) for pk in pks]
+        )
+
+    def __str__(self):
+        return f"#{self.seq} {self.action} {self.model} {self.object_id}"
+
+    class Meta:
+        ordering = ['seq']
+        indexes = [
+            # Finding superseded entries during compaction
+            models.Index(fields=['model', 'object_id', 'seq'], name='change_object_seq_idx'),
+        ]
+
+
+class SimilarEvent(models.Model):
+    """Precomputed nearest neighbour of an event, see ``similarity.py``"""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='neighbours')
+    similar = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(help_text="Cosine similarity of the two events' vectors")
+    rank = models.PositiveSmallIntegerField(help_text="1 for the most similar event")
+
+    def __str__(self):
+        return f"{self.event_id} -> {self.similar_id} ({self.score:.2f})"
+
+    class Meta:
+        ordering = ['event', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'rank'], name='similarevent_event_rank_unique'),
+        ]
+
+
+class EventDayCount(models.Model):
+    """Events starting on each day in each category, for estimated list counts
+
+    Rebuilt from ``Event`` by ``counts.refresh_day_counts``; between refreshes
+    it lags behind writes.
+    """
+    day = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, related_name='+')
+    count = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.day} {self.category_id}: {self.count}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['day', 'category'], name='eventdaycount_day_cat_idx'),
+        ]
@@ -0,0 +1,144 @@
+"""Row counts that stay cheap on large tables
+
+An exact ``COUNT(*)`` reads every matching row (or index entry), which on a
+table with millions of events costs more than rendering the page itself.
+"""
+from django.core.paginator import EmptyPage, Paginator
+from django.db import DatabaseError, connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+# Counts stop at this many rows; past it the number shown is a lower bound
+COUNT_LIMIT = 10000
+
+
+def estimate_row_count(model, using='default'):
+    """The planner's row estimate for ``model``'s table, or None
+
+    Reads ``pg_class.reltuples`` on PostgreSQL, ``information_schema`` on
+    MySQL and ``sqlite_stat1`` on SQLite (only filled in by ``ANALYZE``).
+    Estimates are as fresh as the last (auto)vacuum or analyze.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+        params = [connection.ops.quote_name(table)]
+    elif connection.vendor == 'mysql':
+        sql = (
+            'SELECT table_rows FROM information_schema.tables '
+            'WHERE table_schema = DATABASE() AND table_name = %s'
+        )
+        params = [table]
+    elif connection.vendor == 'sqlite':
+        # The first number of each stat is the row count of the table/index
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s ORDER BY idx IS NOT NULL LIMIT 1'
+        params = [table]
+    else:
+        return None
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None  # No statistics table yet
+    if not row or row[0] is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    # PostgreSQL reports -1 for tables that were never analyzed
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never runs an unbounded ``COUNT(*)``
+
+    An unfiltered queryset over a large table uses the database's row
+    estimate. Everything else is counted up to ``COUNT_LIMIT`` rows, which is
+    exact for selective filters and a lower bound otherwise. ``estimated``
+    tells whether ``count`` is exact.
+
+    Estimates lag behind writes and lower bounds leave rows out, so with an
+    estimated count a page links to the next one whenever more rows follow
+    it, and a page number past the estimated pages is checked against an
+    exact count before it is a 404.
+    """
+    count_limit = COUNT_LIMIT
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.has_filters():
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.count_limit:
+                self.estimated = True
+                return estimate
+        counted = queryset[:self.count_limit].count()
+        self.estimated = counted >= self.count_limit
+        return counted
+
+    @cached_property
+    def num_pages(self):
+        count = self.count
+        if self.estimated:
+            return count // self.per_page + 1
+        return super().num_pages
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.estimated or int(number) < 1:
+                raise
+        self.__dict__['count'] = self.object_list.count()
+        self.__dict__.pop('num_pages', None)
+        self.estimated = False
+        return super().validate_number(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.estimated:
+            return super().page(number)
+        # Not cut off at the estimated count, which may be short, and one row
+        # more than the page shows tells whether there is a next page
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if len(rows) > self.per_page:
+            self.__dict__['num_pages'] = max(self.num_pages, number + 1)
+        return self._get_page(rows[:self.per_page], number, self)
+
+
+class ApproximateCountPaginator(EstimatedCountPaginator):
+    """Paginator for API lists that only estimates large counts
+
+    Counts up to ``COUNT_LIMIT`` rows exactly. Past that it uses
+    ``estimate()`` when it returns a number, then the planner's row estimate
+    for an unfiltered queryset, and only then a full count.
+    """
+
+    def __init__(self, object_list, per_page, estimate=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.estimate = estimate
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            # e.g. MergedQuerySet, which can't cap a count
+            return super(EstimatedCountPaginator, self).count
+        counted = queryset[:self.count_limit].count()
+        if counted < self.count_limit:
+            return counted
+
+        estimate = self.estimate() if self.estimate is not None else None
+        if estimate is None and not queryset.query.has_filters():
+            estimate = estimate_row_count(queryset.model, queryset.db)
+        if estimate is None:
+            return queryset.count()
+        self.estimated = True
+        # The estimate may lag behind; it is at least what was counted
+        return max(estimate, counted)
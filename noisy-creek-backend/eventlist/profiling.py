@@ -0,0 +1,223 @@
+"""On-demand profiling of single requests
+
+A request is profiled only when it carries an ``X-Profile`` header holding a
+token from ``manage.py request_profiles --token``, or when a staff user adds
+``?profile=1``. Everything else passes straight through, after one header
+and one query param lookup.
+
+A profiled request runs under pyinstrument (a sampling profiler) when it is
+installed and cProfile otherwise, with every SQL query and its duration
+captured. It skips the response cache, so the profile shows the work a
+cache miss does rather than a cache hit. The result is written as JSON to ``EVENT_PROFILE_DIR``, which
+keeps only the newest ``EVENT_PROFILE_KEEP`` profiles, and its id is sent
+back in the ``X-Profile-Id`` response header.
+
+Under ASGI, sync views run in the request's thread-sensitive thread rather
+than on the event loop, and so do the ORM calls of async code. The profiler
+and the query log are started in that thread.
+"""
+import cProfile
+import json
+import os
+import pstats
+import tempfile
+import time
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+
+from .cache import bypass_cache
+
+try:
+    import pyinstrument
+except ImportError:  # Optional; cProfile is used without it
+    pyinstrument = None
+
+HEADER = 'HTTP_X_PROFILE'
+QUERY_PARAM = 'profile'
+TOKEN_SALT = 'eventlist.profiling'
+# Functions kept per cProfile profile, by cumulative time
+TOP_FUNCTIONS = 50
+
+
+def make_token():
+    """Signed value for the ``X-Profile`` header"""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign('profile')
+
+
+def has_valid_token(value):
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            value, max_age=settings.EVENT_PROFILE_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:  # Includes expired tokens
+        return False
+    return True
+
+
+def should_profile(request):
+    token = request.META.get(HEADER)
+    if token:
+        return has_valid_token(token)
+    if QUERY_PARAM in request.GET:
+        user = getattr(request, 'user', None)
+        return bool(user and user.is_staff)
+    return False
+
+
+class QueryLog:
+    """``execute_wrapper`` that records each query and its duration"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'ms': round((time.perf_counter() - started) * 1000, 3),
+                'alias': context['connection'].alias,
+            })
+
+
+class Profiler:
+    """Profiles the code run inside ``with``, see ``result()``"""
+
+    def __init__(self):
+        self.queries = QueryLog()
+        self._stack = ExitStack()
+        if pyinstrument is not None:
+            self._profiler = pyinstrument.Profiler(async_mode='enabled')
+        else:
+            self._profiler = cProfile.Profile()
+
+    def __enter__(self):
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self.queries))
+        self._started = time.perf_counter()
+        if pyinstrument is not None:
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if pyinstrument is not None:
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+        self.duration = time.perf_counter() - self._started
+        self._stack.close()
+
+    def result(self):
+        if pyinstrument is not None:
+            return {'profiler': 'pyinstrument', 'text': self._profiler.output_text(unicode=True)}
+
+        stats = pstats.Stats(self._profiler)
+        functions = [
+            {
+                'function': pstats.func_std_string(function),
+                'calls': calls,
+                'tottime': round(tottime, 6),
+                'cumtime': round(cumtime, 6),
+            }
+            for function, (_, calls, tottime, cumtime, _) in stats.stats.items()
+        ]
+        functions.sort(key=lambda row: row['cumtime'], reverse=True)
+        return {'profiler': 'cProfile', 'functions': functions[:TOP_FUNCTIONS]}
+
+
+def profile_dir():
+    path = settings.EVENT_PROFILE_DIR or Path(tempfile.gettempdir()) / 'noisy-creek-profiles'
+    return Path(path)
+
+
+def save_profile(request, response, profiler):
+    """Write a profile to the ring buffer and return its id"""
+    # Ids sort by creation time, which is what pruning relies on
+    profile_id = f'{time.time_ns()}-{uuid.uuid4().hex[:8]}'
+    data = {
+        'id': profile_id,
+        'created': time.time(),
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        'ms': round(profiler.duration * 1000, 3),
+        'queries': profiler.queries.queries,
+        **profiler.result(),
+    }
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    # Written under a temporary name so readers never see a partial file
+    temporary = directory / f'.{profile_id}.tmp'
+    temporary.write_text(json.dumps(data))
+    os.replace(temporary, directory / f'{profile_id}.json')
+    prune_profiles(directory, settings.EVENT_PROFILE_KEEP)
+    return profile_id
+
+
+def profile_paths(directory=None):
+    """Stored profiles, oldest first"""
+    return sorted((directory or profile_dir()).glob('*.json'))
+
+
+def prune_profiles(directory, keep):
+    for path in profile_paths(directory)[:-keep or None]:
+        path.unlink(missing_ok=True)
+
+
+def load_profile(profile_id):
+    path = profile_dir() / f'{profile_id}.json'
+    return json.loads(path.read_text())
+
+
+class ProfilerMiddleware:
+    """Profile requests that ask for it, see the module docstring
+
+    Goes after ``AuthenticationMiddleware`` so ``?profile=1`` can check for
+    a staff user.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not should_profile(request):
+            return self.get_response(request)
+        with bypass_cache(), Profiler() as profiler:
+            response = self.get_response(request)
+        response['X-Profile-Id'] = save_profile(request, response, profiler)
+        return response
+
+    async def __acall__(self, request):
+        if HEADER not in request.META and QUERY_PARAM not in request.GET:
+            return await self.get_response(request)
+        # Checking for staff may load the user from the database
+        if not await sync_to_async(should_profile)(request):
+            return await self.get_response(request)
+
+        profiler = Profiler()
+        # Database connections and cProfile are per thread: start both in
+        # the thread the view's sync code runs in
+        await sync_to_async(profiler.__enter__)()
+        try:
+            with bypass_cache():
+                response = await self.get_response(request)
+        finally:
+            await sync_to_async(profiler.__exit__)(None, None, None)
+        response['X-Profile-Id'] = await sync_to_async(save_profile)(request, response, profiler)
+        return response
@@ -0,0 +1,119 @@
+"""Renderers and parsers for the event API
+
+``FastJSONRenderer`` and ``FastJSONParser`` use orjson when it is installed
+and fall back to DRF's stdlib-based classes when it isn't. They are the
+project defaults (see ``REST_FRAMEWORK`` in settings); a view can still pick
+its own with ``renderer_classes``/``parser_classes``.
+
+``MessagePackRenderer`` and ``MessagePackParser`` need the optional msgpack
+package; ``MESSAGEPACK_RENDERERS``/``MESSAGEPACK_PARSERS`` are empty without it.
+"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional binary format
+    msgpack = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when available
+
+    Produces the same bytes as ``JSONRenderer`` for API data: compact
+    separators, unescaped unicode, ``Z`` suffix for UTC datetimes and DRF's
+    encoding of decimals, lazy strings and other types via the same
+    ``JSONEncoder.default``. Floats are the exception: orjson writes some in
+    other notation (``1e16`` for ``1e+16``, ``0.00001`` for ``1e-05``), the
+    same numbers, and NaN and infinities as ``null`` where ``JSONRenderer``
+    raises ``ValueError`` (strict JSON). Finding them would mean walking all
+    the data, about as slow as encoding it; the API's only floats are
+    similarity scores between 0 and 1. Indented output (browsable API,
+    ``indent=`` media type param) and anything orjson can't encode, such as
+    integers wider than 64 bits, go through ``JSONRenderer``.
+    """
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            or self.ensure_ascii
+            or not self.compact
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self._encoder.default,
+                option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same escaping JSONRenderer applies, so output can be embedded in JS
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser that decodes with orjson when available"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            raw = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                raw = raw.decode(encoding)
+            return orjson.loads(raw)
+        except (orjson.JSONDecodeError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Binary rendering of the same data structure as the JSON renderers
+
+    Datetimes are encoded as MessagePack timestamps, so serializers leave
+    them as ``datetime`` objects when this renderer is selected (see
+    ``native_datetimes``). Other non-native types are encoded the way
+    ``JSONRenderer`` encodes them.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    native_datetimes = True
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, datetime=True, default=self._encoder.default)
+
+
+class MessagePackParser(BaseParser):
+    """Parses MessagePack request bodies; timestamps become aware datetimes"""
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), timestamp=3, strict_map_key=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
+
+
+MESSAGEPACK_RENDERERS = [MessagePackRenderer] if msgpack else []
+MESSAGEPACK_PARSERS = [MessagePackParser] if msgpack else []
@@ -1,5 +1,102 @@
+from functools import lru_cache
+
 from rest_framework import serializers
-from .models import Event, Category, Venue, EventPost
+from .models import Event, Category, Venue, EventPost, SimilarEvent
+
+
+@lru_cache(maxsize=None)
+def exposed_fields(serializer_class):
+    """Whitelist of field paths a client may ask for on ``serializer_class``
+
+    Maps each top-level field name to ``None`` for plain fields, or to the
+    frozenset of the nested serializer's field names.
+    """
+    include = getattr(serializer_class, 'optional_fields', ())
+    exposed = {}
+    for name, field in serializer_class(context={'include': include}).fields.items():
+        if isinstance(field, serializers.Serializer):
+            exposed[name] = frozenset(field.fields)
+        else:
+            exposed[name] = None
+    return exposed
+
+
+def parse_fieldset(value, serializer_class):
+    """Parse a ``fields=`` query param such as ``id,title,venue.name``
+
+    Returns a dict mapping top-level names to ``None`` (whole field) or a set
+    of nested names, or ``None`` if nothing valid was requested. Paths that
+    are not exposed by the serializer are ignored.
+    """
+    exposed = exposed_fields(serializer_class)
+    fieldset = {}
+    for path in value.split(','):
+        name, _, nested_name = path.strip().partition('.')
+        if name not in exposed:
+            continue
+        if not nested_name:
+            fieldset[name] = None
+        elif exposed[name] and nested_name in exposed[name]:
+            if name in fieldset and fieldset[name] is None:
+                continue  # Whole nested object already requested
+            fieldset.setdefault(name, set()).add(nested_name)
+    return fieldset or None
+
+
+class SparseFieldsetMixin:
+    """Trim output to the fieldset passed as ``context['fields']``
+
+    Names in ``optional_fields`` are only serialized when they are part of the
+    fieldset or listed in ``context['include']``.
+    """
+    optional_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fieldset = self.context.get('fields')
+        include = set(self.context.get('include', ())) | set(fieldset or ())
+        for name in set(self.optional_fields) - include:
+            self.fields.pop(name, None)
+
+        if not fieldset:
+            return
+
+        for name in set(self.fields) - set(fieldset):
+            self.fields.pop(name)
+
+        for name, nested_names in fieldset.items():
+            if nested_names is None:
+                continue
+            nested = self.fields[name]
+            for nested_name in set(nested.fields) - nested_names:
+                nested.fields.pop(nested_name)
+
+
+class NativeDateTimeMixin:
+    """Leave datetimes as ``datetime`` objects when ``context['native_datetimes']``
+    is set, for renderers with their own timestamp type"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.set_datetime_format()
+
+    def bind(self, field_name, parent):
+        super().bind(field_name, parent)
+        # A nested serializer is created before it can see the root's context
+        self.set_datetime_format()
+
+    def set_datetime_format(self):
+        if self.context.get('native_datetimes'):
+            for field in self.fields.values():
+                if isinstance(field, serializers.DateTimeField):
+                    field.format = None
+
+    def format_datetime(self, value):
+        field = serializers.DateTimeField()
+        if self.context.get('native_datetimes'):
+            field.format = None
+        return field.to_representation(value)
+
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -11,19 +108,64 @@ class VenueSerializer(serializers.ModelSerializer):
         model = Venue
         fields = ['id', 'name', 'address', 'capacity']
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(SparseFieldsetMixin, NativeDateTimeMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     venue = VenueSerializer(read_only=True)
-    
+    # Only present when the queryset is annotated with post stats
+    post_count = serializers.IntegerField(read_only=True)
+    latest_post = serializers.SerializerMethodField()
+
+    optional_fields = ('post_count', 'latest_post')
+
     class Meta:
         model = Event
         fields = [
             'id', 'title', 'description', 'start_date', 'end_date', 
-            'category', 'venue'
+            'category', 'venue', 'post_count', 'latest_post'
+        ]
+
+    def get_latest_post(self, event):
+        if event.latest_post_id is None:
+            return None
+        return {
+            'id': event.latest_post_id,
+            'content': event.latest_post_content,
+            'created_at': self.format_datetime(event.latest_post_created_at),
+        }
+
+
+class NormalizedEventSerializer(SparseFieldsetMixin, NativeDateTimeMixin, serializers.ModelSerializer):
+    """Event with venue/category as ids, for pages that sideload them once"""
+    category_id = serializers.IntegerField(read_only=True, allow_null=True)
+    venue_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Event
+        fields = [
+            'id', 'title', 'description', 'start_date', 'end_date',
+            'category_id', 'venue_id'
         ]
 
 
-class EventPostSerializer(serializers.ModelSerializer):
+class SimilarEventSerializer(serializers.ModelSerializer):
+    event = EventSerializer(source='similar', read_only=True)
+
+    class Meta:
+        model = SimilarEvent
+        fields = ['score', 'event']
+
+
+class CalendarEventSerializer(NativeDateTimeMixin, serializers.ModelSerializer):
+    """Compact event for calendar grid cells"""
+    category_id = serializers.IntegerField(read_only=True, allow_null=True)
+    venue_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Event
+        fields = ['id', 'title', 'start_date', 'end_date', 'category_id', 'venue_id']
+
+
+class EventPostSerializer(NativeDateTimeMixin, serializers.ModelSerializer):
     class Meta:
         model = EventPost
         fields = ['id', 'event', 'content', 'created_at']
@@ -0,0 +1,150 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .cache import bump_generation
+from .calendar import invalidate_all_months, invalidate_months
+from .changes import is_recording
+from .counts import local_day
+from .models import Category, Change, Event, EventPost, Venue, post_bulk_change
+from .stream import publish_on_commit
+from .tasks import index_similar_events, publish_read_snapshot, refresh_event_counts, rewarm_event_cache
+
+CACHED_MODELS = (Event, Venue, Category, EventPost)
+# Models the change feed reports on
+TRACKED_MODELS = (Event, Venue, Category)
+
+
+def invalidate(bump, *args):
+    """Run ``bump(*args)`` now and again once the write commits
+
+    A request between the two still reads the old rows and may cache them
+    under the new generation; the second bump makes that entry stale.
+    """
+    bump(*args)
+    transaction.on_commit(lambda: bump(*args))
+
+
+def invalidate_event_cache(sender, **kwargs):
+    """Any write to data the API serves starts a new cache generation"""
+    invalidate(bump_generation)
+
+
+def invalidate_calendar_on_save(sender, instance, created, **kwargs):
+    """Calendars of the months the event was in and is now in are stale"""
+    previous = getattr(instance, '_loaded_start_date', None)
+    if created or previous is not None:
+        invalidate(invalidate_months, [previous, instance.start_date])
+    else:
+        invalidate(invalidate_all_months)  # Not loaded from the database, old month unknown
+
+
+def invalidate_calendar_on_delete(sender, instance, **kwargs):
+    invalidate(invalidate_months, [instance.start_date])
+
+
+def invalidate_calendar_on_bulk_change(sender, pks, action, **kwargs):
+    if action == 'create':
+        start_dates = list(Event.objects.filter(pk__in=pks).values_list('start_date', flat=True))
+        invalidate(invalidate_months, start_dates)
+    else:
+        invalidate(invalidate_all_months)  # Where updated events were before is unknown
+
+
+def queue_cache_rewarm(sender, instance, **kwargs):
+    """Re-warm the cache in the background once the write commits"""
+    if not settings.EVENT_CACHE_REWARM_ON_WRITE:
+        return
+    payload = {'event': instance.pk} if sender is Event else {}
+    transaction.on_commit(lambda: rewarm_event_cache.enqueue(payload))
+
+
+def queue_count_refresh(days=None):
+    if not settings.EVENT_COUNT_REFRESH_ON_WRITE:
+        return
+    payload = {} if days is None else {'days': sorted({local_day(day).isoformat() for day in days if day})}
+    transaction.on_commit(lambda: refresh_event_counts.enqueue(payload))
+
+
+def queue_count_refresh_on_save(sender, instance, **kwargs):
+    queue_count_refresh([getattr(instance, '_loaded_start_date', None), instance.start_date])
+
+
+def queue_count_refresh_on_delete(sender, instance, **kwargs):
+    queue_count_refresh([instance.start_date])
+
+
+def queue_count_refresh_on_bulk_change(sender, pks, action, **kwargs):
+    # Days of updated or deleted rows are no longer known; recount them all
+    queue_count_refresh(None if action != 'create' else Event.objects.filter(
+        pk__in=pks
+    ).values_list('start_date', flat=True))
+
+
+def queue_similar_events(sender, instance, created, **kwargs):
+    if created and settings.EVENT_SIMILAR_INDEX_ON_CREATE:
+        transaction.on_commit(lambda: index_similar_events.enqueue({'event': instance.pk}))
+
+
+def queue_similar_events_bulk(sender, pks, action, **kwargs):
+    if action == 'create' and settings.EVENT_SIMILAR_INDEX_ON_CREATE:
+        transaction.on_commit(lambda: index_similar_events.enqueue({}))
+
+
+def queue_snapshot_publish(sender, **kwargs):
+    """Publish a new read snapshot once the burst of writes is over"""
+    if settings.EVENT_READ_SNAPSHOTS:
+        delay = settings.EVENT_SNAPSHOT_DELAY
+        transaction.on_commit(lambda: publish_read_snapshot.enqueue(delay=delay))
+
+
+def remember_start_date(sender, instance, **kwargs):
+    """The saved start date is where the next save moves the event from"""
+    instance._loaded_start_date = instance.start_date
+
+
+def record_save(sender, instance, created, **kwargs):
+    if not is_recording():
+        return
+    changes = Change.record(sender, [instance.pk], Change.CREATE if created else Change.UPDATE)
+    publish_on_commit(changes, getattr(instance, 'category_id', False))
+
+
+def record_delete(sender, instance, **kwargs):
+    if not is_recording():
+        return
+    changes = Change.record(sender, [instance.pk], Change.DELETE)
+    publish_on_commit(changes, getattr(instance, 'category_id', False))
+
+
+def record_bulk_change(sender, pks, action, **kwargs):
+    if not is_recording():
+        return
+    publish_on_commit(Change.record(sender, pks, action))
+
+
+for model in CACHED_MODELS:
+    post_save.connect(invalidate_event_cache, sender=model)
+    post_delete.connect(invalidate_event_cache, sender=model)
+    post_bulk_change.connect(invalidate_event_cache, sender=model)
+    post_save.connect(queue_cache_rewarm, sender=model)
+    post_delete.connect(queue_cache_rewarm, sender=model)
+    post_save.connect(queue_snapshot_publish, sender=model)
+    post_delete.connect(queue_snapshot_publish, sender=model)
+    post_bulk_change.connect(queue_snapshot_publish, sender=model)
+
+post_save.connect(invalidate_calendar_on_save, sender=Event)
+post_delete.connect(invalidate_calendar_on_delete, sender=Event)
+post_bulk_change.connect(invalidate_calendar_on_bulk_change, sender=Event)
+post_save.connect(queue_count_refresh_on_save, sender=Event)
+post_delete.connect(queue_count_refresh_on_delete, sender=Event)
+post_bulk_change.connect(queue_count_refresh_on_bulk_change, sender=Event)
+post_save.connect(queue_similar_events, sender=Event)
+post_bulk_change.connect(queue_similar_events_bulk, sender=Event)
+# After every receiver that reads the previous start date
+post_save.connect(remember_start_date, sender=Event)
+
+for model in TRACKED_MODELS:
+    post_save.connect(record_save, sender=model)
+    post_delete.connect(record_delete, sender=model)
+    post_bulk_change.connect(record_bulk_change, sender=model)
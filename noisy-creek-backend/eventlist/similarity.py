@@ -0,0 +1,174 @@
+"""Similar-event recommendations from a precomputed neighbour table
+
+Each event is turned into a hashed bag-of-words vector over its title,
+description, category and venue, weighted by TF-IDF and normalized, so the
+dot product of two vectors is their cosine similarity. Scoring every pair
+is a matrix product, done a block of rows at a time so memory stays at
+``block_size`` x events scores rather than events x events. The top
+``top_k`` neighbours of each event are stored in ``SimilarEvent`` and the
+API reads them back with a single query.
+
+Incremental runs only score events that have no neighbours yet against
+everything, and everything else against just those events, replacing an
+existing neighbour only when a new event beats it. Neighbours of edited
+events and IDF weights go stale over time; a periodic full rebuild
+(``build_similar_events --full``) refreshes them.
+
+Needs the optional numpy package.
+"""
+import math
+import re
+import zlib
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+from .models import Event, SimilarEvent
+
+try:
+    import numpy as np
+except ImportError:  # Optional; recommendations can't be built without it
+    np = None
+
+# Hashed feature space; collisions only blur scores a little
+DIMENSIONS = 2 ** 10
+DEFAULT_TOP_K = 10
+DEFAULT_BLOCK_SIZE = 512
+
+FIELD_WEIGHTS = {
+    'title': 2.0,
+    'description': 1.0,
+    'category': 3.0,
+    'venue': 1.0,
+}
+
+WORD_RE = re.compile(r'\w{2,}')
+
+
+def features(title, description, category_id, venue_id):
+    """``(token, weight)`` pairs of one event"""
+    for field, text in (('title', title), ('description', description)):
+        for word in WORD_RE.findall((text or '').lower()):
+            yield word, FIELD_WEIGHTS[field]
+    if category_id is not None:
+        yield f'category:{category_id}', FIELD_WEIGHTS['category']
+    yield f'venue:{venue_id}', FIELD_WEIGHTS['venue']
+
+
+def vectorize(rows):
+    """Unit-length TF-IDF vectors, one row per ``(title, description,
+    category_id, venue_id)``, as a float32 matrix"""
+    vectors = np.zeros((len(rows), DIMENSIONS), dtype=np.float32)
+    for index, row in enumerate(rows):
+        for token, weight in features(*row):
+            digest = zlib.crc32(token.encode())
+            # The sign bit keeps colliding tokens from only ever adding up
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vectors[index, digest % DIMENSIONS] += sign * weight
+
+    # Dampen repeated words, then weight rare features up
+    np.copyto(vectors, np.sign(vectors) * np.log1p(np.abs(vectors)))
+    document_frequency = np.count_nonzero(vectors, axis=0)
+    vectors *= (np.log((1 + len(rows)) / (1 + document_frequency)) + 1).astype(np.float32)
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    vectors /= norms
+    return vectors
+
+
+def top_neighbours(scores, top_k):
+    """``[(column, score), ...]`` of the ``top_k`` best positive scores per row"""
+    count = min(top_k, scores.shape[1])
+    if count == 0:
+        return [[] for _ in range(scores.shape[0])]
+    top = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    return [
+        [(int(column), float(score)) for column, score in zip(columns, row_scores) if score > 0]
+        for columns, row_scores in zip(top, top_scores)
+    ]
+
+
+def save_neighbours(neighbours):
+    """Replace the stored neighbours of each event in ``{pk: [(pk, score)]}``"""
+    with transaction.atomic():
+        SimilarEvent.objects.filter(event_id__in=list(neighbours)).delete()
+        SimilarEvent.objects.bulk_create([
+            SimilarEvent(event_id=pk, similar_id=similar_pk, score=score, rank=rank)
+            for pk, links in neighbours.items()
+            for rank, (similar_pk, score) in enumerate(links, start=1)
+        ])
+
+
+def build_similar_events(top_k=DEFAULT_TOP_K, block_size=DEFAULT_BLOCK_SIZE, full=False, event_ids=None):
+    """Compute and store neighbours, returning how many events were updated
+
+    By default events without neighbours (or those in ``event_ids``) are
+    added to the index; ``full`` recomputes every event.
+    """
+    if np is None:
+        raise ImproperlyConfigured('Similar events need numpy installed')
+
+    rows = list(Event.objects.order_by('pk').values_list(
+        'pk', 'title', 'description', 'category_id', 'venue_id'
+    ))
+    if not rows:
+        return 0
+    pks = np.array([row[0] for row in rows])
+    vectors = vectorize([row[1:] for row in rows])
+
+    if full:
+        new = np.arange(len(rows))
+    else:
+        if event_ids is None:
+            indexed = set(SimilarEvent.objects.values_list('event_id', flat=True).distinct())
+            event_ids = set(pks.tolist()) - indexed
+        new = np.flatnonzero(np.isin(pks, list(event_ids)))
+    if not len(new):
+        return 0
+    updated = 0
+
+    # New events against every event
+    for start in range(0, len(new), block_size):
+        block = new[start:start + block_size]
+        scores = vectors[block] @ vectors.T
+        scores[np.arange(len(block)), block] = -np.inf
+        save_neighbours({
+            int(pks[row]): [(int(pks[column]), score) for column, score in links]
+            for row, links in zip(block, top_neighbours(scores, top_k))
+        })
+        updated += len(block)
+    if full:
+        return updated
+
+    # Existing events against just the new ones
+    existing = np.setdiff1d(np.arange(len(rows)), new)
+    new_vectors = vectors[new]
+    for start in range(0, len(existing), block_size):
+        block = existing[start:start + block_size]
+        scores = vectors[block] @ new_vectors.T
+        candidates = top_neighbours(scores, top_k)
+        block_pks = [int(pks[row]) for row in block]
+        stored = {pk: [] for pk in block_pks}
+        for event_id, similar_id, score in SimilarEvent.objects.filter(
+            event_id__in=block_pks
+        ).values_list('event_id', 'similar_id', 'score'):
+            stored[event_id].append((similar_id, score))
+
+        changed = {}
+        for pk, links in zip(block_pks, candidates):
+            current = stored[pk]
+            worst = min((score for _, score in current), default=-math.inf)
+            links = [(int(pks[new[column]]), score) for column, score in links]
+            if links and (len(current) < top_k or links[0][1] > worst):
+                merged = dict(current)
+                merged.update(links)
+                changed[pk] = sorted(merged.items(), key=lambda link: -link[1])[:top_k]
+        if changed:
+            save_neighbours(changed)
+            updated += len(changed)
+    return updated
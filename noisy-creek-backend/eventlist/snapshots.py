@@ -0,0 +1,207 @@
+"""Read-only SQLite snapshots of the event data for read traffic
+
+Event reads far outnumber writes, and writes arrive in bursts from imports.
+With ``EVENT_READ_SNAPSHOTS`` set, a burst of writes queues one
+``publish_read_snapshot`` task (``EVENT_SNAPSHOT_DELAY`` seconds later, so
+the burst is over). The task copies the tables the read endpoints use into a
+new, compact SQLite file (a generation) inside one read transaction, then
+points the ``CURRENT`` file in ``EVENT_SNAPSHOT_DIR`` at it with an atomic
+rename.
+
+``GET`` requests under ``/api/events/`` read those tables from the newest
+generation instead of the main database, through the ``snapshot`` database
+alias. The file is opened with ``immutable=1``, so SQLite takes no locks and
+never checks for changes, and is memory-mapped (see the alias ``OPTIONS``).
+Each request picks the generation current when it starts and uses it
+throughout; the next request on that thread reconnects to a newer one.
+Writes always go to the main database, so reads lag writes until the next
+publish. Old generations are deleted once ``EVENT_SNAPSHOT_KEEP`` newer ones
+exist, leaving time for requests still reading them to finish.
+"""
+import os
+import sqlite3
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .cache import bump_generation
+from .calendar import invalidate_all_months
+from .models import ArchivedEvent, Category, Event, EventDayCount, EventPost, SimilarEvent, Venue
+
+SNAPSHOT_ALIAS = 'snapshot'
+POINTER = 'CURRENT'
+PATH_PREFIX = '/api/events/'
+# Everything the read endpoints query; a snapshot holds these tables only
+SNAPSHOT_MODELS = (Event, Venue, Category, EventPost, ArchivedEvent, SimilarEvent, EventDayCount)
+
+# Snapshot file the current request reads, if any
+_request_snapshot = ContextVar('request_snapshot', default=None)
+# (pointer file stamp, snapshot path), replaced as a whole
+_current = (None, None)
+
+
+def snapshot_dir():
+    return Path(settings.EVENT_SNAPSHOT_DIR)
+
+
+def source_uri():
+    connection = connections[DEFAULT_DB_ALIAS]
+    if connection.vendor != 'sqlite':
+        raise ImproperlyConfigured('Read snapshots need the default database to be SQLite')
+    name = str(connection.settings_dict['NAME'])
+    if name.startswith('file:'):
+        return name  # Already a URI, e.g. the in-memory test database
+    return f'{Path(name).resolve().as_uri()}?mode=ro'
+
+
+def publish_snapshot():
+    """Copy the read tables into a new generation, make it current and
+    return its path"""
+    directory = snapshot_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'events-{time.time_ns()}.sqlite3'
+    temporary = directory / f'.{path.name}.tmp'
+    tables = [model._meta.db_table for model in SNAPSHOT_MODELS]
+
+    target = sqlite3.connect(temporary, isolation_level=None, uri=True)
+    try:
+        target.execute('ATTACH DATABASE ? AS source', (source_uri(),))
+        # One transaction, so every table is read as of the same moment
+        target.execute('BEGIN')
+        schema = target.execute(
+            f"SELECT sql FROM source.sqlite_master "
+            f"WHERE tbl_name IN ({', '.join('?' * len(tables))}) AND sql IS NOT NULL "
+            f"ORDER BY type = 'index'",
+            tables,
+        ).fetchall()
+        for (sql,) in schema:
+            target.execute(sql)
+        for table in tables:
+            target.execute(f'INSERT INTO main."{table}" SELECT * FROM source."{table}"')
+        target.execute('COMMIT')
+        target.execute('DETACH DATABASE source')
+    except BaseException:
+        target.close()
+        temporary.unlink(missing_ok=True)
+        raise
+    target.close()
+    os.replace(temporary, path)
+
+    pointer = directory / f'.{POINTER}.tmp'
+    pointer.write_text(path.name)
+    os.replace(pointer, directory / POINTER)
+    prune_snapshots(directory, settings.EVENT_SNAPSHOT_KEEP)
+
+    # Responses computed from the previous generation are stale now
+    bump_generation()
+    invalidate_all_months()
+    return path
+
+
+def snapshot_paths(directory=None):
+    """Published generations, oldest first"""
+    return sorted((directory or snapshot_dir()).glob('events-*.sqlite3'))
+
+
+def prune_snapshots(directory, keep):
+    for path in snapshot_paths(directory)[:-max(keep, 1)]:
+        try:
+            path.unlink()
+        except OSError:
+            pass  # Still open on platforms that can't delete open files
+
+
+def current_snapshot():
+    """Path of the current generation, or None before the first publish
+
+    Costs a ``stat()`` of the pointer file; it's only read again when it
+    changes.
+    """
+    global _current
+    pointer = snapshot_dir() / POINTER
+    try:
+        stat = pointer.stat()
+    except FileNotFoundError:
+        return None
+    stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if _current[0] != stamp:
+        _current = (stamp, snapshot_dir() / pointer.read_text().strip())
+    return _current[1]
+
+
+def use_snapshot(path):
+    """Point this thread's snapshot connection at ``path``"""
+    connection = connections[SNAPSHOT_ALIAS]
+    uri = f'{path.resolve().as_uri()}?mode=ro&immutable=1'
+    if connection.settings_dict['NAME'] != uri:
+        connection.close()
+        # A copy: the settings dict is shared with other threads' connections
+        connection.settings_dict = {**connection.settings_dict, 'NAME': uri}
+
+
+class SnapshotRouter:
+    """Sends reads of the snapshot tables to the snapshot during requests
+    ``SnapshotMiddleware`` marked, and every write to the main database"""
+
+    def db_for_read(self, model, **hints):
+        path = _request_snapshot.get()
+        if path is not None and model in SNAPSHOT_MODELS:
+            # Here rather than in the middleware: this runs on the thread
+            # that queries, also when the view is called from async code
+            use_snapshot(path)
+            return SNAPSHOT_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Objects read from the snapshot are saved to the main database
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, SNAPSHOT_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db == SNAPSHOT_ALIAS else None
+
+
+class SnapshotMiddleware:
+    """Serve ``GET``/``HEAD`` requests under ``PATH_PREFIX`` from the current
+    snapshot when ``EVENT_READ_SNAPSHOTS`` is set"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def snapshot_for(self, request):
+        if (
+            settings.EVENT_READ_SNAPSHOTS
+            and request.method in ('GET', 'HEAD')
+            and request.path.startswith(PATH_PREFIX)
+        ):
+            return current_snapshot()
+        return None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _request_snapshot.set(self.snapshot_for(request))
+        try:
+            return self.get_response(request)
+        finally:
+            _request_snapshot.reset(token)
+
+    async def __acall__(self, request):
+        token = _request_snapshot.set(self.snapshot_for(request))
+        try:
+            return await self.get_response(request)
+        finally:
+            _request_snapshot.reset(token)
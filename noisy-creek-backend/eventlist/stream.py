@@ -0,0 +1,262 @@
+"""Server-Sent Events stream of event, venue and category changes
+
+Writes in this process are published to an in-process hub by the model
+signals as soon as they commit. Writes made by other processes (another web
+worker, a management command) are picked up by one poller per event loop
+that reads the change feed table, so a single query per interval serves
+every connection. The SSE ``id`` of each message is the change feed ``seq``,
+which lets a reconnecting client resume from ``Last-Event-ID``.
+
+Each connection holds a small bounded queue and a suspended coroutine. A
+client that falls too far behind is disconnected rather than buffered for;
+it reconnects and resumes from the change feed.
+
+Needs an ASGI server (see ``eventsite/asgi.py``); under WSGI the stream
+would tie up a worker per connection.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from .models import Change, Event
+
+logger = logging.getLogger(__name__)
+
+# Seqs remembered to avoid sending a change both from a signal and the poller
+RECENT_SEQS = 10000
+# Longest wait between polls while the database keeps failing, in seconds
+MAX_POLL_BACKOFF = 60
+
+
+def notification(change, category_id=False):
+    """Compact message for one ``Change``
+
+    Event messages carry ``category_id`` (``None`` for uncategorized events)
+    unless it is unknown, passed as ``False``.
+    """
+    message = {
+        'seq': change.seq,
+        'model': change.model,
+        'id': change.object_id,
+        'action': change.action,
+    }
+    if change.model == 'event' and category_id is not False:
+        message['category_id'] = category_id
+    return message
+
+
+def encode(message, event='change'):
+    data = json.dumps(message, separators=(',', ':'))
+    return f'id: {message["seq"]}\nevent: {event}\ndata: {data}\n\n'.encode()
+
+
+def changes_after(seq, limit):
+    """Messages for up to ``limit`` changes after ``seq``, from the change feed"""
+    changes = list(Change.objects.filter(seq__gt=seq).order_by('seq')[:limit])
+    event_ids = {change.object_id for change in changes if change.model == 'event'}
+    categories = dict(
+        Event.objects.filter(pk__in=event_ids).values_list('pk', 'category_id')
+    ) if event_ids else {}
+    # Deleted events have no row left to read the category from
+    return [notification(change, categories.get(change.object_id, False)) for change in changes]
+
+
+def latest_seq():
+    return Change.objects.order_by('-seq').values_list('seq', flat=True).first() or 0
+
+
+class Subscriber:
+    __slots__ = ('loop', 'queue', 'category_ids', 'overflowed')
+
+    def __init__(self, loop, queue_size, category_ids=None):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        # None for every change, else only events in these categories
+        self.category_ids = category_ids
+        self.overflowed = False
+
+    def wants(self, message):
+        if self.category_ids is None:
+            return True
+        if message['model'] != 'event':
+            return False
+        # Unknown category (a deleted event): let the client ignore it
+        return 'category_id' not in message or message['category_id'] in self.category_ids
+
+
+class BroadcastHub:
+    """Fans change messages out to every subscribed SSE connection
+
+    ``publish`` may be called from any thread; delivery happens on each
+    subscriber's event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # loop -> set of Subscriber
+        self._pollers = {}  # loop -> poller task
+        self._recent = deque()
+        self._recent_set = set()
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def subscribe(self, category_ids=None):
+        """Register a subscriber on the running event loop"""
+        loop = asyncio.get_running_loop()
+        subscriber = Subscriber(loop, settings.EVENT_STREAM_QUEUE_SIZE, category_ids)
+        with self._lock:
+            self._subscribers.setdefault(loop, set()).add(subscriber)
+            start_poller = (
+                settings.EVENT_STREAM_POLL_INTERVAL and loop not in self._pollers
+            )
+            if start_poller:
+                self._pollers[loop] = loop.create_task(self._poll())
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.loop, set())
+            subscribers.discard(subscriber)
+            if not subscribers:
+                self._subscribers.pop(subscriber.loop, None)
+                poller = self._pollers.pop(subscriber.loop, None)
+                if poller is not None:
+                    poller.cancel()
+
+    def publish(self, messages):
+        """Send ``messages`` to every interested subscriber; thread-safe"""
+        with self._lock:
+            if self._pollers:
+                # The same change may come from a signal and from the poller
+                messages = [message for message in messages if self._first_sighting(message['seq'])]
+            targets = [(loop, list(subscribers)) for loop, subscribers in self._subscribers.items()]
+        if not messages:
+            return
+        frames = [(message, encode(message)) for message in messages]
+        for loop, subscribers in targets:
+            try:
+                loop.call_soon_threadsafe(self._deliver, subscribers, frames)
+            except RuntimeError:
+                # Loop closed without its streams being closed
+                for subscriber in subscribers:
+                    self.unsubscribe(subscriber)
+
+    def _first_sighting(self, seq):
+        if seq in self._recent_set:
+            return False
+        self._recent.append(seq)
+        self._recent_set.add(seq)
+        if len(self._recent) > RECENT_SEQS:
+            self._recent_set.discard(self._recent.popleft())
+        return True
+
+    @staticmethod
+    def _deliver(subscribers, frames):
+        for subscriber in subscribers:
+            if subscriber.overflowed:
+                continue
+            for message, frame in frames:
+                if not subscriber.wants(message):
+                    continue
+                try:
+                    subscriber.queue.put_nowait((message['seq'], frame))
+                except asyncio.QueueFull:
+                    subscriber.overflowed = True
+                    break
+
+    async def _poll(self):
+        """Publish changes committed by other processes"""
+        cursor = None
+        failures = 0
+        while True:
+            try:
+                if cursor is None:
+                    cursor = await sync_to_async(latest_seq)()
+                await asyncio.sleep(settings.EVENT_STREAM_POLL_INTERVAL)
+                messages = await sync_to_async(changes_after)(cursor, 1000)
+            except DatabaseError:
+                failures += 1
+                # One traceback per outage, not one per poll
+                if failures == 1:
+                    logger.exception('Event stream could not read the change feed')
+                delay = min(settings.EVENT_STREAM_POLL_INTERVAL * 2 ** failures, MAX_POLL_BACKOFF)
+                await asyncio.sleep(delay)
+                continue
+            if failures:
+                logger.warning('Event stream reads the change feed again after %d failures', failures)
+                failures = 0
+            if messages:
+                cursor = messages[-1]['seq']
+                self.publish(messages)
+
+
+hub = BroadcastHub()
+
+
+def publish_on_commit(changes, category_id=False):
+    """Publish new ``Change`` rows to this process's subscribers after commit
+
+    ``category_id`` is the category of the changed event when the caller
+    knows it; otherwise event categories are read back after the commit.
+    """
+    def publish():
+        if not hub.subscriber_count:
+            return
+        if category_id is False and any(change.model == 'event' for change in changes):
+            event_ids = [change.object_id for change in changes]
+            categories = dict(Event.objects.filter(pk__in=event_ids).values_list('pk', 'category_id'))
+            messages = [notification(change, categories.get(change.object_id, False)) for change in changes]
+        else:
+            messages = [notification(change, category_id) for change in changes]
+        hub.publish(messages)
+
+    transaction.on_commit(publish)
+
+
+async def stream_events(category_ids=None, last_event_id=None):
+    """Async iterator of SSE frames for one connection"""
+    subscriber = hub.subscribe(category_ids)
+    try:
+        yield b'retry: 5000\n\n'
+
+        # Subscribed first, so nothing committed during the replay is missed
+        sent = last_event_id or 0
+        if last_event_id is not None:
+            limit = settings.EVENT_STREAM_REPLAY_LIMIT
+            missed = await sync_to_async(changes_after)(last_event_id, limit + 1)
+            if len(missed) > limit:
+                # Too far behind to replay; the client should refetch
+                sent = await sync_to_async(latest_seq)()
+                yield encode({'seq': sent}, event='reset')
+            else:
+                for message in missed:
+                    if subscriber.wants(message):
+                        yield encode(message)
+                    sent = message['seq']
+
+        while True:
+            try:
+                seq, frame = await asyncio.wait_for(
+                    subscriber.queue.get(), settings.EVENT_STREAM_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                if subscriber.overflowed:
+                    return
+                yield b': heartbeat\n\n'
+                continue
+            if seq > sent:
+                sent = seq
+                yield frame
+            if subscriber.overflowed and subscriber.queue.empty():
+                return  # Dropped messages; the client resumes from Last-Event-ID
+    finally:
+        hub.unsubscribe(subscriber)
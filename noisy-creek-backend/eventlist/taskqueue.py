@@ -0,0 +1,198 @@
+"""Database-backed background task queue
+
+Work that doesn't have to finish before a save returns is queued as a
+``Task`` row and run later by ``manage.py run_worker`` (or by worker threads,
+see ``EVENT_TASK_WORKER_THREADS``). No broker is needed; the queue lives in
+the same database as the data and commits with it.
+
+* Deduplication: an identical task (same name and payload) is only queued
+  once while it is pending, so repeated saves of one event queue one task.
+* Batching: tasks registered with ``batch=True`` are claimed together and
+  run with one call, so N saves turn into one downstream refresh.
+* Retries: a failing task is retried with exponential backoff up to its
+  ``max_attempts``, then kept with status ``failed``.
+* Crashes: a task whose worker died is claimed again once its lease expires.
+"""
+import hashlib
+import json
+import logging
+import threading
+import traceback
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+TaskSpec = namedtuple('TaskSpec', ['func', 'batch', 'max_attempts'])
+
+# Task name -> TaskSpec, filled in by @task at import time
+registry = {}
+
+
+def task(name=None, batch=False, max_attempts=3):
+    """Register a function as a background task
+
+    A plain task is called with its payload as keyword arguments. A batch task
+    is called with the list of payloads of every claimed task of that name.
+    The decorated function gains ``enqueue(payload=None, delay=0)``.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        registry[task_name] = TaskSpec(func, batch, max_attempts)
+        func.task_name = task_name
+        func.enqueue = lambda payload=None, delay=0: enqueue(task_name, payload, delay)
+        return func
+    return decorator
+
+
+def dedupe_key(name, payload):
+    raw = json.dumps([name, payload], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def enqueue(name, payload=None, delay=0):
+    """Queue ``name`` to run with ``payload`` in at least ``delay`` seconds
+
+    Returns the new ``Task``, or None if an identical task is already pending.
+    Call it from ``transaction.on_commit`` when the task reads data written in
+    the current transaction.
+    """
+    payload = payload or {}
+    try:
+        with transaction.atomic():
+            return Task.objects.create(
+                name=name,
+                payload=payload,
+                dedupe_key=dedupe_key(name, payload),
+                run_after=timezone.now() + timezone.timedelta(seconds=delay),
+            )
+    except IntegrityError:
+        return None
+
+
+def claimable(now):
+    """Due pending tasks, and running tasks whose worker's lease has expired"""
+    lease_expired = now - timezone.timedelta(seconds=settings.EVENT_TASK_LEASE)
+    return (
+        Q(status=Task.PENDING, run_after__lte=now)
+        | Q(status=Task.RUNNING, locked_at__lt=lease_expired)
+    )
+
+
+def claim(batch_size):
+    """Claim the next due task, plus others of the same name for batch tasks
+
+    The claiming UPDATE re-checks ``claimable`` and stamps a token, so two
+    workers racing for the same rows can't both get them.
+    """
+    now = timezone.now()
+    due = Task.objects.filter(claimable(now)).order_by('run_after', 'pk')
+    first = due.values_list('name', flat=True).first()
+    if first is None:
+        return []
+
+    spec = registry.get(first)
+    limit = batch_size if spec is not None and spec.batch else 1
+    pks = list(due.filter(name=first).values_list('pk', flat=True)[:limit])
+
+    token = uuid.uuid4().hex
+    Task.objects.filter(claimable(now), pk__in=pks).update(
+        status=Task.RUNNING,
+        claimed_by=token,
+        locked_at=now,
+        attempts=F('attempts') + 1,
+    )
+    return list(Task.objects.filter(claimed_by=token))
+
+
+def retry_or_fail(claimed, error):
+    """Reschedule tasks after an error, or mark them failed when out of attempts"""
+    spec = registry.get(claimed[0].name)
+    max_attempts = spec.max_attempts if spec is not None else 1
+    for task_row in claimed:
+        task_row.last_error = error
+        task_row.claimed_by = ''
+        task_row.locked_at = None
+        if task_row.attempts >= max_attempts:
+            task_row.status = Task.FAILED
+        else:
+            task_row.status = Task.PENDING
+            delay = settings.EVENT_TASK_RETRY_DELAY * 2 ** (task_row.attempts - 1)
+            task_row.run_after = timezone.now() + timezone.timedelta(seconds=delay)
+        try:
+            with transaction.atomic():
+                task_row.save()
+        except IntegrityError:
+            # An identical task was queued meanwhile and will do the same work
+            task_row.delete()
+
+
+def run_claimed(claimed):
+    """Run a claimed batch; finished tasks are deleted"""
+    name = claimed[0].name
+    spec = registry.get(name)
+    try:
+        if spec is None:
+            raise LookupError(f'Unknown task {name!r}')
+        if spec.batch:
+            spec.func([task_row.payload for task_row in claimed])
+        else:
+            spec.func(**claimed[0].payload)
+    except Exception:
+        logger.exception('Task %s failed', name)
+        retry_or_fail(claimed, traceback.format_exc())
+        return False
+
+    Task.objects.filter(pk__in=[task_row.pk for task_row in claimed]).delete()
+    return True
+
+
+def run_pending(batch_size=None, limit=None):
+    """Run due tasks until none are left (or ``limit`` claims were made)
+
+    Returns the number of tasks run, successful or not.
+    """
+    batch_size = batch_size or settings.EVENT_TASK_BATCH_SIZE
+    ran = claims = 0
+    while limit is None or claims < limit:
+        claimed = claim(batch_size)
+        if not claimed:
+            break
+        run_claimed(claimed)
+        ran += len(claimed)
+        claims += 1
+    return ran
+
+
+def work(stop, poll_interval=1.0, batch_size=None):
+    """Run tasks until the ``stop`` event is set, polling when idle"""
+    while not stop.is_set():
+        close_old_connections()
+        try:
+            ran = run_pending(batch_size=batch_size)
+        except DatabaseError:
+            # Table not migrated yet, or the database is briefly unavailable
+            logger.exception('Task worker could not reach the queue')
+            ran = 0
+        if not ran:
+            stop.wait(poll_interval)
+
+
+def start_worker_threads(count, poll_interval=1.0, batch_size=None):
+    """Start ``count`` daemon threads working the queue; returns their stop event"""
+    stop = threading.Event()
+    for index in range(count):
+        threading.Thread(
+            target=work,
+            args=(stop, poll_interval, batch_size),
+            name=f'eventlist-task-worker-{index}',
+            daemon=True,
+        ).start()
+    return stop
@@ -0,0 +1,53 @@
+"""Background tasks run by the task queue (see ``taskqueue.py``)"""
+from datetime import date
+
+from .counts import refresh_day_counts
+from .models import Event
+from .similarity import build_similar_events
+from .snapshots import publish_snapshot
+from .taskqueue import task
+from .warming import default_manifest, warm
+
+
+@task(batch=True)
+def rewarm_event_cache(payloads):
+    """Warm the default pages plus the detail pages of events that changed
+
+    Queued after writes (see ``signals.py``); a burst of saves is claimed as
+    one batch and warms the cache once. From a ``run_worker`` process this
+    only helps web processes with a shared cache backend.
+    """
+    changed = {payload['event'] for payload in payloads if 'event' in payload}
+    manifest = default_manifest()
+    existing = Event.objects.filter(pk__in=changed).values_list('pk', flat=True)
+    manifest['details'] = sorted(set(manifest['details']) | set(existing))
+    warm(manifest, workers=1)
+
+
+@task(batch=True)
+def refresh_event_counts(payloads):
+    """Recount the ``days`` (ISO dates) written to; an empty payload recounts
+    every day"""
+    if all('days' in payload for payload in payloads):
+        refresh_day_counts({date.fromisoformat(day) for payload in payloads for day in payload['days']})
+    else:
+        refresh_day_counts()
+
+
+@task(batch=True)
+def index_similar_events(payloads):
+    """Add new events to the similar-events index
+
+    Payloads name the created ``event``; an empty payload (after a bulk
+    create) indexes every event that has no neighbours yet.
+    """
+    if all('event' in payload for payload in payloads):
+        build_similar_events(event_ids={payload['event'] for payload in payloads})
+    else:
+        build_similar_events()
+
+
+@task(batch=True)
+def publish_read_snapshot(payloads):
+    """Publish a new read snapshot; a burst of writes is claimed as one batch"""
+    publish_snapshot()
@@ -0,0 +1,89 @@
+"""Admin template tags for large event tables"""
+import copy
+import datetime
+
+from django import template
+from django.contrib.admin.templatetags import admin_list
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+from django.utils import timezone
+
+register = template.Library()
+
+
+def period_bounds(value, kind):
+    """Naive start of the year/month/day containing ``value`` and of the next one"""
+    if kind == 'year':
+        return datetime.datetime(value.year, 1, 1), datetime.datetime(value.year + 1, 1, 1)
+    if kind == 'month':
+        year, month = divmod(value.year * 12 + value.month, 12)
+        return datetime.datetime(value.year, value.month, 1), datetime.datetime(year, month + 1, 1)
+    start = datetime.datetime(value.year, value.month, value.day)
+    return start, start + datetime.timedelta(days=1)
+
+
+def distinct_periods(queryset, field_name, kind):
+    """The distinct years, months or days of a datetime field, oldest first
+
+    Same result as ``queryset.datetimes(field_name, kind)``, but jumps
+    through the field's index one period at a time instead of truncating
+    every row, so the cost follows the number of periods, not of rows.
+    """
+    values = queryset.filter(**{f'{field_name}__isnull': False}).order_by(field_name)
+    values = values.values_list(field_name, flat=True)
+    # Periods are in the current time zone, like QuerySet.datetimes()
+    periods, lower = [], None
+    while True:
+        page = values if lower is None else values.filter(**{f'{field_name}__gte': lower})
+        value = page.first()
+        if value is None:
+            return periods
+        if timezone.is_aware(value):
+            start, lower = period_bounds(timezone.localtime(value), kind)
+            start, lower = timezone.make_aware(start), timezone.make_aware(lower)
+        else:
+            start, lower = period_bounds(value, kind)
+        periods.append(start)
+
+
+class PeriodQuerySet:
+    """The parts of a queryset ``admin_list.date_hierarchy`` uses"""
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def aggregate(self, **aggregates):
+        """``Min``/``Max`` of a field as separate index lookups
+
+        Some databases (SQLite among them) scan the whole table when both are
+        in one query.
+        """
+        result = {}
+        for name, aggregate in aggregates.items():
+            field_name = aggregate.source_expressions[0].name
+            ordering = field_name if aggregate.name == 'Min' else f'-{field_name}'
+            values = self.queryset.filter(**{f'{field_name}__isnull': False})
+            result[name] = values.order_by(ordering).values_list(field_name, flat=True).first()
+        return result
+
+    def datetimes(self, field_name, kind):
+        return distinct_periods(self.queryset, field_name, kind)
+
+    dates = datetimes
+
+
+def date_hierarchy(cl):
+    """Django's date hierarchy with the year/month/day links read from the index"""
+    cl = copy.copy(cl)
+    cl.queryset = PeriodQuerySet(cl.queryset)
+    return admin_list.date_hierarchy(cl)
+
+
+@register.tag(name='indexed_date_hierarchy')
+def indexed_date_hierarchy_tag(parser, token):
+    return InclusionAdminNode(
+        parser,
+        token,
+        func=date_hierarchy,
+        template_name='date_hierarchy.html',
+        takes_context=False,
+    )
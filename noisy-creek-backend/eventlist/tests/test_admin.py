@@ -0,0 +1,175 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.utils import timezone
+from datetime import timedelta
+from unittest import mock
+from eventlist.bulk import pk_chunks
+from eventlist.models import Event, Venue, EventPost, Category
+from eventlist.templatetags.event_admin import distinct_periods
+
+
+class EventPostAdminTest(TestCase):
+    def test_changelist_query_count_is_constant(self):
+        """Test that the EventPost changelist doesn't query once per post"""
+        venue = Venue.objects.create(name="Test Venue")
+        for i in range(10):
+            event = Event.objects.create(
+                title=f"Event {i}",
+                start_date=timezone.now() + timedelta(days=i+1),
+                end_date=timezone.now() + timedelta(days=i+1, hours=2),
+                venue=venue
+            )
+            EventPost.objects.create(event=event, content="Post")
+
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin_user)
+        url = reverse('admin:eventlist_eventpost_changelist')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Post for Event 9")
+        event_lookups = [
+            q for q in queries.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "eventlist_event" WHERE' in q['sql']
+        ]
+        self.assertEqual(event_lookups, [])
+
+
+class EventAdminTest(TestCase):
+    def setUp(self):
+        self.venue = Venue.objects.create(name="Test Venue")
+        self.category = Category.objects.create(name="Music")
+        self.events = [
+            Event.objects.create(
+                title=title,
+                start_date=timezone.now() + timedelta(days=days),
+                end_date=timezone.now() + timedelta(days=days, hours=2),
+                venue=self.venue,
+                category=self.category
+            )
+            for title, days in [("Jazz Night", 1), ("jazz brunch", 40), ("Rock Show", 400)]
+        ]
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin_user)
+        self.url = reverse('admin:eventlist_event_changelist')
+
+    def test_changelist_counts_are_bounded(self):
+        """Test that the changelist never runs an unbounded COUNT(*)"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'category__id__exact': self.category.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "3 Events")
+        counts = [q['sql'] for q in queries.captured_queries if 'COUNT(' in q['sql']]
+        self.assertTrue(counts)
+        for sql in counts:
+            self.assertIn('LIMIT', sql)
+
+    def test_unfiltered_changelist_uses_estimate(self):
+        """Test that large unfiltered tables use the database's row estimate"""
+        with mock.patch('eventlist.paginators.estimate_row_count', return_value=1000000):
+            response = self.client.get(self.url)
+
+        self.assertContains(response, "1000000 Events")
+
+    def test_search_matches_title_prefix_case_insensitively(self):
+        """Test that search is a case-insensitive title prefix match"""
+        response = self.client.get(self.url, {'q': 'JAZZ'})
+
+        self.assertContains(response, "Jazz Night")
+        self.assertContains(response, "jazz brunch")
+        self.assertNotContains(response, "Rock Show")
+
+    @mock.patch('eventlist.paginators.EstimatedCountPaginator.count_limit', 2)
+    @mock.patch('eventlist.admin.EventAdmin.list_per_page', 1)
+    def test_pages_past_count_limit_are_reachable(self):
+        """Test that pages past a capped count are counted exactly, not a 404"""
+        Event.objects.create(
+            title="Poetry Slam",
+            start_date=timezone.now() + timedelta(hours=2),
+            end_date=timezone.now() + timedelta(hours=4),
+            venue=self.venue
+        )
+
+        response = self.client.get(self.url, {'p': 4})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Poetry Slam")
+        self.assertContains(response, "4 Events")
+
+    def test_search_matches_non_ascii_prefix(self):
+        """Test that a non-ASCII prefix matches titles with it in the same case"""
+        Event.objects.create(
+            title="Música en vivo",
+            start_date=timezone.now() + timedelta(days=2),
+            end_date=timezone.now() + timedelta(days=2, hours=2),
+            venue=self.venue
+        )
+
+        response = self.client.get(self.url, {'q': 'mú'})
+
+        self.assertContains(response, "Música en vivo")
+        self.assertNotContains(response, "Jazz Night")
+
+    def test_search_by_id(self):
+        """Test that a numeric search term finds the event with that ID"""
+        rock_show = self.events[2]
+        response = self.client.get(self.url, {'q': str(rock_show.pk)})
+
+        self.assertContains(response, "Rock Show")
+        self.assertNotContains(response, "Jazz Night")
+
+    def test_date_hierarchy_matches_distinct_dates(self):
+        """Test that the indexed date hierarchy lists the same periods as QuerySet.datetimes"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+        for kind in ('year', 'month', 'day'):
+            self.assertEqual(
+                distinct_periods(Event.objects.all(), 'start_date', kind),
+                list(Event.objects.datetimes('start_date', kind)),
+            )
+        for year in Event.objects.dates('start_date', 'year'):
+            self.assertContains(response, f"start_date__year={year.year}")
+
+    def test_delete_in_chunks_asks_for_confirmation(self):
+        """Test that the chunked delete action confirms before deleting"""
+        data = {
+            'action': 'delete_in_chunks',
+            ACTION_CHECKBOX_NAME: [event.pk for event in self.events[:2]],
+        }
+        response = self.client.post(self.url, data)
+
+        self.assertContains(response, "delete 2 events")
+        self.assertEqual(Event.objects.count(), 3)
+
+        response = self.client.post(self.url, {**data, 'post': 'yes'})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(list(Event.objects.values_list('title', flat=True)), ["Rock Show"])
+
+    def test_clear_category_across_all_results(self):
+        """Test that bulk actions apply to every filtered event with select_across"""
+        data = {
+            'action': 'clear_category',
+            'select_across': '1',
+            ACTION_CHECKBOX_NAME: [self.events[0].pk],
+        }
+        response = self.client.post(self.url + '?q=jazz', data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Event.objects.filter(category=None).count(), 2)
+        self.assertEqual(Event.objects.get(title="Rock Show").category, self.category)
+
+    def test_pk_chunks_cover_queryset_once(self):
+        """Test that chunking visits every row exactly once, in order"""
+        chunks = list(pk_chunks(Event.objects.all(), chunk_size=2))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual(sum(chunks, []), sorted(event.pk for event in self.events))
@@ -418,4 +418,154 @@ class EventAPITest(TestCase):
                     'end_date', 'category', 'venue'
                 ]
                 for field in required_fields:
-                    self.assertIn(field, event)
\ No newline at end of file
+                    self.assertIn(field, event)
+
+    def test_sparse_fieldset(self):
+        """Test that fields= trims the response to the requested fields"""
+        url = reverse('event-list')
+        response = self.client.get(url, {'fields': 'id,title,venue.name'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        event = response.data['results'][0]
+        self.assertEqual(set(event), {'id', 'title', 'venue'})
+        self.assertEqual(set(event['venue']), {'name'})
+
+    def test_sparse_fieldset_ignores_unexposed_fields(self):
+        """Test that fields outside the serializer whitelist are ignored"""
+        url = reverse('event-list')
+        response = self.client.get(url, {'fields': 'title,venue_id,venue.secret,__class__'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['results'][0]), {'title'})
+
+        # Nothing valid requested falls back to the full representation
+        response = self.client.get(url, {'fields': 'password'})
+        self.assertIn('description', response.data['results'][0])
+
+    def test_sparse_fieldset_defers_columns(self):
+        """Test that unrequested columns are not read from the database"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        url = reverse('event-list')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'title,venue.name'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        select = queries.captured_queries[-1]['sql']
+        self.assertNotIn('"eventlist_event"."description"', select)
+        self.assertNotIn('"eventlist_venue"."capacity"', select)
+        self.assertNotIn('eventlist_category', select)
+
+    def test_sparse_fieldset_on_detail(self):
+        """Test that fields= also applies to the detail endpoint"""
+        url = reverse('event-detail', kwargs={'pk': self.art_event.pk})
+        response = self.client.get(url, {'fields': 'title,category'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {'title', 'category'})
+        self.assertEqual(response.data['category']['name'], 'Art & Culture')
+
+    def test_normalized_response(self):
+        """Test that normalize=true sideloads venues and categories once per page"""
+        for i in range(10):
+            Event.objects.create(
+                title=f"Park Event {i}",
+                start_date=timezone.now() + timedelta(days=i+1),
+                end_date=timezone.now() + timedelta(days=i+1, hours=2),
+                category=self.music_category,
+                venue=self.venue
+            )
+
+        url = reverse('event-list')
+        with self.assertNumQueries(4):  # count, events, venues, categories
+            response = self.client.get(url, {'normalize': 'true', 'page_size': 20})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 13)
+        event = response.data['results'][0]
+        self.assertNotIn('venue', event)
+        self.assertIn(event['venue_id'], (self.venue.pk, self.art_venue.pk))
+
+        included = response.data['included']
+        self.assertEqual(
+            set(included['venues']), {str(self.venue.pk), str(self.art_venue.pk)}
+        )
+        self.assertEqual(included['venues'][str(self.venue.pk)]['name'], 'Test Venue')
+        self.assertEqual(
+            set(included['categories']),
+            {str(self.music_category.pk), str(self.art_category.pk)}
+        )
+
+    def test_normalized_response_with_fieldset(self):
+        """Test that fields= selects normalized fields by their id names"""
+        url = reverse('event-list')
+        response = self.client.get(url, {'normalize': 'true', 'fields': 'title,venue_id'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['results'][0]), {'title', 'venue_id'})
+        self.assertIn('venues', response.data['included'])
+
+    def test_normalized_fieldset_without_foreign_keys(self):
+        """Test that sideloading doesn't load each event's foreign keys one by one"""
+        url = reverse('event-list')
+        with self.assertNumQueries(4):  # count, events, venues, categories
+            response = self.client.get(url, {'normalize': 'true', 'fields': 'title'})
+
+        self.assertEqual(set(response.data['results'][0]), {'title'})
+        self.assertEqual(
+            set(response.data['included']['venues']), {str(self.venue.pk), str(self.art_venue.pk)}
+        )
+
+    def test_event_posts_feed(self):
+        """Test the cursor paginated per-event post feed"""
+        from eventlist.models import EventPost
+        for i in range(25):
+            EventPost.objects.create(event=self.upcoming_event, content=f"Post {i}")
+        EventPost.objects.create(event=self.art_event, content="Other event")
+
+        url = reverse('event-post-list', kwargs={'pk': self.upcoming_event.pk})
+        with self.assertNumQueries(2):  # event lookup, posts page
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(response.data['results'][0]['event'], self.upcoming_event.pk)
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNone(response.data['next'])
+
+    def test_event_posts_feed_unknown_event(self):
+        """Test that the post feed 404s for a missing event"""
+        url = reverse('event-post-list', kwargs={'pk': 99999})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_include_post_stats(self):
+        """Test that include_posts=true adds post stats without extra queries"""
+        from eventlist.models import EventPost
+        EventPost.objects.create(event=self.upcoming_event, content="First")
+        EventPost.objects.create(event=self.upcoming_event, content="Second")
+
+        url = reverse('event-list')
+        with self.assertNumQueries(2):  # count, events with annotations
+            response = self.client.get(url, {'include_posts': 'true'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        events = {event['title']: event for event in response.data['results']}
+        self.assertEqual(events['Upcoming Concert']['post_count'], 2)
+        self.assertIn(
+            events['Upcoming Concert']['latest_post']['content'], ('First', 'Second')
+        )
+        self.assertEqual(events['Art Exhibition']['post_count'], 0)
+        self.assertIsNone(events['Art Exhibition']['latest_post'])
+
+        # Stats are opt-in
+        response = self.client.get(url)
+        self.assertNotIn('post_count', response.data['results'][0])
+
+        # ...or requested through fields=
+        response = self.client.get(url, {'fields': 'title,post_count'})
+        self.assertEqual(set(response.data['results'][0]), {'title', 'post_count'})
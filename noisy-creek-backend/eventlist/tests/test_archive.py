@@ -0,0 +1,156 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import timedelta
+from io import StringIO
+from eventlist.archive import MergedQuerySet, archive_events
+from eventlist.models import ArchivedEvent, Event, EventPost, Category, Venue
+
+
+class ArchiveEventsTest(TestCase):
+    def setUp(self):
+        """Set up old and upcoming events"""
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Music")
+        self.venue = Venue.objects.create(name="Gas Works Park")
+        now = timezone.now()
+
+        # Bulk create bypasses Event.clean, as an old import would have
+        Event.objects.bulk_create([
+            Event(
+                title=f"Old Event {i}",
+                start_date=now - timedelta(days=100 + i),
+                end_date=now - timedelta(days=100 + i, hours=-2),
+                category=self.category,
+                venue=self.venue
+            )
+            for i in range(5)
+        ])
+        self.old_with_post = Event.objects.create(
+            title="Recent Event",
+            start_date=now + timedelta(days=1),
+            end_date=now + timedelta(days=1, hours=2),
+            venue=self.venue
+        )
+        Event.objects.filter(pk=self.old_with_post.pk).update(
+            title="Old Event With Post", start_date=now - timedelta(days=102, hours=12)
+        )
+        EventPost.objects.create(event=self.old_with_post, content="Photos are up")
+        self.upcoming = Event.objects.create(
+            title="Upcoming Event",
+            start_date=now + timedelta(days=3),
+            end_date=now + timedelta(days=3, hours=2),
+            category=self.category,
+            venue=self.venue
+        )
+
+    def test_archive_moves_old_events_in_chunks(self):
+        """Test that old events without posts are moved to the archive"""
+        moved = archive_events(90, chunk_size=2)
+
+        self.assertEqual(moved, 5)
+        self.assertEqual(ArchivedEvent.objects.count(), 5)
+        self.assertEqual(
+            set(Event.objects.values_list('title', flat=True)),
+            {"Old Event With Post", "Upcoming Event"}
+        )
+        archived = ArchivedEvent.objects.get(title="Old Event 0")
+        self.assertEqual(archived.venue, self.venue)
+        self.assertEqual(archived.category, self.category)
+
+    def test_archive_dry_run_and_minimum_retention(self):
+        """Test dry runs and the minimum retention horizon"""
+        self.assertEqual(archive_events(90, dry_run=True), 5)
+        self.assertEqual(ArchivedEvent.objects.count(), 0)
+        with self.assertRaises(ValueError):
+            archive_events(7)
+
+    def test_archive_command(self):
+        """Test the archive_events management command"""
+        out = StringIO()
+        call_command('archive_events', '--days', '90', stdout=out)
+        self.assertIn("Archived 5 events", out.getvalue())
+
+    def test_list_only_reads_archive_for_old_ranges(self):
+        """Test that the list API merges the archive when the range reaches into it"""
+        archive_events(90)
+        url = reverse('event-list')
+
+        response = self.client.get(url)
+        self.assertEqual(response.data['count'], 2)
+
+        old_start = (timezone.now() - timedelta(days=200)).date()
+        response = self.client.get(url, {'start_date': old_start, 'page_size': 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 7)
+        titles = [event['title'] for event in response.data['results']]
+        self.assertEqual(
+            titles, ["Upcoming Event", "Old Event 0", "Old Event 1", "Old Event 2"]
+        )
+
+        response = self.client.get(response.data['next'])
+        titles = [event['title'] for event in response.data['results']]
+        # The hot event with posts is merged in start date order
+        self.assertEqual(titles, ["Old Event With Post", "Old Event 3", "Old Event 4"])
+
+    def test_list_reads_archive_for_past_end_date(self):
+        """Test that a range with only a past end date includes archived events"""
+        archive_events(90)
+        url = reverse('event-list')
+
+        old_end = (timezone.now() - timedelta(days=101)).date()
+        response = self.client.get(url, {'end_date': old_end})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [event['title'] for event in response.data['results']],
+            ["Old Event 2", "Old Event With Post", "Old Event 3", "Old Event 4"]
+        )
+
+    def test_detail_falls_back_to_archive(self):
+        """Test that archived events are still reachable by id"""
+        event_id = Event.objects.get(title="Old Event 3").pk
+        archive_events(90)
+
+        url = reverse('event-detail', kwargs={'pk': event_id})
+        response = self.client.get(url, {'fields': 'id,title,venue.name'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], "Old Event 3")
+        self.assertEqual(response.data['venue'], {'name': "Gas Works Park"})
+
+    def test_merged_queryset_slicing(self):
+        """Test slicing across the parts of a MergedQuerySet"""
+        archive_events(90)
+        merged = MergedQuerySet(
+            Event.objects.order_by('-start_date'),
+            ArchivedEvent.objects.order_by('-start_date')
+        )
+        self.assertEqual(merged.count(), 7)
+        everything = [event.title for event in merged[:]]
+        self.assertEqual([event.title for event in merged[2:5]], everything[2:5])
+        self.assertEqual(merged[7:9], [])
+
+    def test_merged_pages_with_equal_start_dates(self):
+        """Test that paging through events starting together shows each once"""
+        start = timezone.now() - timedelta(days=200)
+        events = Event.objects.bulk_create([
+            Event(
+                title=f"Same Time {i}",
+                start_date=start,
+                end_date=start + timedelta(hours=2),
+                venue=self.venue
+            )
+            for i in range(6)
+        ])
+        for event in events[::2]:
+            EventPost.objects.create(event=event, content="Still here")
+        archive_events(90)
+        merged = MergedQuerySet(
+            Event.objects.filter(start_date=start), ArchivedEvent.objects.filter(start_date=start)
+        )
+
+        pages = [event.pk for i in range(6) for event in merged[i:i + 1]]
+
+        self.assertEqual(pages, sorted((event.pk for event in events), reverse=True))
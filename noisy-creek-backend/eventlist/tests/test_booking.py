@@ -0,0 +1,116 @@
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from eventlist.booking import sweep
+from eventlist.models import Event, Venue
+
+
+@override_settings(EVENT_PREVENT_DOUBLE_BOOKING=True)
+class DoubleBookingTest(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.start = timezone.now() + timedelta(days=7)
+        self.hall = Venue.objects.create(name="Concert Hall", capacity=100)
+        self.club = Venue.objects.create(name="Small Club")
+        self.concert = self.event("Concert", self.hall, 0, 3, attendance=60)
+
+    def event(self, title, venue, start_hours, end_hours, attendance=None, save=True):
+        event = Event(
+            title=title,
+            start_date=self.start + timedelta(hours=start_hours),
+            end_date=self.start + timedelta(hours=end_hours),
+            venue=venue,
+            expected_attendance=attendance
+        )
+        if save:
+            event.save()
+        return event
+
+    def test_overlap_is_rejected(self):
+        """Test that an overlapping event over capacity can't be saved"""
+        with self.assertRaises(ValidationError) as raised:
+            self.event("Lecture", self.hall, 2, 4, attendance=50)
+        self.assertIn('Concert', str(raised.exception))
+
+    def test_overlap_within_capacity_is_allowed(self):
+        """Test that overlapping events can share a venue's capacity"""
+        self.event("Workshop", self.hall, 1, 2, attendance=40)
+        self.assertEqual(Event.objects.count(), 2)
+
+    def test_overlap_without_attendance_is_rejected(self):
+        """Test that events with unknown attendance can't share a venue"""
+        with self.assertRaises(ValidationError):
+            self.event("Workshop", self.hall, 1, 2)
+
+    def test_back_to_back_events_are_allowed(self):
+        """Test that an event may start when the previous one ends"""
+        self.event("After Party", self.hall, 3, 5, attendance=100)
+        self.event("Club Night", self.club, 0, 3)
+        self.assertEqual(Event.objects.count(), 3)
+
+    def test_editing_an_event_does_not_conflict_with_itself(self):
+        """Test that resaving an event doesn't count as an overlap"""
+        self.concert.title = "Renamed Concert"
+        self.concert.save()
+
+    @override_settings(EVENT_PREVENT_DOUBLE_BOOKING=False)
+    def test_check_is_optional(self):
+        """Test that overlaps are allowed when the check is disabled"""
+        self.event("Lecture", self.hall, 2, 4)
+        self.assertEqual(Event.objects.count(), 2)
+
+    def test_bulk_create_checks_batch(self):
+        """Test that bulk imports are checked against each other and saved events"""
+        batch = [
+            self.event("Club Night", self.club, 0, 2, save=False),
+            self.event("Late Show", self.club, 1, 3, save=False),
+            self.event("Lecture", self.hall, 4, 5, save=False),
+        ]
+        with self.assertRaises(ValidationError) as raised:
+            Event.objects.bulk_create(batch)
+        self.assertEqual(len(raised.exception.messages), 1)
+        self.assertIn('"Late Show" overlaps "Club Night"', raised.exception.messages[0])
+
+        with self.assertRaises(ValidationError):
+            Event.objects.bulk_create([self.event("Lecture", self.hall, 2, 4, attendance=50, save=False)])
+
+        Event.objects.bulk_create([batch[0], batch[2]])
+        self.assertEqual(Event.objects.count(), 3)
+
+    def test_sweep_tracks_peak_load(self):
+        """Test that capacity is checked against the events running at the same time"""
+        events = [
+            self.event("A", self.hall, 0, 4, attendance=40, save=False),
+            self.event("B", self.hall, 1, 2, attendance=40, save=False),
+            self.event("C", self.hall, 3, 5, attendance=40, save=False),
+            self.event("D", self.hall, 3, 5, attendance=30, save=False),
+        ]
+
+        conflicts = sweep(self.hall, events)
+
+        # B and C each fit alongside A; D doesn't fit alongside A and C
+        self.assertEqual([c.event.title for c in conflicts], ["D"])
+        self.assertEqual([e.title for e in conflicts[0].overlapping], ["A", "C"])
+        self.assertEqual(conflicts[0].load, 80)
+
+    @override_settings(EVENT_PREVENT_DOUBLE_BOOKING=False)
+    def test_report_command(self):
+        """Test that the report lists conflicts across venues"""
+        self.event("Lecture", self.hall, 2, 4, attendance=50)
+        self.event("Club Night", self.club, 0, 2)
+        self.event("Late Show", self.club, 1, 3)
+        out = StringIO()
+
+        call_command('report_venue_conflicts', stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('"Lecture"', output)
+        self.assertIn('"Late Show"', output)
+        self.assertIn("Found 2 conflicts", output)
+
+        out = StringIO()
+        call_command('report_venue_conflicts', '--venue', str(self.club.pk), stdout=out)
+        self.assertIn("Found 1 conflicts", out.getvalue())
@@ -0,0 +1,235 @@
+from django.contrib.auth.models import Permission, User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import timedelta
+from io import StringIO
+from eventlist.bulk import chunked_delete
+from eventlist.cache import get_generation
+from eventlist.models import Category, Change, Event, EventPost, SimilarEvent, Venue
+
+
+class ChunkedDeleteTest(TestCase):
+    def setUp(self):
+        """Set up two venues with events, posts and links between them"""
+        self.music = Category.objects.create(name="Music")
+        self.park = Venue.objects.create(name="Gas Works Park")
+        self.club = Venue.objects.create(name="The Crocodile")
+        self.park_events = [self.create_event(f"Park Event {i}", self.park) for i in range(5)]
+        self.club_event = self.create_event("Club Night", self.club)
+        for event in self.park_events[:3]:
+            EventPost.objects.create(event=event, content="See you there!")
+        SimilarEvent.objects.create(event=self.club_event, similar=self.park_events[0], score=0.5, rank=1)
+        Event.objects.filter(pk=self.club_event.pk).update(duplicate_of=self.park_events[1])
+
+    def create_event(self, title, venue):
+        return Event.objects.create(
+            title=title,
+            start_date=timezone.now() + timedelta(days=3),
+            end_date=timezone.now() + timedelta(days=3, hours=2),
+            category=self.music,
+            venue=venue
+        )
+
+    def test_cascade_is_deleted_children_first(self):
+        """Test that a venue delete removes its events, their posts and links"""
+        progress = []
+
+        deleted = chunked_delete(
+            Venue.objects.filter(pk=self.park.pk), chunk_size=2,
+            progress=lambda label, count: progress.append((label, count))
+        )
+
+        self.assertEqual(deleted, {
+            'eventlist.EventPost': 3,
+            'eventlist.SimilarEvent': 1,
+            'eventlist.Event': 5,
+            'eventlist.Venue': 1,
+        })
+        self.assertIn(('eventlist.Event', 4), progress)
+        self.assertEqual(progress[-1], ('eventlist.Venue', 1))
+        self.assertEqual(list(Event.objects.all()), [self.club_event])
+        self.assertFalse(EventPost.objects.exists())
+        self.assertFalse(SimilarEvent.objects.exists())
+        # SET_NULL references are cleared rather than deleted
+        self.club_event.refresh_from_db()
+        self.assertIsNone(self.club_event.duplicate_of)
+
+    def test_raw_deletes_reach_change_feed_and_cache(self):
+        """Test that tracked models still leave tombstones and invalidate the cache"""
+        generation = get_generation()
+        pks = [event.pk for event in self.park_events]
+
+        chunked_delete(Venue.objects.filter(pk=self.park.pk), chunk_size=2)
+
+        tombstones = Change.objects.filter(action=Change.DELETE)
+        self.assertCountEqual(
+            tombstones.filter(model='event').values_list('object_id', flat=True), pks
+        )
+        self.assertTrue(tombstones.filter(model='venue', object_id=self.park.pk).exists())
+        self.assertNotEqual(get_generation(), generation)
+
+    def test_populate_reset_only(self):
+        """Test that populate_events can clear all data in chunks"""
+        out = StringIO()
+
+        call_command('populate_events', '--reset-only', '--chunk-size', '2', stdout=out)
+
+        self.assertIn("Deleted 6 eventlist.Event rows", out.getvalue())
+        for model in (Event, EventPost, Category, Venue, SimilarEvent):
+            self.assertFalse(model.objects.exists())
+
+
+class EventBulkAPITest(TestCase):
+    def setUp(self):
+        """Set up an editor who may add, change and delete events"""
+        self.client = APIClient()
+        self.url = reverse('event-bulk')
+        self.music = Category.objects.create(name="Music")
+        self.park = Venue.objects.create(name="Gas Works Park")
+        self.editor = User.objects.create_user('editor')
+        self.editor.user_permissions.set(Permission.objects.filter(
+            codename__in=['add_event', 'change_event', 'delete_event']
+        ))
+        self.client.force_authenticate(self.editor)
+        self.start = timezone.now() + timedelta(days=3)
+        self.event = Event.objects.create(
+            title="Existing", start_date=self.start, end_date=self.start + timedelta(hours=2),
+            category=self.music, venue=self.park
+        )
+
+    def new_event(self, title, **fields):
+        return {
+            'title': title,
+            'start_date': (self.start + timedelta(days=1)).isoformat(),
+            'end_date': (self.start + timedelta(days=1, hours=2)).isoformat(),
+            'venue': self.park.pk,
+            **fields,
+        }
+
+    def test_needs_permissions(self):
+        """Test that anonymous users and users without the permission are refused"""
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.post(self.url, {'delete': []}, format='json').status_code, 403)
+
+        self.client.force_authenticate(User.objects.create_user('visitor'))
+        response = self.client.post(self.url, {'delete': [self.event.pk]}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Event.objects.filter(pk=self.event.pk).exists())
+
+    def test_create_update_delete(self):
+        """Test a mixed request and its per-item results"""
+        other = Event.objects.create(
+            title="Other", start_date=self.start, end_date=self.start + timedelta(hours=1), venue=self.park
+        )
+        response = self.client.post(self.url, {
+            'create': [self.new_event("Concert", category=self.music.pk), self.new_event("Talk")],
+            'update': [{'id': self.event.pk, 'title': "Renamed", 'start_date': self.start.isoformat()}],
+            'delete': [other.pk],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['counts'], {'created': 2, 'updated': 1, 'deleted': 1})
+        created = [result['id'] for result in response.data['create']]
+        self.assertEqual(
+            set(Event.objects.filter(pk__in=created).values_list('title', flat=True)), {"Concert", "Talk"}
+        )
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.title, "Renamed")
+        self.assertEqual(self.event.category, self.music)  # Fields not sent are kept
+        self.assertFalse(Event.objects.filter(pk=other.pk).exists())
+        # Bulk writes reach the change feed
+        self.assertTrue(Change.objects.filter(model='event', object_id__in=created).exists())
+
+    def test_invalid_items_are_reported_and_skipped(self):
+        """Test that bad items fail alone, each with its errors"""
+        response = self.client.post(self.url, {
+            'create': [
+                self.new_event("Good"),
+                self.new_event("Backwards", end_date=self.start.isoformat()),
+                self.new_event("Nowhere", venue=9999),
+                self.new_event("Extra", id=1),
+                {'title': "No dates"},
+            ],
+            'update': [{'id': 9999, 'title': "Missing"}, {'id': self.event.pk, 'title': ""}],
+            'delete': ['abc'],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        create = response.data['create']
+        self.assertEqual([result['status'] for result in create], ['created'] + ['invalid'] * 4)
+        self.assertIn('end_date', create[1]['errors'])
+        self.assertIn('venue', create[2]['errors'])
+        self.assertIn('id', create[3]['errors'])
+        self.assertIn('start_date', create[4]['errors'])
+        self.assertEqual(
+            [result['status'] for result in response.data['update']], ['not_found', 'invalid']
+        )
+        self.assertEqual(response.data['delete'][0]['status'], 'invalid')
+        self.assertEqual(Event.objects.count(), 2)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.title, "Existing")
+
+    def test_update_past_event(self):
+        """Test that a past event can be edited unless it is rescheduled"""
+        past = timezone.now() - timedelta(days=60)
+        old = Event.objects.bulk_create([Event(
+            title="Old", start_date=past, end_date=past + timedelta(hours=2), venue=self.park
+        )])[0]
+
+        response = self.client.post(self.url, {'update': [
+            {'id': old.pk, 'title': "Old, with photos"},
+        ]}, format='json')
+        self.assertEqual(response.data['counts'], {'updated': 1})
+        old.refresh_from_db()
+        self.assertEqual(old.title, "Old, with photos")
+
+        response = self.client.post(self.url, {'update': [
+            {'id': old.pk, 'end_date': (past + timedelta(hours=3)).isoformat()},
+        ]}, format='json')
+        self.assertIn('start_date', response.data['update'][0]['errors'])
+
+    def test_validates_in_batches(self):
+        """Test that a chunk costs the same queries for one event or twenty"""
+        def queries(count):
+            items = [self.new_event(f"Event {i}", category=self.music.pk) for i in range(count)]
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.post(self.url, {'create': items}, format='json')
+            self.assertEqual(response.data['counts'], {'created': count})
+            return len(captured)
+
+        queries(1)  # Loads the editor's permissions
+        self.assertEqual(queries(1), queries(20))
+
+    @override_settings(EVENT_PREVENT_DOUBLE_BOOKING=True)
+    def test_double_booking_in_batch(self):
+        """Test that events clashing with each other or saved ones are refused"""
+        response = self.client.post(self.url, {'create': [
+            self.new_event(
+                "Clash", start_date=self.start.isoformat(), end_date=(self.start + timedelta(hours=1)).isoformat()
+            ),
+            self.new_event("Fine"),
+        ]}, format='json')
+
+        self.assertEqual([result['status'] for result in response.data['create']], ['invalid', 'created'])
+        self.assertIn('"Existing"', response.data['create'][0]['errors']['start_date'][0])
+
+    @override_settings(EVENT_BULK_CHUNK_SIZE=2, EVENT_BULK_MAX_OPERATIONS=5)
+    def test_chunks_and_limit(self):
+        """Test that chunks commit on their own and large requests are refused"""
+        response = self.client.post(
+            self.url, {'create': [self.new_event(f"Event {i}") for i in range(5)]}, format='json'
+        )
+        self.assertEqual(response.data['counts'], {'created': 5})
+
+        response = self.client.post(
+            self.url, {'create': [self.new_event(f"Event {i}") for i in range(6)]}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(self.url, {'upsert': []}, format='json')
+        self.assertEqual(response.status_code, 400)
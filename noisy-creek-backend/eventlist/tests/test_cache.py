@@ -0,0 +1,236 @@
+import json
+import tempfile
+import threading
+import time
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import timedelta
+from io import StringIO
+from eventlist.cache import bump_generation, get_generation, get_or_compute
+from eventlist.models import Event, Category, Venue
+from eventlist.warming import manifest_from_log
+
+
+@override_settings(EVENT_CACHE_WARM_BASE_URL='http://testserver')
+class EventCacheTest(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.music = Category.objects.create(name="Music")
+        self.art = Category.objects.create(name="Art & Culture")
+        self.venue = Venue.objects.create(name="Test Venue", capacity=100)
+        self.event = Event.objects.create(
+            title="Upcoming Concert",
+            start_date=timezone.now() + timedelta(days=7),
+            end_date=timezone.now() + timedelta(days=7, hours=3),
+            category=self.music,
+            venue=self.venue
+        )
+
+    def test_list_is_cached_until_data_changes(self):
+        """Test that repeated list requests are served from the cache"""
+        url = reverse('event-list')
+        self.client.get(url, {'category': 'Music', 'upcoming': 'true'})
+
+        # Same params in a different order hit the same entry
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'upcoming': 'true', 'category': 'Music'})
+        self.assertEqual(response.data['count'], 1)
+
+        Event.objects.create(
+            title="Another Concert",
+            start_date=timezone.now() + timedelta(days=8),
+            end_date=timezone.now() + timedelta(days=8, hours=3),
+            category=self.music,
+            venue=self.venue
+        )
+        response = self.client.get(url, {'category': 'Music', 'upcoming': 'true'})
+        self.assertEqual(response.data['count'], 2)
+
+    def test_pages_cached_during_a_write_are_stale_after_commit(self):
+        """Test that a page cached before a write commits isn't served after it"""
+        url = reverse('event-list')
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.event.title = "Rescheduled Concert"
+                self.event.save()
+                # Another connection would still read the old rows here
+                self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertTrue(queries.captured_queries)
+
+    def test_detail_is_invalidated_by_related_writes(self):
+        """Test that editing a venue invalidates cached event details"""
+        url = reverse('event-detail', kwargs={'pk': self.event.pk})
+        self.client.get(url)
+
+        self.venue.name = "Renamed Venue"
+        self.venue.save()
+        response = self.client.get(url)
+        self.assertEqual(response.data['venue']['name'], "Renamed Venue")
+
+    def shared_cache(self, directory):
+        """Settings for a file cache, which the warm command accepts"""
+        return self.settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': directory,
+        }})
+
+    def test_warm_command_needs_shared_cache(self):
+        """Test that warming a process-local cache is refused"""
+        with self.assertRaisesMessage(CommandError, 'private to this process'):
+            call_command('warm_event_cache', '--workers', '1', stdout=StringIO())
+
+    def test_warm_command_with_default_manifest(self):
+        """Test that the warm command fills the cache for hot pages"""
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory, self.shared_cache(directory):
+            call_command('warm_event_cache', '--workers', '1', stdout=out)
+            # Unfiltered, upcoming, two categories and one event detail
+            self.assertIn("Warmed 5 cache entries", out.getvalue())
+
+            with self.assertNumQueries(0):
+                self.client.get(reverse('event-list'), {'category': 'Art & Culture'})
+                self.client.get(reverse('event-detail', kwargs={'pk': self.event.pk}))
+
+    def test_warm_command_with_manifest_file(self):
+        """Test warming from a configured manifest"""
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as manifest:
+            json.dump({'lists': [{'category': 'Music', 'page_size': '3'}], 'details': [99999]}, manifest)
+            manifest.flush()
+            out = StringIO()
+            with tempfile.TemporaryDirectory() as directory, self.shared_cache(directory):
+                call_command('warm_event_cache', '--manifest', manifest.name, '--workers', '1', stdout=out)
+
+        self.assertIn("Warmed 1 cache entries", out.getvalue())
+        self.assertIn("1 entries did not return 200", out.getvalue())
+
+    def test_manifest_from_access_log(self):
+        """Test building a warm list from access log lines"""
+        lines = [
+            '[19/Oct/2026 10:00:00] "GET /api/events/?category=Music&page=2 HTTP/1.1" 200 1234',
+            '[19/Oct/2026 10:00:01] "GET /api/events/?page=2&category=Music HTTP/1.1" 200 1234',
+            '127.0.0.1 - - [19/Oct/2026:10:00:02] "GET /api/events/12/ HTTP/1.1" 200 99',
+            '[19/Oct/2026 10:00:03] "POST /api/events/ HTTP/1.1" 405 0',
+            '[19/Oct/2026 10:00:04] "GET /admin/ HTTP/1.1" 200 0',
+        ]
+        manifest = manifest_from_log(lines)
+        self.assertEqual(manifest['lists'], [{'category': 'Music', 'page': '2'}])
+        self.assertEqual(manifest['details'], [12])
+
+
+class RequestCoalescingTest(SimpleTestCase):
+    def setUp(self):
+        self.key = f'eventlist:test:{self._testMethodName}'
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+        self.release = threading.Event()
+
+    def tearDown(self):
+        cache.delete(self.key)
+        cache.delete(f'{self.key}:lock')
+
+    def slow_compute(self):
+        with self.calls_lock:
+            self.calls += 1
+        self.release.wait(5)
+        return {'count': 42}
+
+    def run_threads(self, count, target):
+        results = []
+        results_lock = threading.Lock()
+
+        def worker():
+            value = target()
+            with results_lock:
+                results.append(value)
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def test_concurrent_misses_compute_once(self):
+        """Test that concurrent misses for one key share a single computation"""
+        threads, results = self.run_threads(
+            20, lambda: get_or_compute(self.key, self.slow_compute)
+        )
+        time.sleep(0.2)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{'count': 42}] * 20)
+        self.assertEqual(get_or_compute(self.key, self.slow_compute), {'count': 42})
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_served_while_revalidating(self):
+        """Test that stale data is served while one worker refreshes it"""
+        get_or_compute(self.key, lambda: {'count': 1})
+        bump_generation()
+
+        leader = threading.Thread(target=get_or_compute, args=(self.key, self.slow_compute))
+        leader.start()
+        time.sleep(0.1)
+
+        threads, results = self.run_threads(10, lambda: get_or_compute(self.key, self.slow_compute))
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, [{'count': 1}] * 10)
+
+        self.release.set()
+        leader.join(5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(get_or_compute(self.key, self.slow_compute), {'count': 42})
+
+    def test_waits_for_lock_held_by_another_process(self):
+        """Test that a miss waits for a computation another process holds the lock for"""
+        # Simulate another worker process holding the lock and storing a result
+        cache.add(f'{self.key}:lock', 1, 10)
+        generation = get_generation()
+
+        def other_process():
+            time.sleep(0.2)
+            from eventlist.cache import _store
+            _store(self.key, {'count': 7}, generation)
+            cache.delete(f'{self.key}:lock')
+
+        threading.Thread(target=other_process).start()
+        self.release.set()
+        self.assertEqual(get_or_compute(self.key, self.slow_compute), {'count': 7})
+        self.assertEqual(self.calls, 0)
+
+    def test_errors_reach_every_waiter(self):
+        """Test that a failed computation raises in waiting threads too and isn't cached"""
+        def failing():
+            self.release.wait(5)
+            raise RuntimeError("database went away")
+
+        errors = []
+
+        def worker():
+            try:
+                get_or_compute(self.key, failing)
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(errors), 5)
+        self.assertIsNone(cache.get(self.key))
@@ -0,0 +1,165 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import datetime, timedelta, timezone as dt_timezone
+from eventlist.models import ArchivedEvent, Category, Event, Venue
+
+
+class EventCalendarTest(TestCase):
+    def setUp(self):
+        """Set up events in two upcoming months"""
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('event-calendar')
+        self.music = Category.objects.create(name="Music")
+        self.venue = Venue.objects.create(name="Test Venue")
+
+        soon = timezone.now() + timedelta(days=62)
+        self.year, self.month = soon.year, soon.month
+        following = soon + timedelta(days=31)
+        self.next_year, self.next_month = following.year, following.month
+
+        # 23:30 UTC on the 10th is already the 11th in Tokyo
+        self.late = self.create_event("Late Show", self.at(10, 23, 30))
+        self.morning = self.create_event("Morning Talk", self.at(10, 9), category=self.music)
+        self.other = self.create_event(
+            "Next Month", datetime(self.next_year, self.next_month, 5, 12, tzinfo=dt_timezone.utc)
+        )
+
+    def at(self, day, hour, minute=0):
+        return datetime(self.year, self.month, day, hour, minute, tzinfo=dt_timezone.utc)
+
+    def create_event(self, title, start, category=None):
+        return Event.objects.create(
+            title=title,
+            start_date=start,
+            end_date=start + timedelta(hours=1),
+            category=category,
+            venue=self.venue
+        )
+
+    def get(self, **params):
+        params = {'year': self.year, 'month': self.month, **params}
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def day(self, data, number):
+        return data['days'][number - 1]
+
+    def titles(self, day):
+        return [event['title'] for event in day['events']]
+
+    def test_days_are_bucketed_in_utc_by_default(self):
+        """Test that every day of the month is listed with its events"""
+        data = self.get()
+
+        self.assertEqual(data['tz'], 'UTC')
+        self.assertEqual(data['days'][0]['date'], f'{self.year}-{self.month:02d}-01')
+        self.assertEqual(self.day(data, 10)['count'], 2)
+        self.assertEqual(self.titles(self.day(data, 10)), ["Morning Talk", "Late Show"])
+        self.assertEqual(self.day(data, 11)['count'], 0)
+        self.assertEqual(
+            set(self.day(data, 10)['events'][0]),
+            {'id', 'title', 'start_date', 'end_date', 'category_id', 'venue_id'}
+        )
+
+    def test_days_are_bucketed_in_requested_time_zone(self):
+        """Test that events fall on their local day, with local times"""
+        data = self.get(tz='Asia/Tokyo')
+
+        self.assertEqual(data['tz'], 'Asia/Tokyo')
+        self.assertEqual(self.titles(self.day(data, 10)), ["Morning Talk"])
+        self.assertEqual(self.titles(self.day(data, 11)), ["Late Show"])
+        self.assertTrue(self.day(data, 11)['events'][0]['start_date'].endswith('+09:00'))
+
+    def test_per_day_limits_events_but_not_count(self):
+        """Test that only the first events of a busy day are listed"""
+        for hour in range(12, 16):
+            self.create_event(f"Set {hour}", self.at(10, hour))
+
+        day = self.day(self.get(per_day=2), 10)
+
+        self.assertEqual(day['count'], 6)
+        self.assertEqual(self.titles(day), ["Morning Talk", "Set 12"])
+
+    def test_category_filter(self):
+        """Test that ?category= filters like the list endpoint"""
+        day = self.day(self.get(category='music'), 10)
+
+        self.assertEqual(day['count'], 1)
+        self.assertEqual(self.titles(day), ["Morning Talk"])
+
+    def test_month_is_read_with_one_grouped_query(self):
+        """Test that the month is one query (plus the archive check) and then cached"""
+        with self.assertNumQueries(2):
+            self.get()
+        with self.assertNumQueries(0):
+            self.get()
+
+    def test_writes_only_invalidate_their_month(self):
+        """Test that editing an event leaves other months cached"""
+        self.get()
+        self.get(year=self.next_year, month=self.next_month)
+
+        self.morning.title = "Renamed Talk"
+        self.morning.save()
+
+        with self.assertNumQueries(0):
+            self.get(year=self.next_year, month=self.next_month)
+        self.assertEqual(self.titles(self.day(self.get(), 10)), ["Renamed Talk", "Late Show"])
+
+    def test_moving_an_event_invalidates_both_months(self):
+        """Test that an event moved to another month leaves the old one"""
+        self.get()
+        self.get(year=self.next_year, month=self.next_month)
+
+        event = Event.objects.get(pk=self.late.pk)
+        event.start_date = datetime(self.next_year, self.next_month, 5, 18, tzinfo=dt_timezone.utc)
+        event.end_date = event.start_date + timedelta(hours=1)
+        event.save()
+
+        self.assertEqual(self.day(self.get(), 10)['count'], 1)
+        next_month = self.get(year=self.next_year, month=self.next_month)
+        self.assertEqual(self.titles(self.day(next_month, 5)), ["Next Month", "Late Show"])
+
+    def test_bulk_writes_invalidate_calendar(self):
+        """Test that bulk creates and updates reach cached months"""
+        self.get()
+        Event.objects.bulk_create([
+            Event(title="Imported", start_date=self.at(12, 10), end_date=self.at(12, 11), venue=self.venue)
+        ])
+        self.assertEqual(self.day(self.get(), 12)['count'], 1)
+
+        Event.objects.filter(title="Imported").update(start_date=self.at(13, 10), end_date=self.at(13, 11))
+        data = self.get()
+        self.assertEqual(self.day(data, 12)['count'], 0)
+        self.assertEqual(self.day(data, 13)['count'], 1)
+
+    def test_archived_events_are_included(self):
+        """Test that months reaching into the archive read it too"""
+        start = datetime(2020, 2, 3, 20, tzinfo=dt_timezone.utc)
+        ArchivedEvent.objects.create(
+            id=self.other.pk + 1,
+            title="Archived Concert",
+            start_date=start,
+            end_date=start + timedelta(hours=2),
+            category=self.music,
+            venue=self.venue
+        )
+
+        data = self.get(year=2020, month=2)
+
+        self.assertEqual(len(data['days']), 29)
+        self.assertEqual(self.titles(self.day(data, 3)), ["Archived Concert"])
+
+    def test_invalid_params_are_ignored(self):
+        """Test that invalid year, month, tz and per_day fall back to the defaults"""
+        response = self.client.get(self.url, {'year': 'abc', 'month': '13', 'tz': 'Mars/Base', 'per_day': '0'})
+
+        self.assertEqual(response.status_code, 200)
+        now = timezone.now()
+        self.assertEqual((response.data['year'], response.data['month']), (now.year, now.month))
+        self.assertEqual(response.data['tz'], 'UTC')
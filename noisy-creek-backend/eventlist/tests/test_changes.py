@@ -0,0 +1,186 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import timedelta
+from io import StringIO
+from eventlist.archive import archive_events
+from eventlist.changes import compact_changes
+from eventlist.models import Category, Change, Event, Venue
+
+
+class ChangeFeedTest(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.url = reverse('change-feed')
+        self.music = Category.objects.create(name="Music")
+        self.venue = Venue.objects.create(name="Test Venue")
+        self.event = Event.objects.create(
+            title="Concert",
+            start_date=timezone.now() + timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=1, hours=2),
+            category=self.music,
+            venue=self.venue
+        )
+
+    def latest_seq(self):
+        return Change.objects.order_by('-seq').values_list('seq', flat=True).first()
+
+    def actions(self, response):
+        return [(c['model'], c['id'], c['action']) for c in response.data['changes']]
+
+    def test_creates_are_recorded_in_order(self):
+        """Test that the feed lists every create with increasing sequence numbers"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(self.actions(response), [
+            ('category', self.music.pk, 'create'),
+            ('venue', self.venue.pk, 'create'),
+            ('event', self.event.pk, 'create'),
+        ])
+        seqs = [c['seq'] for c in response.data['changes']]
+        self.assertEqual(seqs, sorted(seqs))
+        self.assertEqual(response.data['next_since'], seqs[-1])
+        self.assertFalse(response.data['has_more'])
+
+        event = response.data['changes'][2]['data']
+        self.assertEqual(event['title'], "Concert")
+        self.assertEqual(event['venue_id'], self.venue.pk)
+
+    def test_since_returns_only_later_changes(self):
+        """Test that a mirror only receives what changed after its last sync"""
+        since = self.latest_seq()
+        self.event.title = "Renamed Concert"
+        self.event.save()
+
+        response = self.client.get(self.url, {'since': since})
+
+        self.assertEqual(self.actions(response), [('event', self.event.pk, 'update')])
+        self.assertEqual(response.data['changes'][0]['data']['title'], "Renamed Concert")
+
+    def test_limit_pages_with_has_more(self):
+        """Test that limit caps the page and next_since continues it"""
+        response = self.client.get(self.url, {'limit': 2})
+        self.assertEqual(len(response.data['changes']), 2)
+        self.assertTrue(response.data['has_more'])
+
+        response = self.client.get(self.url, {'since': response.data['next_since'], 'limit': 2})
+        self.assertEqual(self.actions(response), [('event', self.event.pk, 'create')])
+        self.assertFalse(response.data['has_more'])
+
+    def test_invalid_params_are_ignored(self):
+        """Test that invalid since/limit values fall back to the defaults"""
+        response = self.client.get(self.url, {'since': 'abc', 'limit': 'xyz'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['changes']), 3)
+
+    def test_deletes_are_tombstones(self):
+        """Test that deleting a venue leaves tombstones for it and its events"""
+        since = self.latest_seq()
+        event_pk, venue_pk = self.event.pk, self.venue.pk
+        self.venue.delete()
+
+        response = self.client.get(self.url, {'since': since})
+
+        self.assertCountEqual(self.actions(response), [
+            ('event', event_pk, 'delete'),
+            ('venue', venue_pk, 'delete'),
+        ])
+        for change in response.data['changes']:
+            self.assertIsNone(change['data'])
+
+    def test_archiving_is_not_recorded(self):
+        """Test that archived events, still served by the API, get no tombstone"""
+        old = Event.objects.bulk_create([Event(
+            title="Old Concert",
+            start_date=timezone.now() - timedelta(days=100),
+            end_date=timezone.now() - timedelta(days=100, hours=-2),
+            venue=self.venue
+        )])[0]
+        since = self.latest_seq()
+
+        self.assertEqual(archive_events(90), 1)
+
+        self.assertFalse(Change.objects.filter(seq__gt=since).exists())
+        response = self.client.get(reverse('event-detail', kwargs={'pk': old.pk}))
+        self.assertEqual(response.status_code, 200)
+        # Recording resumes after archiving
+        self.event.delete()
+        self.assertEqual(Change.objects.filter(seq__gt=since).count(), 1)
+
+    def test_feed_reads_archived_events(self):
+        """Test that changes to an archived event still carry its data"""
+        since = self.latest_seq()
+        old = Event.objects.bulk_create([Event(
+            title="Old Concert",
+            start_date=timezone.now() - timedelta(days=100),
+            end_date=timezone.now() - timedelta(days=100, hours=-2),
+            venue=self.venue
+        )])[0]
+        Event.objects.filter(pk=old.pk).update(title="Old Concert (Sold Out)")
+        archive_events(90)
+        compact_changes()
+
+        response = self.client.get(self.url, {'since': since})
+
+        self.assertEqual(self.actions(response), [('event', old.pk, 'update')])
+        data = response.data['changes'][0]['data']
+        self.assertEqual(data['title'], "Old Concert (Sold Out)")
+        self.assertEqual(data['venue_id'], self.venue.pk)
+
+    def test_bulk_paths_are_recorded(self):
+        """Test that bulk_create, update and bulk_update reach the feed"""
+        since = self.latest_seq()
+        created = Category.objects.bulk_create([Category(name="Art"), Category(name="Sports")])
+        Event.objects.filter(pk=self.event.pk).update(category=None)
+        self.venue.name = "Renamed Venue"
+        Venue.objects.bulk_update([self.venue], ['name'])
+
+        response = self.client.get(self.url, {'since': since})
+
+        self.assertEqual(self.actions(response), [
+            ('category', created[0].pk, 'create'),
+            ('category', created[1].pk, 'create'),
+            ('event', self.event.pk, 'update'),
+            ('venue', self.venue.pk, 'update'),
+        ])
+        self.assertIsNone(response.data['changes'][2]['data']['category_id'])
+
+    def test_compaction_keeps_latest_change_per_object(self):
+        """Test that compaction drops superseded entries and keeps tombstones"""
+        for title in ("Second", "Third"):
+            self.event.title = title
+            self.event.save()
+        self.venue.name = "Renamed Venue"
+        self.venue.save()
+        art = Category.objects.create(name="Art")
+        category_pk = art.pk
+        art.delete()
+
+        removed = compact_changes(chunk_size=2)
+
+        # Venue create, event create and first update, Art create
+        self.assertEqual(removed, 4)
+        response = self.client.get(self.url)
+        self.assertCountEqual(self.actions(response), [
+            ('category', self.music.pk, 'create'),
+            ('event', self.event.pk, 'update'),
+            ('venue', self.venue.pk, 'update'),
+            ('category', category_pk, 'delete'),
+        ])
+
+    def test_compact_changes_command(self):
+        """Test the compact_changes management command"""
+        self.event.save()
+        out = StringIO()
+
+        call_command('compact_changes', '--dry-run', stdout=out)
+        self.assertIn("Would remove 1 changes", out.getvalue())
+        self.assertEqual(Change.objects.count(), 4)
+
+        call_command('compact_changes', stdout=out)
+        self.assertIn("Removed 1 changes", out.getvalue())
+        self.assertEqual(Change.objects.count(), 3)
@@ -0,0 +1,131 @@
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from eventlist.counts import estimate_event_count, refresh_day_counts
+from eventlist.models import Category, Event, EventDayCount, Venue
+from eventlist.paginators import ApproximateCountPaginator
+from eventlist.taskqueue import run_pending
+
+
+class EstimatedCountTest(TestCase):
+    def setUp(self):
+        """Set up events over a few days"""
+        self.client = APIClient()
+        self.url = reverse('event-list')
+        self.music = Category.objects.create(name="Music")
+        self.art = Category.objects.create(name="Art & Culture")
+        self.venue = Venue.objects.create(name="Test Venue")
+        self.today = timezone.localdate()
+        for days, category in [(1, self.music), (1, self.music), (2, self.art), (3, self.music), (5, None)]:
+            self.create_event(days, category)
+
+    def create_event(self, days, category=None):
+        start = timezone.now() + timedelta(days=days)
+        return Event.objects.create(
+            title="Event",
+            start_date=start,
+            end_date=start + timedelta(hours=2),
+            category=category,
+            venue=self.venue
+        )
+
+    def day(self, days):
+        return timezone.localdate(timezone.now() + timedelta(days=days))
+
+    def test_estimates_sum_day_counts(self):
+        """Test that filter combinations are estimated from the day table"""
+        self.assertIsNone(estimate_event_count())
+        refresh_day_counts()
+
+        self.assertEqual(estimate_event_count(), 5)
+        self.assertEqual(estimate_event_count(category='music'), 3)
+        self.assertEqual(estimate_event_count(start=self.day(2)), 3)
+        self.assertEqual(estimate_event_count(category='Music', start=self.day(2), end=self.day(5)), 1)
+
+    def test_small_results_are_counted_exactly(self):
+        """Test that results under the limit keep an exact count"""
+        refresh_day_counts()
+        EventDayCount.objects.update(count=100)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data['count'], 5)
+        self.assertFalse(response.data['count_estimated'])
+
+    @mock.patch.object(ApproximateCountPaginator, 'count_limit', 2)
+    def test_large_results_use_estimate(self):
+        """Test that large results are estimated and exact counts are opt-in"""
+        refresh_day_counts()
+        self.create_event(4, self.music)  # Not counted until the next refresh
+
+        response = self.client.get(self.url, {'category': 'music'})
+        self.assertEqual(response.data['count'], 3)
+        self.assertTrue(response.data['count_estimated'])
+
+        response = self.client.get(self.url, {'category': 'music', 'count': 'exact'})
+        self.assertEqual(response.data['count'], 4)
+        self.assertFalse(response.data['count_estimated'])
+
+    @mock.patch.object(ApproximateCountPaginator, 'count_limit', 2)
+    def test_low_estimate_keeps_later_pages_reachable(self):
+        """Test that rows the estimate misses are still on reachable pages"""
+        refresh_day_counts()
+        for _ in range(4):
+            self.create_event(4, self.music)  # 7 music events, 3 estimated
+
+        params = {'category': 'music', 'page_size': 3}
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.data['count'], 3)
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 3)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+
+        # Past the estimated pages: counted exactly instead of a 404
+        response = self.client.get(self.url, {**params, 'page': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['count'], 7)
+        self.assertFalse(response.data['count_estimated'])
+
+        response = self.client.get(self.url, {**params, 'page': 4})
+        self.assertEqual(response.status_code, 404)
+
+    @mock.patch.object(ApproximateCountPaginator, 'count_limit', 2)
+    def test_falls_back_to_full_count_without_table(self):
+        """Test that a filtered list is counted when there is nothing to estimate from"""
+        response = self.client.get(self.url, {'category': 'music'})
+
+        self.assertEqual(response.data['count'], 3)
+        self.assertFalse(response.data['count_estimated'])
+
+    @override_settings(EVENT_COUNT_REFRESH_ON_WRITE=True)
+    def test_writes_queue_refresh_of_their_days(self):
+        """Test that saves recount the days an event moved between"""
+        refresh_day_counts()
+        event = Event.objects.filter(category=self.art).get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event.start_date += timedelta(days=2)
+            event.end_date += timedelta(days=2)
+            event.save()
+        run_pending()
+
+        counts = dict(EventDayCount.objects.filter(category=self.art).values_list('day', 'count'))
+        self.assertEqual(counts, {self.day(4): 1})
+
+    def test_refresh_command(self):
+        """Test the refresh_event_counts management command"""
+        out = StringIO()
+        call_command('refresh_event_counts', stdout=out)
+
+        self.assertIn("Wrote 4 day counts", out.getvalue())
+        self.assertEqual(estimate_event_count(), 5)
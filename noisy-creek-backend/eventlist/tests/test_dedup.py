@@ -0,0 +1,138 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+from io import StringIO
+from eventlist.dedup import drop_duplicates, find_duplicate_events, jaccard, shingles
+from eventlist.models import Category, Event, EventPost, Venue
+
+FESTIVAL = (
+    "Three-day music festival featuring over 50 artists across multiple stages. "
+    "Food vendors, art installations, and family-friendly activities."
+)
+
+
+class DuplicateEventsTest(TestCase):
+    def setUp(self):
+        """Set up an event and a partner feed's copy of it"""
+        self.music = Category.objects.create(name="Music")
+        self.park = Venue.objects.create(name="Gas Works Park")
+        self.club = Venue.objects.create(name="The Crocodile")
+        self.start = timezone.now().replace(hour=12) + timedelta(days=10)
+        self.festival = self.create_event("Summer Music Festival", FESTIVAL)
+        self.copy = self.create_event(
+            "Summer Music Fest 2026", FESTIVAL.replace("Three-day", "3 day"),
+            category=self.music, hours=1
+        )
+        self.other = self.create_event("Charity Fun Run", "5K and 10K runs through scenic park trails.")
+
+    def create_event(self, title, description, category=None, venue=None, hours=0, save=True):
+        event = Event(
+            title=title,
+            description=description,
+            start_date=self.start + timedelta(hours=hours),
+            end_date=self.start + timedelta(hours=hours + 2),
+            category=category,
+            venue=venue or self.park
+        )
+        if save:
+            event.save()
+        return event
+
+    def test_similar_titles_are_close(self):
+        """Test that reworded copies have a high shingle similarity"""
+        a = shingles(self.festival.title, self.festival.description)
+        b = shingles(self.copy.title, self.copy.description)
+        c = shingles(self.other.title, self.other.description)
+
+        self.assertGreater(jaccard(a, b), 0.8)
+        self.assertLess(jaccard(a, c), 0.2)
+
+    def test_finds_duplicates_at_same_venue_and_day(self):
+        """Test that only the copy is reported, pointing at the older event"""
+        self.create_event("Summer Music Festival", FESTIVAL, venue=self.club)
+        self.create_event("Summer Music Festival", FESTIVAL, hours=48)
+
+        duplicates = list(find_duplicate_events())
+
+        self.assertEqual(len(duplicates), 1)
+        self.assertEqual(duplicates[0].event, self.copy)
+        self.assertEqual(duplicates[0].canonical, self.festival)
+
+    def test_days_are_local_days(self):
+        """Test that an evening's events share a bucket across UTC midnight"""
+        local = ZoneInfo(settings.EVENT_LOCAL_TIME_ZONE)
+        self.start = datetime.combine(self.start.date() + timedelta(days=30), time(15, 30), tzinfo=local)
+        evening = self.create_event("Summer Music Festival", FESTIVAL, venue=self.club)
+        late = self.create_event("Summer Music Fest 2026", FESTIVAL, venue=self.club, hours=2)
+        # A day apart in TIME_ZONE (UTC)
+        self.assertNotEqual(timezone.localdate(evening.start_date), timezone.localdate(late.start_date))
+
+        duplicates = list(find_duplicate_events(Event.objects.filter(venue=self.club)))
+
+        self.assertEqual([(d.event, d.canonical) for d in duplicates], [(late, evening)])
+
+    def test_groups_point_at_oldest_event(self):
+        """Test that several copies all point at the first event"""
+        third = self.create_event("Summer Music Festival 2026", FESTIVAL)
+
+        duplicates = {duplicate.event: duplicate.canonical for duplicate in find_duplicate_events()}
+
+        self.assertEqual(duplicates, {self.copy: self.festival, third: self.festival})
+
+    def test_busy_day_uses_lsh_buckets(self):
+        """Test that large venue-day groups find copies through MinHash bands"""
+        topics = ["jazz", "yoga", "poetry", "soccer", "theater", "foraging", "pottery", "chess", "salsa", "tango"]
+        for topic in topics:
+            self.create_event(f"{topic.title()} Workshop", f"{topic} " * 5)
+
+        duplicates = list(find_duplicate_events())
+
+        self.assertEqual([(d.event, d.canonical) for d in duplicates], [(self.copy, self.festival)])
+
+    def test_command_flags_duplicates(self):
+        """Test that the command flags duplicates once and supports a dry run"""
+        out = StringIO()
+        call_command('find_duplicate_events', '--dry-run', stdout=out)
+        self.assertIn('"Summer Music Fest 2026"', out.getvalue())
+        self.assertIn("Found 1 duplicates", out.getvalue())
+        self.assertFalse(Event.objects.filter(duplicate_of__isnull=False).exists())
+
+        call_command('find_duplicate_events', stdout=out)
+        self.assertIn("Flagged 1 duplicates", out.getvalue())
+        self.copy.refresh_from_db()
+        self.assertEqual(self.copy.duplicate_of, self.festival)
+
+        out = StringIO()
+        call_command('find_duplicate_events', stdout=out)
+        self.assertIn("Flagged 0 duplicates", out.getvalue())
+
+    def test_command_merges_duplicates(self):
+        """Test that merging keeps the older event with the copy's posts and category"""
+        post = EventPost.objects.create(event=self.copy, content="Lineup announced!")
+
+        call_command('find_duplicate_events', '--merge', stdout=StringIO())
+
+        self.assertFalse(Event.objects.filter(pk=self.copy.pk).exists())
+        post.refresh_from_db()
+        self.assertEqual(post.event_id, self.festival.pk)
+        self.festival.refresh_from_db()
+        self.assertEqual(self.festival.category, self.music)
+
+    def test_import_stage_drops_duplicates(self):
+        """Test that an import batch loses copies of saved and earlier batch events"""
+        batch = [
+            self.create_event("SUMMER MUSIC FESTIVAL!", FESTIVAL, save=False),
+            self.create_event("Jazz in the Park", "Monthly jazz series in the park.", save=False),
+            self.create_event("Jazz in the Park 2026", "Monthly jazz series in the park.", save=False),
+        ]
+
+        kept, duplicates = drop_duplicates(batch)
+
+        self.assertEqual(kept, [batch[1]])
+        self.assertEqual(
+            [(duplicate.event, duplicate.canonical) for duplicate in duplicates],
+            [(batch[0], self.festival), (batch[2], batch[1])]
+        )
@@ -0,0 +1,122 @@
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from io import StringIO
+from zoneinfo import ZoneInfo
+
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from eventlist.archive import archive_events
+from eventlist.models import ArchivedEvent, Category, Event, Venue
+
+
+PACIFIC = ZoneInfo('America/Los_Angeles')
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+def pacific(day, hour):
+    return datetime.combine(day, time(hour), tzinfo=PACIFIC)
+
+
+@override_settings(EVENT_LOCAL_TIME_ZONE='America/Los_Angeles')
+class LocalDateTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Music")
+        self.venue = Venue.objects.create(name="Gas Works Park")
+
+        # A Friday in the future, so saves pass Event.clean
+        today = timezone.localdate(timezone=PACIFIC)
+        self.friday = today + timedelta(days=7 + (4 - today.weekday()) % 7)
+
+    def create(self, title, start_date):
+        # Bulk create bypasses Event.clean for dates in the past
+        return Event.objects.bulk_create([Event(
+            title=title, start_date=start_date, end_date=start_date + timedelta(hours=2),
+            category=self.category, venue=self.venue
+        )])[0]
+
+    def list_titles(self, **params):
+        response = self.client.get(reverse('event-list'), params)
+        self.assertEqual(response.status_code, 200)
+        return {event['title'] for event in response.data['results']}
+
+    def test_save_uses_local_day(self):
+        """Test that a Friday evening show in Seattle is Friday, not Saturday UTC"""
+        start = pacific(self.friday, 20)
+        event = Event.objects.create(
+            title="Friday Show", start_date=start, end_date=start + timedelta(days=2), venue=self.venue
+        )
+        event.refresh_from_db()
+        self.assertEqual(event.start_date.astimezone(dt_timezone.utc).weekday(), 5)
+        self.assertEqual(event.local_date, self.friday)
+        self.assertEqual(event.local_weekday, 5)
+
+        event.start_date = pacific(self.friday + timedelta(days=1), 12)
+        event.save(update_fields=['start_date'])
+        event.refresh_from_db()
+        self.assertEqual(event.local_date, self.friday + timedelta(days=1))
+        self.assertEqual(event.local_weekday, 6)
+
+    def test_daylight_saving_change(self):
+        """Test that the offset follows the date: 07:30 UTC is still the
+        previous day in PDT, but the same day in PST"""
+        summer = self.create("Summer", utc(2026, 7, 4, 6, 30))
+        winter = self.create("Winter", utc(2026, 12, 5, 7, 30))
+        self.assertEqual(summer.local_date, date(2026, 7, 3))
+        self.assertEqual(winter.local_date, date(2026, 12, 4))
+
+    def test_bulk_create_and_update(self):
+        """Test that bulk writes keep the local dates current"""
+        Event.objects.bulk_create([
+            Event(title=f"Bulk {i}", start_date=utc(2026, 10, 17, 3), end_date=utc(2026, 10, 17, 5),
+                  venue=self.venue)
+            for i in range(2)
+        ])
+        self.assertEqual(set(Event.objects.values_list('local_weekday', flat=True)), {5})
+
+        Event.objects.filter(title="Bulk 0").update(start_date=utc(2026, 10, 18, 19))
+        Event.objects.filter(title="Bulk 1").update(start_date=F('start_date') + timedelta(days=1))
+        self.assertEqual(
+            dict(Event.objects.values_list('title', 'local_date')),
+            {"Bulk 0": date(2026, 10, 18), "Bulk 1": date(2026, 10, 17)}
+        )
+
+    def test_day_filters(self):
+        """Test on=, weekend= and weekday= against the local day"""
+        self.create("Friday Late", pacific(self.friday, 21))
+        self.create("Saturday", pacific(self.friday + timedelta(days=1), 13))
+        self.create("Sunday", pacific(self.friday + timedelta(days=2), 13))
+        self.create("Monday", pacific(self.friday + timedelta(days=3), 13))
+
+        saturday = self.friday + timedelta(days=1)
+        self.assertEqual(self.list_titles(on=saturday.isoformat()), {"Saturday"})
+        self.assertEqual(self.list_titles(weekend='true'), {"Saturday", "Sunday"})
+        self.assertEqual(self.list_titles(weekday='fri,mon'), {"Friday Late", "Monday"})
+        self.assertEqual(self.list_titles(weekday='7'), {"Sunday"})
+        self.assertEqual(self.list_titles(weekend='true', weekday='sunday,mon'), {"Sunday"})
+        # Invalid values are ignored
+        self.assertEqual(len(self.list_titles(on='not-a-date', weekday='someday')), 4)
+
+    def test_on_reaches_archive(self):
+        """Test that on= for an archived day reads the archive"""
+        event = self.create("Old Show", timezone.now() - timedelta(days=200))
+        archive_events(90)
+        self.assertTrue(ArchivedEvent.objects.filter(pk=event.pk, local_date=event.local_date).exists())
+        self.assertEqual(self.list_titles(on=event.local_date.isoformat()), {"Old Show"})
+
+    def test_refresh_command(self):
+        """Test that the command recomputes dates after a time zone change"""
+        event = self.create("Friday Show", utc(2026, 10, 17, 3))
+        out = StringIO()
+        with override_settings(EVENT_LOCAL_TIME_ZONE='Europe/Berlin'):
+            call_command('refresh_local_dates', stdout=out)
+        event.refresh_from_db()
+        self.assertEqual(event.local_date, date(2026, 10, 17))
+        self.assertIn("Updated local dates of 1 events", out.getvalue())
@@ -0,0 +1,88 @@
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import timedelta
+from unittest import mock
+from eventlist.models import Category, Event, Venue
+
+
+class MultiListTestMixin:
+    def setUp(self):
+        """Set up events in two categories"""
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('event-multi')
+        self.music = Category.objects.create(name="Music")
+        self.art = Category.objects.create(name="Art & Culture")
+        self.venue = Venue.objects.create(name="Test Venue")
+        for days, category in [(1, self.music), (2, self.art), (3, self.music), (-2, self.art)]:
+            start = timezone.now() + timedelta(days=days)
+            Event.objects.create(
+                title=f"{category.name} {days}",
+                start_date=start,
+                end_date=start + timedelta(hours=2),
+                category=category,
+                venue=self.venue
+            )
+
+    def get(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+
+class EventMultiListTest(MultiListTestMixin, TestCase):
+    def test_each_named_query_matches_list_endpoint(self):
+        """Test that every name maps to what /api/events/ returns for its params"""
+        data = self.get({'music.category': 'music', 'soon.upcoming': 'true'})
+
+        self.assertEqual(set(data), {'music', 'soon'})
+        for name, params in [('music', {'category': 'music'}), ('soon', {'upcoming': 'true'})]:
+            expected = self.client.get(reverse('event-list'), params).data
+            self.assertEqual(data[name], expected)
+        self.assertEqual(data['music']['count'], 2)
+        self.assertEqual(data['soon']['count'], 3)
+
+    def test_unnamed_params_apply_to_every_query(self):
+        """Test that shared params go to all queries and named ones override them"""
+        data = self.get({'page_size': '1', 'fields': 'id,title', 'a.category': 'music', 'b.page_size': '2'})
+
+        self.assertEqual(len(data['a']['results']), 1)
+        self.assertEqual(len(data['b']['results']), 2)
+        self.assertEqual(set(data['a']['results'][0]), {'id', 'title'})
+        self.assertIn('/api/events/?', data['a']['next'])
+
+    def test_queries_share_the_list_cache(self):
+        """Test that a list cached by /api/events/ is served without queries"""
+        self.client.get(reverse('event-list'), {'category': 'music'})
+
+        with self.assertNumQueries(0):
+            data = self.get({'music.category': 'music'})
+        self.assertEqual(data['music']['count'], 2)
+
+    def test_failed_query_is_reported_by_name(self):
+        """Test that one failing list doesn't fail the others"""
+        data = self.get({'bad.page': '99', 'good.category': 'music'})
+
+        self.assertEqual(data['bad']['error']['status'], 404)
+        self.assertEqual(data['good']['count'], 2)
+
+    def test_number_of_queries_is_limited(self):
+        """Test that too many named queries are rejected"""
+        params = {f'q{number}.page': '1' for number in range(11)}
+
+        response = self.client.get(self.url, params)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.get({}), {})
+
+
+class EventMultiListConcurrencyTest(MultiListTestMixin, TransactionTestCase):
+    @mock.patch('eventlist.views.can_query_concurrently', return_value=True)
+    def test_queries_run_on_pool_threads(self, concurrently):
+        """Test that lists run concurrently return the same data"""
+        data = self.get({'music.category': 'music', 'art.category': 'art & culture', 'all.page': '1'})
+
+        self.assertEqual((data['music']['count'], data['art']['count'], data['all']['count']), (2, 2, 4))
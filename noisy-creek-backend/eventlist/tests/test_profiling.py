@@ -0,0 +1,125 @@
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+from eventlist import profiling
+from eventlist.models import Event, Venue
+
+
+class ProfilerMiddlewareTest(TestCase):
+    def setUp(self):
+        """Set up an event and a temporary profile directory"""
+        self.client = APIClient()
+        self.url = reverse('event-list')
+        venue = Venue.objects.create(name="Test Venue")
+        start = timezone.now() + timedelta(days=1)
+        Event.objects.create(title="Concert", start_date=start, end_date=start + timedelta(hours=2), venue=venue)
+
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings = override_settings(EVENT_PROFILE_DIR=self.directory, EVENT_PROFILE_KEEP=3)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def stored(self):
+        return [path.stem for path in profiling.profile_paths()]
+
+    def test_requests_are_not_profiled_by_default(self):
+        """Test that plain requests leave no profile behind"""
+        response = self.client.get(self.url, {'profile': '1'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(self.stored(), [])
+
+    @mock.patch.object(profiling, 'pyinstrument', None)
+    def test_signed_header_profiles_request(self):
+        """Test that a valid token profiles the request and its queries"""
+        response = self.client.get(self.url, HTTP_X_PROFILE=profiling.make_token())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stored(), [response['X-Profile-Id']])
+        profile = profiling.load_profile(response['X-Profile-Id'])
+        self.assertEqual((profile['method'], profile['status']), ('GET', 200))
+        self.assertEqual(profile['profiler'], 'cProfile')
+        self.assertTrue(profile['functions'])
+        self.assertTrue(any('eventlist_event' in query['sql'] for query in profile['queries']))
+
+    @mock.patch.object(profiling, 'pyinstrument', None)
+    def test_profiled_request_skips_response_cache(self):
+        """Test that a profile shows the queries of a miss, not a cache hit"""
+        self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_X_PROFILE=profiling.make_token())
+
+        profile = profiling.load_profile(response['X-Profile-Id'])
+        self.assertTrue(any('eventlist_event' in query['sql'] for query in profile['queries']))
+        # Nor is the profiled response stored
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    @mock.patch.object(profiling, 'pyinstrument', None)
+    async def test_asgi_request_captures_view_queries(self):
+        """Test that queries of a sync view are captured under ASGI"""
+        response = await self.async_client.get(self.url, headers={'X-Profile': profiling.make_token()})
+
+        self.assertEqual(response.status_code, 200)
+        profile = profiling.load_profile(response['X-Profile-Id'])
+        self.assertTrue(any('eventlist_event' in query['sql'] for query in profile['queries']))
+        self.assertTrue(any('views.py' in row['function'] for row in profile['functions']))
+
+    def test_invalid_or_expired_token_is_ignored(self):
+        """Test that only fresh signed tokens trigger profiling"""
+        token = profiling.make_token()
+        self.client.get(self.url, HTTP_X_PROFILE=token + 'x')
+        with override_settings(EVENT_PROFILE_TOKEN_MAX_AGE=-1):
+            self.client.get(self.url, HTTP_X_PROFILE=token)
+
+        self.assertEqual(self.stored(), [])
+
+    def test_staff_can_profile_with_query_param(self):
+        """Test that ?profile=1 works for staff users only"""
+        self.client.force_login(User.objects.create_user('visitor'))
+        self.assertNotIn('X-Profile-Id', self.client.get(self.url, {'profile': '1'}))
+
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+        self.assertIn('X-Profile-Id', self.client.get(self.url, {'profile': '1'}))
+
+    def test_only_newest_profiles_are_kept(self):
+        """Test that the directory is a ring buffer of EVENT_PROFILE_KEEP profiles"""
+        ids = [
+            self.client.get(self.url, HTTP_X_PROFILE=profiling.make_token())['X-Profile-Id']
+            for _ in range(5)
+        ]
+
+        self.assertEqual(self.stored(), ids[2:])
+        self.assertEqual(list(self.directory.glob('.*.tmp')), [])
+
+    @mock.patch.object(profiling, 'pyinstrument', None)
+    def test_command_lists_and_shows_profiles(self):
+        """Test that request_profiles lists, shows and signs"""
+        profile_id = self.client.get(self.url, HTTP_X_PROFILE=profiling.make_token())['X-Profile-Id']
+
+        out = StringIO()
+        call_command('request_profiles', stdout=out)
+        self.assertIn(profile_id, out.getvalue())
+        self.assertIn('1 profiles', out.getvalue())
+
+        out = StringIO()
+        call_command('request_profiles', show=profile_id, stdout=out)
+        self.assertIn('Slowest queries:', out.getvalue())
+
+        out = StringIO()
+        call_command('request_profiles', token=True, stdout=out)
+        self.assertTrue(profiling.has_valid_token(out.getvalue().strip()))
+
+        with self.assertRaises(CommandError):
+            call_command('request_profiles', show='missing', stdout=StringIO())
@@ -0,0 +1,171 @@
+import datetime
+import decimal
+import io
+import math
+import unittest
+import uuid
+from unittest import mock
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from eventlist.models import Event, Category, SimilarEvent, Venue
+from eventlist.renderers import (
+    FastJSONParser,
+    FastJSONRenderer,
+    MessagePackParser,
+    MessagePackRenderer,
+    msgpack,
+    orjson,
+)
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    def sample(self):
+        return {
+            'title': "Música & Dança",
+            'emoji': "🎶",
+            'separators': "line paragraph ",
+            'start_date': datetime.datetime(2026, 10, 24, 19, 30, 0, 123456, tzinfo=datetime.timezone.utc),
+            'local': datetime.datetime(2026, 10, 24, 12, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=-7))),
+            'naive': datetime.datetime(2026, 10, 24, 19, 30),
+            'day': datetime.date(2026, 10, 24),
+            'price': decimal.Decimal('12.50'),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'duration': datetime.timedelta(hours=3),
+            'lazy': gettext_lazy("Events"),
+            'included': {1: {'name': "Gas Works Park"}},
+            'nested': [None, True, 1, 2.5, []],
+        }
+
+    @unittest.skipUnless(orjson, "orjson is not installed")
+    def test_output_matches_json_renderer(self):
+        """Test that orjson output is byte-identical to DRF's JSONRenderer"""
+        data = self.sample()
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    @unittest.skipUnless(orjson, "orjson is not installed")
+    def test_float_output(self):
+        """Test the documented float differences from DRF's JSONRenderer"""
+        data = {'scores': [0.25, 1e16, 1e-5, 1.2345678901234568e17]}
+        rendered = FastJSONRenderer().render(data)
+        self.assertEqual(rendered, b'{"scores":[0.25,1e16,0.00001,1.2345678901234568e17]}')
+        self.assertEqual(JSONParser().parse(io.BytesIO(rendered)), data)
+
+        data = {'scores': [math.nan, math.inf, -math.inf]}
+        self.assertEqual(FastJSONRenderer().render(data), b'{"scores":[null,null,null]}')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
+
+    def test_falls_back_without_orjson(self):
+        """Test that the renderer works when orjson isn't installed"""
+        data = self.sample()
+        with mock.patch('eventlist.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indented_output_uses_json_renderer(self):
+        """Test that indent requests keep working"""
+        data = {'title': "Música"}
+        rendered = FastJSONRenderer().render(data, 'application/json; indent=4')
+        self.assertEqual(rendered, JSONRenderer().render(data, 'application/json; indent=4'))
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_parser(self):
+        """Test that the parser matches JSONParser and reports bad input"""
+        body = '{"title": "Música & Dança", "ids": [1, 2]}'.encode()
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body))
+        )
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"title": '))
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"count": NaN}'))
+
+
+class RendererAPITest(TestCase):
+    def test_api_response_is_unicode_json(self):
+        """Test that the API renders unicode titles unescaped"""
+        category = Category.objects.create(name="Música & Dança")
+        venue = Venue.objects.create(name="Test Venue")
+        Event.objects.create(
+            title="Música & Dança",
+            start_date=timezone.now() + datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1, hours=2),
+            category=category,
+            venue=venue
+        )
+
+        response = APIClient().get(reverse('event-list'))
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn("Música & Dança".encode(), response.content)
+        self.assertEqual(response.json()['results'][0]['title'], "Música & Dança")
+
+
+@unittest.skipUnless(msgpack, "msgpack is not installed")
+class MessagePackAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        venue = Venue.objects.create(name="Gas Works Park")
+        self.event = Event.objects.create(
+            title="Música & Dança",
+            start_date=timezone.now() + datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1, hours=2),
+            venue=venue
+        )
+
+    def test_list_negotiates_msgpack(self):
+        """Test that Accept: application/msgpack returns the serializer structure"""
+        url = reverse('event-list')
+        response = self.client.get(url, HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertIn('Accept', response['Vary'])
+        data = msgpack.unpackb(response.content, timestamp=3, strict_map_key=False)
+        event = data['results'][0]
+        self.assertEqual(event['title'], "Música & Dança")
+        self.assertEqual(event['venue']['name'], "Gas Works Park")
+        # Timestamps are native, not ISO strings
+        self.assertEqual(event['start_date'], self.event.start_date)
+
+        # The JSON variant is cached separately and keeps string datetimes
+        response = self.client.get(url)
+        self.assertIsInstance(response.json()['results'][0]['start_date'], str)
+        self.assertIn('Accept', response['Vary'])
+
+    def test_detail_negotiates_msgpack(self):
+        url = reverse('event-detail', kwargs={'pk': self.event.pk})
+        response = self.client.get(url, {'fields': 'title,end_date'}, HTTP_ACCEPT='application/msgpack')
+        data = msgpack.unpackb(response.content, timestamp=3)
+        self.assertEqual(data, {'title': "Música & Dança", 'end_date': self.event.end_date})
+
+    def test_nested_events_get_native_datetimes(self):
+        """Test that events nested in a similar-events link are native too"""
+        similar = Event.objects.create(
+            title="Dança",
+            start_date=self.event.start_date,
+            end_date=self.event.end_date,
+            venue=self.event.venue
+        )
+        SimilarEvent.objects.create(event=self.event, similar=similar, score=0.9, rank=1)
+        url = reverse('event-similar', kwargs={'pk': self.event.pk})
+
+        response = self.client.get(url, HTTP_ACCEPT='application/msgpack')
+
+        data = msgpack.unpackb(response.content, timestamp=3)
+        self.assertEqual(data[0]['event']['start_date'], similar.start_date)
+        self.assertEqual(data[0]['event']['end_date'], similar.end_date)
+
+    def test_parser_round_trip(self):
+        """Test that the parser reads what the renderer writes"""
+        data = {'title': "Música", 'start_date': self.event.start_date, 'ids': [1, 2]}
+        body = MessagePackRenderer().render(data)
+        self.assertEqual(MessagePackParser().parse(io.BytesIO(body)), data)
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(io.BytesIO(b'\xc1'))
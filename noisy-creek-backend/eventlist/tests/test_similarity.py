@@ -0,0 +1,116 @@
+import unittest
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import timedelta
+from io import StringIO
+from eventlist.models import Category, Event, SimilarEvent, Task, Venue
+from eventlist.similarity import build_similar_events, np
+from eventlist.taskqueue import run_pending
+
+
+@unittest.skipUnless(np, "numpy is not installed")
+class SimilarEventsTest(TestCase):
+    def setUp(self):
+        """Set up events on two topics"""
+        self.client = APIClient()
+        self.music = Category.objects.create(name="Music")
+        self.art = Category.objects.create(name="Art & Culture")
+        self.hall = Venue.objects.create(name="Concert Hall")
+        self.gallery = Venue.objects.create(name="Gallery")
+        self.jazz = self.create_event("Jazz Night", "Live jazz quartet", self.music, self.hall)
+        self.jazz_brunch = self.create_event("Jazz Brunch", "Jazz trio and brunch", self.music, self.hall)
+        self.paintings = self.create_event("Oil Paintings", "Landscape paintings exhibition", self.art, self.gallery)
+        self.sculpture = self.create_event("Sculpture Show", "Modern sculpture exhibition", self.art, self.gallery)
+
+    def create_event(self, title, description, category, venue):
+        return Event.objects.create(
+            title=title,
+            description=description,
+            start_date=timezone.now() + timedelta(days=7),
+            end_date=timezone.now() + timedelta(days=7, hours=2),
+            category=category,
+            venue=venue
+        )
+
+    def neighbours(self, event):
+        return list(
+            SimilarEvent.objects.filter(event=event).order_by('rank').values_list('similar_id', flat=True)
+        )
+
+    def test_neighbours_share_topic(self):
+        """Test that the closest event is the one on the same topic"""
+        self.assertEqual(build_similar_events(top_k=2), 4)
+
+        self.assertEqual(self.neighbours(self.jazz)[0], self.jazz_brunch.pk)
+        self.assertEqual(self.neighbours(self.sculpture)[0], self.paintings.pk)
+        # Events with nothing in common are not recommended
+        self.assertEqual(self.neighbours(self.jazz), [self.jazz_brunch.pk])
+
+    def test_blocks_give_same_result(self):
+        """Test that block size doesn't change the neighbours"""
+        build_similar_events(top_k=3)
+        whole = {event.pk: self.neighbours(event) for event in Event.objects.all()}
+
+        build_similar_events(top_k=3, block_size=1, full=True)
+        self.assertEqual({event.pk: self.neighbours(event) for event in Event.objects.all()}, whole)
+
+    def test_incremental_update_adds_new_events(self):
+        """Test that new events are indexed and can displace old neighbours"""
+        build_similar_events(top_k=1)
+        self.assertEqual(self.neighbours(self.paintings), [self.sculpture.pk])
+
+        watercolours = self.create_event(
+            "Watercolour Paintings", "Landscape paintings exhibition", self.art, self.gallery
+        )
+        self.assertEqual(build_similar_events(top_k=1), 2)
+
+        self.assertEqual(self.neighbours(watercolours), [self.paintings.pk])
+        self.assertEqual(self.neighbours(self.paintings), [watercolours.pk])
+        self.assertEqual(self.neighbours(self.jazz), [self.jazz_brunch.pk])
+        self.assertEqual(build_similar_events(top_k=1), 0)
+
+    def test_similar_endpoint(self):
+        """Test that the endpoint serves the stored neighbours in one query"""
+        build_similar_events()
+        url = reverse('event-similar', kwargs={'pk': self.jazz.pk})
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['event']['title'], "Jazz Brunch")
+        self.assertEqual(response.data[0]['event']['venue']['name'], "Concert Hall")
+        self.assertGreater(response.data[0]['score'], 0)
+
+    def test_similar_endpoint_missing_event(self):
+        """Test that unknown events are 404 and unindexed ones are empty"""
+        response = self.client.get(reverse('event-similar', kwargs={'pk': 99999}))
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(reverse('event-similar', kwargs={'pk': self.jazz.pk}))
+        self.assertEqual(response.data, [])
+
+    @override_settings(EVENT_SIMILAR_INDEX_ON_CREATE=True)
+    def test_new_events_are_queued(self):
+        """Test that creating an event queues it for indexing"""
+        build_similar_events()
+        with self.captureOnCommitCallbacks(execute=True):
+            tango = self.create_event("Jazz Tango", "Jazz and tango", self.music, self.hall)
+        self.assertEqual(Task.objects.filter(name='eventlist.tasks.index_similar_events').count(), 1)
+
+        run_pending()
+
+        self.assertIn(self.neighbours(tango)[0], [self.jazz.pk, self.jazz_brunch.pk])
+
+    def test_build_command(self):
+        """Test the build_similar_events management command"""
+        out = StringIO()
+        call_command('build_similar_events', '--top-k', '2', stdout=out)
+        self.assertIn("Updated neighbours of 4 events", out.getvalue())
+
+        call_command('build_similar_events', stdout=out)
+        self.assertIn("Updated neighbours of 0 events", out.getvalue())
+        self.assertEqual(SimilarEvent.objects.filter(event=self.jazz).count(), 1)
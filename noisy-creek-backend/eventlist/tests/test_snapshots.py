@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import sqlite3
+from eventlist import snapshots
+from eventlist.models import Event, Task, Venue
+from eventlist.snapshots import current_snapshot, publish_snapshot, snapshot_paths
+from eventlist.tasks import publish_read_snapshot
+
+
+class ReadSnapshotTest(TransactionTestCase):
+    # Data must be committed for the snapshot to copy it
+    databases = {'default', 'snapshot'}
+
+    def setUp(self):
+        """Set up an event and a temporary snapshot directory"""
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('event-list')
+        self.venue = Venue.objects.create(name="Test Venue")
+        self.event = self.create_event("Concert")
+
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings = override_settings(
+            EVENT_READ_SNAPSHOTS=True, EVENT_SNAPSHOT_DIR=self.directory, EVENT_SNAPSHOT_KEEP=2
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(connections['snapshot'].close)
+
+    def create_event(self, title):
+        start = timezone.now() + timedelta(days=1)
+        return Event.objects.create(
+            title=title, start_date=start, end_date=start + timedelta(hours=2), venue=self.venue
+        )
+
+    def titles(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [event['title'] for event in response.data['results']]
+
+    def test_snapshot_holds_only_read_tables(self):
+        """Test that a generation has the event tables, their rows and indexes"""
+        path = publish_snapshot()
+
+        self.assertEqual(current_snapshot(), path)
+        target = sqlite3.connect(path)
+        tables = {name for (name,) in target.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertIn('eventlist_event', tables)
+        self.assertIn('eventlist_venue', tables)
+        self.assertNotIn('eventlist_task', tables)
+        self.assertNotIn('eventlist_change', tables)
+        self.assertEqual(target.execute('SELECT title FROM eventlist_event').fetchall(), [("Concert",)])
+        indexes = target.execute("SELECT count(*) FROM sqlite_master WHERE type = 'index'").fetchone()[0]
+        self.assertGreater(indexes, 0)
+        target.close()
+
+    def test_reads_use_snapshot_until_next_publish(self):
+        """Test that event reads see the current generation, not newer writes"""
+        self.assertEqual(self.titles(), ["Concert"])  # No snapshot yet: main database
+
+        publish_snapshot()
+        self.create_event("Lecture")
+        self.assertEqual(self.titles(), ["Concert"])
+
+        publish_snapshot()
+        self.assertEqual(sorted(self.titles()), ["Concert", "Lecture"])
+
+    def test_writes_go_to_main_database(self):
+        """Test that objects read from the snapshot save to the main database"""
+        publish_snapshot()
+        token = snapshots._request_snapshot.set(current_snapshot())
+        try:
+            event = Event.objects.get(pk=self.event.pk)
+            self.assertEqual(event._state.db, 'snapshot')
+            event.title = "Renamed"
+            event.save()
+        finally:
+            snapshots._request_snapshot.reset(token)
+
+        self.assertEqual(Event.objects.get(pk=self.event.pk).title, "Renamed")
+
+    def test_old_generations_are_pruned(self):
+        """Test that only the newest EVENT_SNAPSHOT_KEEP generations remain"""
+        published = [publish_snapshot() for _ in range(3)]
+
+        self.assertEqual(snapshot_paths(), published[1:])
+        self.assertEqual(list(self.directory.glob('.*.tmp')), [])
+
+    def test_writes_queue_one_delayed_publish(self):
+        """Test that a burst of writes queues a single publish task"""
+        Task.objects.all().delete()
+        for title in ("A", "B", "C"):
+            self.create_event(title)
+
+        tasks = Task.objects.filter(name=publish_read_snapshot.task_name)
+        self.assertEqual(tasks.count(), 1)
+        self.assertGreater(tasks.get().run_after, timezone.now())
@@ -0,0 +1,157 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from unittest import mock
+from eventlist.models import Category, Change, Event, Venue
+from eventlist.stream import BroadcastHub, hub, stream_events
+
+
+def parse(frame):
+    """(event, data) of an SSE frame"""
+    fields = dict(line.split(': ', 1) for line in frame.decode().strip().split('\n'))
+    return fields.get('event'), json.loads(fields['data']) if 'data' in fields else None
+
+
+@override_settings(EVENT_STREAM_POLL_INTERVAL=0, EVENT_STREAM_HEARTBEAT=0.2)
+class EventStreamTest(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.music = Category.objects.create(name="Music")
+        self.art = Category.objects.create(name="Art & Culture")
+        self.venue = Venue.objects.create(name="Test Venue")
+
+    def create_event(self, title, category):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Event.objects.create(
+                title=title,
+                start_date=timezone.now() + timedelta(days=1),
+                end_date=timezone.now() + timedelta(days=1, hours=2),
+                category=category,
+                venue=self.venue
+            )
+
+    async def next_frames(self, stream, count):
+        return [await asyncio.wait_for(anext(stream), 2) for _ in range(count)]
+
+    async def collect(self, stream):
+        return [frame async for frame in stream]
+
+    async def test_writes_are_pushed_to_subscribers(self):
+        """Test that a committed write reaches an open stream"""
+        stream = stream_events()
+        self.assertEqual(await anext(stream), b'retry: 5000\n\n')
+
+        event = await sync_to_async(self.create_event)("Concert", self.music)
+        frame, = await self.next_frames(stream, 1)
+        await stream.aclose()
+
+        self.assertTrue(frame.startswith(b'id: '))
+        self.assertEqual(parse(frame), ('change', {
+            'seq': int(frame.split(b'\n')[0][4:]),
+            'model': 'event',
+            'id': event.pk,
+            'action': 'create',
+            'category_id': self.music.pk,
+        }))
+        self.assertEqual(hub.subscriber_count, 0)
+
+    async def test_category_filter(self):
+        """Test that a filtered stream only gets events in its categories"""
+        stream = stream_events(category_ids=frozenset([self.art.pk]))
+        await anext(stream)
+
+        await sync_to_async(self.create_event)("Concert", self.music)
+        gallery = await sync_to_async(self.create_event)("Gallery Opening", self.art)
+        frame, = await self.next_frames(stream, 1)
+        await stream.aclose()
+
+        self.assertEqual(parse(frame)[1]['id'], gallery.pk)
+
+    async def test_heartbeat_on_idle_stream(self):
+        """Test that idle connections get heartbeat comments"""
+        stream = stream_events()
+        await anext(stream)
+
+        frame, = await self.next_frames(stream, 1)
+        await stream.aclose()
+
+        self.assertEqual(frame, b': heartbeat\n\n')
+
+    async def test_resume_from_last_event_id(self):
+        """Test that a reconnecting client gets the changes it missed"""
+        first = await sync_to_async(self.create_event)("Concert", self.music)
+        last_seen = await Change.objects.filter(model='event', object_id=first.pk).values_list('seq', flat=True).afirst()
+        second = await sync_to_async(self.create_event)("Gallery Opening", self.art)
+
+        stream = stream_events(last_event_id=last_seen)
+        retry, frame = await self.next_frames(stream, 2)
+        await stream.aclose()
+
+        self.assertEqual(parse(frame)[1]['id'], second.pk)
+
+    @override_settings(EVENT_STREAM_REPLAY_LIMIT=1)
+    async def test_resume_too_far_back_resets(self):
+        """Test that a client too far behind is told to refetch"""
+        await sync_to_async(self.create_event)("Concert", self.music)
+
+        stream = stream_events(last_event_id=0)
+        retry, frame = await self.next_frames(stream, 2)
+        await stream.aclose()
+
+        latest = await Change.objects.order_by('-seq').values_list('seq', flat=True).afirst()
+        self.assertEqual(parse(frame), ('reset', {'seq': latest}))
+
+    @override_settings(EVENT_STREAM_QUEUE_SIZE=1)
+    async def test_slow_client_is_disconnected(self):
+        """Test that a subscriber whose queue overflows is closed after draining it"""
+        stream = stream_events()
+        await anext(stream)
+
+        await sync_to_async(self.create_event)("Concert", self.music)
+        await sync_to_async(self.create_event)("Gallery Opening", self.art)
+        frames = await asyncio.wait_for(self.collect(stream), 2)
+
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(hub.subscriber_count, 0)
+
+    @override_settings(EVENT_STREAM_POLL_INTERVAL=1)
+    async def test_poller_backs_off_while_database_fails(self):
+        """Test that a failing database is retried with growing pauses and
+        logged once"""
+        delays = []
+
+        async def sleep(delay):
+            delays.append(delay)
+            if len(delays) == 7:
+                raise asyncio.CancelledError
+
+        with mock.patch('eventlist.stream.latest_seq', side_effect=DatabaseError('database is locked')), \
+                mock.patch('eventlist.stream.asyncio.sleep', sleep), \
+                self.assertLogs('eventlist.stream') as logs:
+            with self.assertRaises(asyncio.CancelledError):
+                await BroadcastHub()._poll()
+
+        self.assertEqual(delays, [2, 4, 8, 16, 32, 60, 60])
+        self.assertEqual(len(logs.records), 1)
+
+    async def test_stream_endpoint(self):
+        """Test that the endpoint serves an event stream filtered by category name"""
+        response = await self.async_client.get(reverse('event-stream'), {'category': 'music'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 5000\n\n')
+
+        await sync_to_async(self.create_event)("Gallery Opening", self.art)
+        concert = await sync_to_async(self.create_event)("Concert", self.music)
+        frame = await asyncio.wait_for(anext(stream), 2)
+        await stream.aclose()
+
+        self.assertEqual(parse(frame)[1]['id'], concert.pk)
@@ -0,0 +1,152 @@
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from eventlist.models import Event, Task, Venue
+from eventlist.taskqueue import enqueue, run_pending, task
+
+calls = []
+
+
+@task(name='tests.record', batch=True)
+def record(payloads):
+    calls.append(sorted(payload['n'] for payload in payloads))
+
+
+@task(name='tests.single')
+def single(n):
+    calls.append(n)
+
+
+@task(name='tests.broken', max_attempts=3)
+def broken():
+    raise RuntimeError("boom")
+
+
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_identical_pending_tasks_are_deduplicated(self):
+        """Test that an identical pending task is only queued once"""
+        self.assertIsNotNone(enqueue('tests.single', {'n': 1}))
+        self.assertIsNone(enqueue('tests.single', {'n': 1}))
+        self.assertIsNotNone(enqueue('tests.single', {'n': 2}))
+
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_batch_tasks_run_in_one_call(self):
+        """Test that pending tasks of a batch task are claimed and run together"""
+        for n in range(5):
+            record.enqueue({'n': n})
+
+        ran = run_pending()
+
+        self.assertEqual(ran, 5)
+        self.assertEqual(calls, [[0, 1, 2, 3, 4]])
+        self.assertFalse(Task.objects.exists())
+
+    def test_plain_tasks_run_one_at_a_time(self):
+        """Test that tasks without batch=True get their payload as kwargs"""
+        single.enqueue({'n': 1})
+        single.enqueue({'n': 2})
+
+        run_pending()
+
+        self.assertEqual(calls, [1, 2])
+
+    def test_delayed_task_waits(self):
+        """Test that a task isn't run before its delay has passed"""
+        single.enqueue({'n': 1}, delay=60)
+
+        self.assertEqual(run_pending(), 0)
+        self.assertEqual(calls, [])
+
+    def test_failed_task_is_retried_with_backoff(self):
+        """Test that a failing task is rescheduled with the error recorded"""
+        broken.enqueue()
+
+        with self.assertLogs('eventlist.taskqueue', 'ERROR'):
+            run_pending()
+
+        failed = Task.objects.get()
+        self.assertEqual(failed.status, Task.PENDING)
+        self.assertEqual(failed.attempts, 1)
+        self.assertGreater(failed.run_after, timezone.now())
+        self.assertIn("boom", failed.last_error)
+
+    @override_settings(EVENT_TASK_RETRY_DELAY=0)
+    def test_task_fails_after_max_attempts(self):
+        """Test that a task is kept as failed once it is out of attempts"""
+        broken.enqueue()
+
+        with self.assertLogs('eventlist.taskqueue', 'ERROR') as logs:
+            run_pending()
+
+        self.assertEqual(len(logs.records), 3)
+        failed = Task.objects.get()
+        self.assertEqual(failed.status, Task.FAILED)
+        self.assertEqual(failed.attempts, 3)
+        # A failed task doesn't block queueing the same work again
+        self.assertIsNotNone(broken.enqueue())
+
+    def test_task_of_dead_worker_is_reclaimed(self):
+        """Test that a running task is picked up again once its lease expires"""
+        single.enqueue({'n': 1})
+        Task.objects.update(status=Task.RUNNING, locked_at=timezone.now())
+        self.assertEqual(run_pending(), 0)
+
+        Task.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, [1])
+
+    def test_run_worker_once(self):
+        """Test that run_worker --once drains the queue and exits"""
+        record.enqueue({'n': 1})
+        out = StringIO()
+
+        call_command('run_worker', '--once', stdout=out)
+
+        self.assertIn("Ran 1 tasks", out.getvalue())
+        self.assertEqual(calls, [[1]])
+
+
+class CacheRewarmTaskTest(TestCase):
+    def setUp(self):
+        self.venue = Venue.objects.create(name="Test Venue")
+
+    def create_event(self, title):
+        return Event.objects.create(
+            title=title,
+            start_date=timezone.now() + timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=1, hours=2),
+            venue=self.venue
+        )
+
+    def test_writes_do_not_queue_by_default(self):
+        """Test that nothing is queued unless re-warming is enabled"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_event("Concert")
+
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(EVENT_CACHE_REWARM_ON_WRITE=True)
+    def test_burst_of_saves_rewarms_once(self):
+        """Test that many saves collapse into a single cache re-warm"""
+        with self.captureOnCommitCallbacks(execute=True):
+            events = [self.create_event(f"Concert {i}") for i in range(3)]
+            for event in events:
+                event.save()
+
+        self.assertEqual(Task.objects.count(), 3)
+
+        with mock.patch('eventlist.tasks.warm', return_value=(0, 0)) as warm:
+            run_pending()
+
+        warm.assert_called_once()
+        manifest = warm.call_args.args[0]
+        for event in events:
+            self.assertIn(event.pk, manifest['details'])
+        self.assertFalse(Task.objects.exists())
@@ -3,5 +3,12 @@ from . import views
 
 urlpatterns = [
     path('events/', views.EventListAPIView.as_view(), name='event-list'),
+    path('events/stream/', views.event_stream, name='event-stream'),
+    path('events/multi/', views.EventMultiListAPIView.as_view(), name='event-multi'),
+    path('events/bulk/', views.EventBulkAPIView.as_view(), name='event-bulk'),
+    path('events/calendar/', views.EventCalendarAPIView.as_view(), name='event-calendar'),
     path('events/<int:pk>/', views.EventDetailAPIView.as_view(), name='event-detail'),
+    path('events/<int:pk>/similar/', views.SimilarEventListAPIView.as_view(), name='event-similar'),
+    path('events/<int:pk>/posts/', views.EventPostListAPIView.as_view(), name='event-post-list'),
+    path('changes/', views.ChangeFeedAPIView.as_view(), name='change-feed'),
 ]
\ No newline at end of file
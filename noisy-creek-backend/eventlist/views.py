@@ -1,21 +1,338 @@
+import copy
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db import connection, connections
+from django.http import Http404, QueryDict, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
 from django.utils import timezone
-from rest_framework import generics
-from rest_framework.pagination import PageNumberPagination
+from rest_framework import generics, permissions
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from dateutil import parser
-from .models import Event
-from .serializers import EventSerializer
+from .archive import MergedQuerySet, reaches_archive
+from .bulk import apply_event_operations
+from .cache import get_or_compute, request_key
+from .calendar import (
+    current_month,
+    day_buckets,
+    merge_buckets,
+    month_bounds,
+    month_days,
+    month_generation_key,
+    parse_timezone,
+)
+from .changes import changes_since
+from .counts import estimate_event_count
+from .stream import stream_events
+from .models import ArchivedEvent, Category, Event, EventPost, SimilarEvent, Venue
+from .paginators import ApproximateCountPaginator
+from .renderers import MESSAGEPACK_PARSERS, MESSAGEPACK_RENDERERS
+from .serializers import (
+    CalendarEventSerializer,
+    CategorySerializer,
+    EventPostSerializer,
+    EventSerializer,
+    NormalizedEventSerializer,
+    SimilarEventSerializer,
+    VenueSerializer,
+    exposed_fields,
+    parse_fieldset,
+)
 
 class EventPagination(PageNumberPagination):
+    """Page numbers with an estimated ``count`` for large results
+
+    Results past ``COUNT_LIMIT`` rows get the view's ``estimate_count()``
+    instead of a full count, flagged by ``count_estimated``. ``?count=exact``
+    asks for an exact count.
+    """
     page_size = 9
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class EventListAPIView(generics.ListAPIView):
+    def paginate_queryset(self, queryset, request, view=None):
+        count = request.query_params.get('count')
+        if count and count.lower() == 'exact':
+            self.django_paginator_class = Paginator
+        else:
+            self.django_paginator_class = partial(
+                ApproximateCountPaginator, estimate=getattr(view, 'estimate_count', None)
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_estimated': getattr(self.page.paginator, 'estimated', False),
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class EventPostPagination(CursorPagination):
+    page_size = 20
+    ordering = '-created_at'
+
+
+def annotate_post_stats(queryset):
+    """Add ``post_count`` and ``latest_post_*`` via correlated subqueries
+
+    Keeps the stats inside the list query rather than one lookup per event.
+    """
+    posts = EventPost.objects.filter(event=OuterRef('pk'))
+    latest = posts.order_by('-created_at')
+    post_count = posts.order_by().values('event').annotate(count=Count('pk')).values('count')
+    return queryset.annotate(
+        post_count=Coalesce(Subquery(post_count), 0),
+        latest_post_id=Subquery(latest.values('pk')[:1]),
+        latest_post_content=Subquery(latest.values('content')[:1]),
+        latest_post_created_at=Subquery(latest.values('created_at')[:1]),
+    )
+
+
+def fieldset_columns(fieldset, model, serializer_class):
+    """Map a parsed fieldset to ``.only()`` columns and ``select_related`` names"""
+    exposed = exposed_fields(serializer_class)
+    columns, relations = [], []
+    for name, nested_names in fieldset.items():
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue  # Computed field, nothing to load
+        columns.append(field.name)
+        if not field.is_relation or name != field.name:
+            continue  # Plain column, or a foreign key requested by attname
+
+        relations.append(field.name)
+        related_meta = field.related_model._meta
+        for nested_name in nested_names or exposed[name]:
+            try:
+                related_meta.get_field(nested_name)
+            except FieldDoesNotExist:
+                continue
+            columns.append(f'{field.name}__{nested_name}')
+    return columns, relations
+
+
+class EventFormatMixin:
+    """Content negotiation for event endpoints
+
+    Adds MessagePack (``Accept: application/msgpack``) when msgpack is
+    installed. Responses vary on ``Accept`` so HTTP caches keep the JSON and
+    MessagePack variants apart.
+    """
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + MESSAGEPACK_RENDERERS
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES + MESSAGEPACK_PARSERS
+
+    def uses_native_datetimes(self):
+        return getattr(self.request.accepted_renderer, 'native_datetimes', False)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['native_datetimes'] = self.uses_native_datetimes()
+        return context
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+
+class FieldsetQueryMixin:
+    """Support ``?fields=id,title,venue.name`` on event endpoints
+
+    Only whitelisted serializer fields can be requested. The same fieldset
+    trims the serialized output (see ``serializers.SparseFieldsetMixin``) and
+    the SQL column list.
+    """
+
+    def get_fieldset(self):
+        if not hasattr(self, '_fieldset'):
+            fields = self.request.query_params.get('fields')
+            self._fieldset = (
+                parse_fieldset(fields, self.get_serializer_class()) if fields else None
+            )
+        return self._fieldset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_fieldset()
+        return context
+
+    def get_required_columns(self):
+        """Columns loaded whatever the fieldset asks for"""
+        return []
+
+    def apply_fieldset(self, queryset):
+        fieldset = self.get_fieldset()
+        if not fieldset:
+            return queryset
+        columns, relations = fieldset_columns(
+            fieldset, queryset.model, self.get_serializer_class()
+        )
+        columns += self.get_required_columns()
+        return queryset.select_related(None).select_related(*relations).only(*columns)
+
+
+class PostStatsMixin:
+    """Support ``?include_posts=true`` on views serializing ``EventSerializer``
+
+    Its post stats (``optional_fields``) are only annotated and serialized
+    when included or named in the ``?fields=`` of ``FieldsetQueryMixin``.
+    """
+
+    def get_include(self):
+        """Optional serializer fields requested with ``?include_posts=true``"""
+        include_posts = self.request.query_params.get('include_posts')
+        if include_posts and include_posts.lower() == 'true':
+            return set(getattr(self.get_serializer_class(), 'optional_fields', ()))
+        return set()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include'] = self.get_include()
+        return context
+
+    def apply_post_stats(self, queryset):
+        optional = set(getattr(self.get_serializer_class(), 'optional_fields', ()))
+        if optional & (self.get_include() | set(self.get_fieldset() or ())):
+            return annotate_post_stats(queryset)
+        return queryset
+
+
+def sideload_related(events):
+    """Serialize the distinct venues and categories of ``events`` once each"""
+    venue_ids = {event.venue_id for event in events}
+    category_ids = {event.category_id for event in events} - {None}
+    venues = Venue.objects.filter(pk__in=venue_ids) if venue_ids else []
+    categories = Category.objects.filter(pk__in=category_ids) if category_ids else []
+    return {
+        'venues': {str(venue['id']): venue for venue in VenueSerializer(venues, many=True).data},
+        'categories': {
+            str(category['id']): category
+            for category in CategorySerializer(categories, many=True).data
+        },
+    }
+
+
+class EventListAPIView(EventFormatMixin, FieldsetQueryMixin, PostStatsMixin, generics.ListAPIView):
     serializer_class = EventSerializer
     pagination_class = EventPagination
 
+    def is_normalized(self):
+        normalize = self.request.query_params.get('normalize')
+        return bool(normalize) and normalize.lower() == 'true'
+
+    def get_serializer_class(self):
+        if self.is_normalized():
+            return NormalizedEventSerializer
+        return super().get_serializer_class()
+
+    def get_required_columns(self):
+        if self.is_normalized():
+            # sideload_related() reads both foreign keys of every event
+            return ['venue', 'category']
+        return []
+
+    def list(self, request, *args, **kwargs):
+        # Datetimes are strings or datetime objects depending on the renderer
+        key = request_key('list', request, self.uses_native_datetimes())
+        return Response(get_or_compute(key, self.get_page_data))
+
+    def get_page_data(self):
+        """With ``?normalize=true`` events carry ``venue_id``/``category_id`` and the
+        page has a single ``included`` map of the venues and categories it uses"""
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        serializer = self.get_serializer(page, many=True)
+        data = self.get_paginated_response(serializer.data).data
+        if self.is_normalized():
+            data['included'] = sideload_related(page)
+        return data
+
     def get_queryset(self):
-        queryset = Event.objects.select_related('category', 'venue').order_by("-start_date")
+        queryset = self.filter_events(Event.objects.select_related('category', 'venue'))
+
+        # Past events live in the archive table; only read it when asked for
+        archive_range = self.get_archive_range()
+        if archive_range is not None and reaches_archive(*archive_range):
+            archived = self.filter_events(ArchivedEvent.objects.select_related('category', 'venue'))
+            return MergedQuerySet(queryset, archived)
+        return queryset
+
+    def get_date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return parser.parse(value).date()
+        except (ValueError, TypeError, OverflowError):
+            return None
+
+    def is_upcoming(self):
+        upcoming = self.request.query_params.get('upcoming')
+        return bool(upcoming) and upcoming.lower() == 'true'
+
+    def get_weekdays(self):
+        """ISO weekdays from ``?weekend=true`` and ``?weekday=sat,sun`` (names
+        or 1-7), or None when neither narrows the list"""
+        weekdays = None
+        weekend = self.request.query_params.get('weekend')
+        if weekend and weekend.lower() == 'true':
+            weekdays = {6, 7}
+        requested = set()
+        for value in self.request.query_params.get('weekday', '').split(','):
+            value = value.strip().lower()
+            if value.isdigit() and 1 <= int(value) <= 7:
+                requested.add(int(value))
+            elif value[:3] in WEEKDAY_NAMES:
+                requested.add(WEEKDAY_NAMES[value[:3]])
+        if requested:
+            weekdays = requested if weekdays is None else weekdays & requested
+        return weekdays
+
+    def get_archive_range(self):
+        """``(start, end)`` of the requested dates, None for an open end, if
+        the list could include archived events"""
+        if self.is_upcoming():
+            return None
+        start = self.get_date_param('on') or self.get_date_param('start_date')
+        if start is not None:
+            return start, None
+        # Only an end date in the past: everything before it, archive included
+        end = self.get_date_param('end_date')
+        if end is not None and end < timezone.localdate():
+            return None, end
+        return None
+
+    def estimate_count(self):
+        """Estimate of the filtered count from ``EventDayCount``, see ``counts.py``"""
+        if self.get_date_param('on') or self.get_weekdays() is not None:
+            return None  # Day counts are by UTC day and don't know weekdays
+        start = self.get_date_param('start_date')
+        if self.is_upcoming():
+            today = timezone.localdate()
+            start = max(start, today) if start else today
+        return estimate_event_count(
+            self.request.query_params.get('category'), start, self.get_date_param('end_date')
+        )
+
+    def filter_events(self, queryset):
+        # The pk breaks ties so pages of events starting together don't overlap
+        queryset = queryset.order_by("-start_date", "-pk")
         
         try:
             # Filter by category (sanitize input)
@@ -46,13 +363,319 @@ class EventListAPIView(generics.ListAPIView):
             if upcoming and upcoming.lower() == 'true':
                 queryset = queryset.filter(start_date__gte=timezone.now())
 
+            # Local day filters read the indexed local date columns
+            on = self.get_date_param('on')
+            if on:
+                queryset = queryset.filter(local_date=on)
+            weekdays = self.get_weekdays()
+            if weekdays is not None:
+                queryset = queryset.filter(local_weekday__in=sorted(weekdays))
+
         except Exception:
             # If any error occurs during filtering, return base queryset
             pass
-        print(queryset)
 
-        return queryset
+        if self.is_normalized():
+            # Related rows are sideloaded once per page instead of joined per row
+            queryset = queryset.select_related(None)
+
+        return self.apply_fieldset(self.apply_post_stats(queryset))
+
+WEEKDAY_NAMES = {name: number for number, name in enumerate(
+    ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun'], start=1
+)}
+QUERY_NAME_RE = re.compile(r'^[A-Za-z][\w-]*$')
+
+_query_pool = None
+_query_pool_lock = threading.Lock()
+
+
+def parse_named_queries(query_params):
+    """``{name: QueryDict}`` from ``<name>.<param>`` query params; params
+    without a name go into every query, under the named ones"""
+    shared = QueryDict(mutable=True)
+    named = {}
+    for key, values in query_params.lists():
+        name, dot, param = key.partition('.')
+        if not dot:
+            shared.setlist(key, values)
+        elif QUERY_NAME_RE.match(name) and param:
+            named.setdefault(name, {})[param] = values
+
+    queries = {}
+    for name, params in named.items():
+        query = shared.copy()
+        for param, values in params.items():
+            query.setlist(param, values)
+        queries[name] = query
+    return queries
+
+
+def can_query_concurrently():
+    """Other threads get their own connections, which can't see this one's
+    uncommitted writes or its in-memory database"""
+    if connection.in_atomic_block:
+        return False
+    return not (connection.vendor == 'sqlite' and connection.is_in_memory_db())
 
-class EventDetailAPIView(generics.RetrieveAPIView):
-    queryset = Event.objects.select_related('category', 'venue')
+
+def query_pool():
+    global _query_pool
+    with _query_pool_lock:
+        if _query_pool is None:
+            _query_pool = ThreadPoolExecutor(
+                settings.EVENT_MULTI_QUERY_WORKERS, thread_name_prefix='event-multi'
+            )
+        return _query_pool
+
+
+def run_in_pool(func):
+    """Call ``func`` on a pool thread, in the caller's context (so the read
+    snapshot carries over), closing the thread's connections afterwards"""
+    def run():
+        try:
+            return func()
+        finally:
+            connections.close_all()
+    return query_pool().submit(copy_context().run, run)
+
+
+class EventMultiListAPIView(EventFormatMixin, generics.GenericAPIView):
+    """Several event lists in one request, e.g. the sections of a page
+
+    ``?<name>.<param>=<value>`` passes ``param`` to the list called ``name``,
+    and params without a name go to every list::
+
+        /api/events/multi/?upcoming.upcoming=true&music.category=Music&page_size=6
+
+    The response maps each name to what ``/api/events/`` returns for its
+    params, read from the same cache entries, or to an ``error`` with the
+    status and detail of a list that failed. Lists run concurrently, up to
+    ``EVENT_MULTI_QUERY_WORKERS`` at once, where the database allows it.
+    """
+    max_queries = 10
+    list_view = staticmethod(EventListAPIView.as_view())
+
+    def get(self, request, *args, **kwargs):
+        queries = parse_named_queries(request.query_params)
+        if len(queries) > self.max_queries:
+            raise ValidationError(f'At most {self.max_queries} named queries per request')
+
+        jobs = {name: partial(self.run_query, query) for name, query in queries.items()}
+        if len(jobs) > 1 and settings.EVENT_MULTI_QUERY_WORKERS > 1 and can_query_concurrently():
+            futures = {name: run_in_pool(job) for name, job in jobs.items()}
+            results = {name: future.result() for name, future in futures.items()}
+        else:
+            results = {name: job() for name, job in jobs.items()}
+        return Response(results)
+
+    def run_query(self, query):
+        """Data of ``/api/events/?<query>``, as the list view returns it"""
+        sub_request = copy.copy(self.request._request)
+        sub_request.GET = query
+        sub_request.path = sub_request.path_info = reverse('event-list')
+        # Pagination links and the cache key read the query string from here
+        sub_request.META = {**sub_request.META, 'QUERY_STRING': query.urlencode()}
+        response = self.list_view(sub_request)
+        if response.status_code == 200:
+            return response.data
+        detail = response.data.get('detail') if isinstance(response.data, dict) else response.data
+        return {'error': {'status': response.status_code, 'detail': detail}}
+
+
+class EventBulkAPIView(EventFormatMixin, generics.GenericAPIView):
+    """Create, update and delete many events in one request
+
+    The body holds up to ``EVENT_BULK_MAX_OPERATIONS`` items in all::
+
+        {"create": [{"title": ..., "start_date": ..., "end_date": ..., "venue": 1}],
+         "update": [{"id": 5, "title": "New title"}],
+         "delete": [7, 8]}
+
+    Each list is applied in chunks of ``EVENT_BULK_CHUNK_SIZE``, one
+    transaction per chunk, see ``bulk.apply_event_operations``. The response
+    has a result per item under the same keys, and ``counts`` by status.
+    Needs the add, change or delete event permission for each list sent.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    actions = {'create': 'add', 'update': 'change', 'delete': 'delete'}
+
+    def post(self, request, *args, **kwargs):
+        operations = request.data
+        if not isinstance(operations, dict) or not set(operations) <= set(self.actions):
+            raise ValidationError(f"Expected an object with {', '.join(self.actions)} lists")
+        if not all(isinstance(items, list) for items in operations.values()):
+            raise ValidationError(f"{', '.join(self.actions)} must be lists")
+        total = sum(map(len, operations.values()))
+        if total > settings.EVENT_BULK_MAX_OPERATIONS:
+            raise ValidationError(f'At most {settings.EVENT_BULK_MAX_OPERATIONS} operations per request')
+
+        opts = Event._meta
+        needed = [f'{opts.app_label}.{self.actions[action]}_{opts.model_name}' for action in operations]
+        if not request.user.has_perms(needed):
+            raise PermissionDenied()
+
+        results = apply_event_operations(**operations, chunk_size=settings.EVENT_BULK_CHUNK_SIZE)
+        counts = Counter(result['status'] for items in results.values() for result in items)
+        return Response({**results, 'counts': dict(counts)})
+
+
+class EventDetailAPIView(EventFormatMixin, FieldsetQueryMixin, PostStatsMixin, generics.RetrieveAPIView):
     serializer_class = EventSerializer
+
+    def get_queryset(self):
+        queryset = Event.objects.select_related('category', 'venue')
+        return self.apply_fieldset(self.apply_post_stats(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        key = request_key('detail', request, kwargs['pk'], self.uses_native_datetimes())
+        return Response(get_or_compute(key, lambda: self.get_serializer(self.get_object()).data))
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            # Fall back to the archive for events that have been moved there
+            archived = ArchivedEvent.objects.select_related('category', 'venue')
+            archived = self.apply_fieldset(self.apply_post_stats(archived))
+            return get_object_or_404(archived, pk=self.kwargs['pk'])
+
+
+class SimilarEventListAPIView(EventFormatMixin, generics.ListAPIView):
+    """Events most like this one, best first, from the precomputed index
+
+    Read in one query; empty until ``build_similar_events`` has run.
+    """
+    serializer_class = SimilarEventSerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        return SimilarEvent.objects.filter(event_id=self.kwargs['pk']).select_related(
+            'similar__category', 'similar__venue'
+        ).order_by('rank')
+
+    def list(self, request, *args, **kwargs):
+        links = list(self.get_queryset())
+        if not links:
+            get_object_or_404(Event.objects.only('pk'), pk=self.kwargs['pk'])
+        return Response(self.get_serializer(links, many=True).data)
+
+
+class EventCalendarAPIView(EventFormatMixin, generics.GenericAPIView):
+    """Events of one month by local day, for a calendar grid
+
+    ``?year=&month=`` pick the month (default: the current one) and ``?tz=``
+    the IANA time zone days are bucketed in (default ``TIME_ZONE``). Every
+    day lists its event ``count`` and the first ``?per_day=`` events
+    (default 3, max 10), with times in that zone. ``?category=`` filters as
+    on the list endpoint. Events are placed on the day they start.
+    """
+    serializer_class = CalendarEventSerializer
+    default_per_day = 3
+    max_per_day = 10
+
+    def get_int_param(self, name, default, lowest, highest):
+        try:
+            value = int(self.request.query_params.get(name, default))
+        except (ValueError, TypeError):
+            return default  # Invalid value, ignore it
+        return value if lowest <= value <= highest else default
+
+    def get(self, request, *args, **kwargs):
+        tz = parse_timezone(request.query_params.get('tz') or '') or timezone.get_default_timezone()
+        year, month = current_month(tz)
+        year = self.get_int_param('year', year, 1, 9998)
+        month = self.get_int_param('month', month, 1, 12)
+        per_day = self.get_int_param('per_day', self.default_per_day, 1, self.max_per_day)
+
+        key = request_key('calendar', request, tz.key, year, month, self.uses_native_datetimes())
+        data = get_or_compute(
+            key,
+            lambda: self.get_month_data(year, month, tz, per_day),
+            generation_key=month_generation_key(year, month),
+        )
+        return Response(data)
+
+    def get_month_data(self, year, month, tz, per_day):
+        start, end = month_bounds(year, month, tz)
+        buckets = day_buckets(self.filter_events(Event.objects.all()), start, end, tz, per_day)
+        if reaches_archive(start):
+            archived = day_buckets(self.filter_events(ArchivedEvent.objects.all()), start, end, tz, per_day)
+            buckets = merge_buckets(buckets, archived, per_day)
+
+        days = []
+        with timezone.override(tz):
+            for day in month_days(year, month, tz):
+                count, events = buckets.get(day, (0, []))
+                days.append({
+                    'date': day.isoformat(),
+                    'count': count,
+                    'events': self.get_serializer(events, many=True).data,
+                })
+        return {'year': year, 'month': month, 'tz': tz.key, 'days': days}
+
+    def filter_events(self, queryset):
+        category = self.request.query_params.get('category')
+        if category:
+            queryset = queryset.filter(category__name__iexact=category)
+        return queryset.only('title', 'start_date', 'end_date', 'category', 'venue')
+
+
+class EventPostListAPIView(EventFormatMixin, generics.ListAPIView):
+    """Feed of posts for one event, newest first, cursor paginated"""
+    serializer_class = EventPostSerializer
+    pagination_class = EventPostPagination
+
+    def get_queryset(self):
+        event = get_object_or_404(Event.objects.only('pk'), pk=self.kwargs['pk'])
+        return EventPost.objects.filter(event=event)
+
+
+class ChangeFeedAPIView(EventFormatMixin, generics.GenericAPIView):
+    """Changes to events, venues and categories after ``?since=<seq>``
+
+    ``?limit=`` caps the page (default 100, max 1000). Pass the response's
+    ``next_since`` as ``since`` on the next request; keep going while
+    ``has_more`` is true.
+    """
+    default_limit = 100
+    max_limit = 1000
+
+    def get_int_param(self, name, default):
+        try:
+            return max(int(self.request.query_params.get(name, default)), 0)
+        except (ValueError, TypeError):
+            return default  # Invalid value, ignore it
+
+    def get(self, request, *args, **kwargs):
+        since = self.get_int_param('since', 0)
+        limit = min(self.get_int_param('limit', self.default_limit) or self.default_limit, self.max_limit)
+        return Response(changes_since(since, limit, self.get_serializer_context()))
+
+
+async def event_stream(request):
+    """Server-Sent Events stream of changes, see ``stream.py``
+
+    ``?category=`` limits it to events in that category. Reconnecting
+    clients resume after ``Last-Event-ID`` (or ``?last_event_id=``).
+    """
+    category_ids = None
+    category = request.GET.get('category')
+    if category:
+        category_ids = frozenset([
+            pk async for pk in Category.objects.filter(name__iexact=category).values_list('pk', flat=True)
+        ])
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None  # Invalid id, stream from now on
+
+    response = StreamingHttpResponse(
+        stream_events(category_ids, last_event_id), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Don't let nginx buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,105 @@
+"""Precompute hot event API responses into the response cache
+
+Requests are built with ``RequestFactory`` and handed straight to the views,
+so warming runs the same ORM queries and serializers as real traffic without
+an HTTP round trip.
+"""
+import json
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+from django.conf import settings
+from django.db import connection
+from django.test import RequestFactory
+from django.utils import timezone
+
+from .models import Category, Event
+
+LIST_PATH = '/api/events/'
+DETAIL_PATH = re.compile(r'^/api/events/(?P<pk>\d+)/$')
+# Matches runserver, gunicorn and nginx style access log lines
+LOG_REQUEST = re.compile(r'"GET (?P<url>/api/events/[^ "]*) HTTP')
+
+
+def default_manifest(detail_count=50):
+    """First page of every category and of upcoming events, plus the next
+    ``detail_count`` upcoming events"""
+    lists = [{}, {'upcoming': 'true'}]
+    lists += [{'category': name} for name in Category.objects.values_list('name', flat=True)]
+    details = Event.objects.filter(start_date__gte=timezone.now()).order_by('start_date')
+    return {
+        'lists': lists,
+        'details': list(details.values_list('pk', flat=True)[:detail_count]),
+    }
+
+
+def load_manifest(path):
+    with open(path) as manifest_file:
+        manifest = json.load(manifest_file)
+    return {
+        'lists': manifest.get('lists', []),
+        'details': manifest.get('details', []),
+    }
+
+
+def manifest_from_log(lines, top=50):
+    """Manifest of the ``top`` most requested event URLs in an access log"""
+    counts = Counter()
+    for line in lines:
+        match = LOG_REQUEST.search(line)
+        if match:
+            url = urlsplit(match.group('url'))
+            counts[(url.path, tuple(sorted(parse_qsl(url.query))))] += 1
+
+    manifest = {'lists': [], 'details': []}
+    for (path, params), _ in counts.most_common(top):
+        detail = DETAIL_PATH.match(path)
+        if path == LIST_PATH:
+            manifest['lists'].append(dict(params))
+        elif detail:
+            manifest['details'].append(int(detail.group('pk')))
+    return manifest
+
+
+def warm(manifest, base_url=None, workers=4):
+    """Populate the cache for every entry in ``manifest``
+
+    Returns ``(warmed, failed)`` counts. With ``workers > 1`` entries are
+    computed in a bounded thread pool, each thread on its own connection.
+    """
+    # Imported here: views import the cache module this feeds
+    from .views import EventDetailAPIView, EventListAPIView
+
+    url = urlsplit(base_url or settings.EVENT_CACHE_WARM_BASE_URL)
+    factory = RequestFactory()
+    request_options = {'HTTP_HOST': url.netloc, 'secure': url.scheme == 'https'}
+    list_view = EventListAPIView.as_view()
+    detail_view = EventDetailAPIView.as_view()
+
+    jobs = [(list_view, LIST_PATH, params, {}) for params in manifest['lists']]
+    jobs += [
+        (detail_view, f'{LIST_PATH}{pk}/', {}, {'pk': int(pk)})
+        for pk in manifest['details']
+    ]
+
+    def run(job):
+        view, path, params, kwargs = job
+        response = view(factory.get(path, params, **request_options), **kwargs)
+        return response.status_code == 200
+
+    def run_in_pool(job):
+        try:
+            return run(job)
+        finally:
+            connection.close()
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_in_pool, jobs))
+    else:
+        results = [run(job) for job in jobs]
+
+    warmed = sum(results)
+    return warmed, len(results) - warmed
@@ -3,6 +3,11 @@ ASGI config for eventsite project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server so the live event stream (/api/events/stream/)
+holds connections without a thread each, e.g.:
+
+    uvicorn eventsite.asgi:application --port 8000
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,261 @@
+"""Pre-forking production server
+
+    python -m eventsite.serve --bind 0.0.0.0:8000 --workers 4
+
+The master process loads Django and the WSGI application before forking
+the workers. It also resolves the URLconf, which imports every view and
+serializer, and runs the hot pages through the app, which fills the
+response cache (see ``eventlist/warming.py``). So workers answer their
+first request at full speed instead of paying that cost, and they share
+the master's memory copy-on-write. The garbage collector is frozen before
+forking, so collections in the workers don't touch the shared objects and
+make copies of their pages.
+
+Each worker runs ``--threads`` threads, each accepting and answering one
+connection at a time from the shared socket; run about one worker per core.
+A connection that sends nothing for ``--timeout`` seconds is closed, but a
+client trickling bytes in still holds its thread, so the server must sit
+behind a reverse proxy that buffers whole requests and responses (e.g.
+nginx) and never face clients directly. A worker that dies is replaced. SIGTERM or SIGINT stops the master and its workers.
+``--no-preload`` leaves loading to each worker, as a baseline for
+``manage.py benchmark_startup``.
+
+Workers only see each other's cache invalidations through a shared cache
+backend, so more than one worker needs one (file, database, Memcached or
+Redis) rather than the local memory cache. The Server-Sent Events stream
+would hold a thread per client for good; it is refused here and must be
+served through ASGI (``uvicorn eventsite.asgi:application``), e.g. with
+nginx routing ``/api/events/stream/`` there.
+
+Needs ``os.fork`` (Linux, macOS).
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+
+# Workers that die sooner than this after starting are restarted with a pause
+MIN_WORKER_LIFETIME = 1
+# Warmed through the whole stack on top of eventlist.warming's manifest
+WARM_PATHS = ['/api/events/calendar/', '/api/changes/']
+# Long-lived responses that would tie up a worker thread per client
+ASGI_ONLY_PATHS = ['/api/events/stream/']
+
+
+def log(message):
+    print(f'[serve {os.getpid()}] {message}', file=sys.stderr, flush=True)
+
+
+def load_application():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eventsite.settings')
+    from django.core.wsgi import get_wsgi_application
+    return get_wsgi_application()
+
+
+def refuse_asgi_only_paths(application):
+    """Wrap ``application`` to answer 503 for ``ASGI_ONLY_PATHS``"""
+    def wrapper(environ, start_response):
+        if environ.get('PATH_INFO', '').startswith(tuple(ASGI_ONLY_PATHS)):
+            start_response('503 Service Unavailable', [('Content-Type', 'text/plain')])
+            return [b'This endpoint is served through ASGI, not the pre-fork server.\n']
+        return application(environ, start_response)
+    return wrapper
+
+
+def get(application, path, host):
+    """Status of ``GET path`` run through ``application`` in process"""
+    url = urlsplit(path)
+    environ = {'PATH_INFO': url.path, 'QUERY_STRING': url.query, 'HTTP_HOST': host}
+    setup_testing_defaults(environ)
+    statuses = []
+    body = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        b''.join(body)
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+    return statuses[0]
+
+
+def warm_up(application):
+    """Do in the master what each worker would otherwise do on first use"""
+    from django.conf import settings
+    from django.db import connections
+    from django.urls import get_resolver
+    from eventlist.models import Event
+    from eventlist.warming import default_manifest, warm
+
+    resolver = get_resolver()
+    resolver.reverse_dict  # Compiles every route and imports every view
+
+    warmed, failed = warm(default_manifest(), workers=1)
+    host = urlsplit(settings.EVENT_CACHE_WARM_BASE_URL).netloc
+    paths = list(WARM_PATHS)
+    first = Event.objects.order_by('pk').values_list('pk', flat=True).first()
+    if first is not None:
+        paths.append(f'/api/events/{first}/?include_posts=true')
+    for path in paths:
+        if get(application, path, host).startswith('200'):
+            warmed += 1
+        else:
+            failed += 1
+
+    # Workers open their own connections
+    connections.close_all()
+    return warmed, failed
+
+
+def serve_worker(listener, application, threads, timeout):
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+    class WorkerServer(WSGIServer):
+        """WSGI server on the listening socket shared by all workers, answering
+        one connection per request"""
+
+        def get_request(self):
+            # The listener is non-blocking so a worker that loses the race
+            # for a connection goes back to waiting; connections block, up to
+            # the timeout so an idle client can't hold the thread for good
+            request, address = super().get_request()
+            request.settimeout(timeout)
+            return request, address
+
+        def handle_error(self, request, client_address):
+            if isinstance(sys.exc_info()[1], TimeoutError):
+                log(f'Closed a connection from {client_address[0]} idle for {timeout}s')
+            else:
+                super().handle_error(request, client_address)
+
+    server = WorkerServer(listener.getsockname(), WSGIRequestHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = listener
+    host, port = listener.getsockname()[:2]
+    server.server_name, server.server_port = socket.getfqdn(host), port
+    server.setup_environ()
+    server.set_app(refuse_asgi_only_paths(application))
+    # Every thread blocks in accept on the same socket, so a connection
+    # only goes to a thread that is free to answer it
+    for _ in range(threads - 1):
+        threading.Thread(target=accept_loop, args=(server,), daemon=True).start()
+    accept_loop(server)
+
+
+def accept_loop(server):
+    while True:
+        server.handle_request()
+
+
+class Master:
+    def __init__(self, listener, count, threads, timeout, application=None):
+        self.listener = listener
+        self.count = count
+        self.threads = threads
+        self.timeout = timeout
+        self.application = application
+        self.workers = {}  # pid -> start time
+
+    def spawn(self):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return
+        status = 1
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            # Ctrl-C reaches the whole process group; the master handles it
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            gc.enable()
+            application = self.application or load_application()
+            serve_worker(self.listener, application, self.threads, self.timeout)
+            status = 0
+        finally:
+            os._exit(status)
+
+    def run(self):
+        def stop(signum, frame):
+            raise KeyboardInterrupt
+        signal.signal(signal.SIGTERM, stop)
+
+        for _ in range(self.count):
+            self.spawn()
+        try:
+            while True:
+                pid, status = os.wait()
+                started = self.workers.pop(pid, None)
+                if started is None:
+                    continue
+                log(f'Worker {pid} exited with status {status}; starting a new one')
+                if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                    time.sleep(MIN_WORKER_LIFETIME)
+                self.spawn()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+            for pid in self.workers:
+                os.kill(pid, signal.SIGTERM)
+            for pid in self.workers:
+                os.waitpid(pid, 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pre-forking server for the event site')
+    parser.add_argument('--bind', default='127.0.0.1:8000', help='host:port to listen on')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--threads', type=int, default=4, help='Requests each worker answers at once')
+    parser.add_argument(
+        '--timeout', type=float, default=30,
+        help='Seconds a connection may go without sending or accepting data before it is closed'
+    )
+    parser.add_argument(
+        '--allow-local-cache', action='store_true',
+        help='Start several workers on the local memory cache anyway (for benchmarks: '
+             'workers then serve pages another worker has invalidated)'
+    )
+    parser.add_argument(
+        '--no-preload', dest='preload', action='store_false',
+        help='Load the application in each worker instead of the master'
+    )
+    options = parser.parse_args(argv)
+    if not hasattr(os, 'fork'):
+        parser.error('needs os.fork(); use a WSGI server such as waitress on this platform')
+    host, _, port = options.bind.rpartition(':')
+
+    started = time.monotonic()
+    # Objects made while loading become shared; collecting them now would
+    # only dirty pages the workers could have shared
+    gc.disable()
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eventsite.settings')
+    from eventlist.cache import is_shared_cache
+    if options.workers > 1 and not options.allow_local_cache and not is_shared_cache():
+        parser.error('several workers need a shared cache backend (file, database, Memcached '
+                     'or Redis in CACHES); with the local memory cache, run --workers 1')
+
+    application = None
+    if options.preload:
+        from django.conf import settings
+        if settings.EVENT_TASK_WORKER_THREADS:
+            parser.error('EVENT_TASK_WORKER_THREADS threads would only run in the master; '
+                         'run manage.py run_worker alongside instead')
+        application = load_application()
+        warmed, failed = warm_up(application)
+        gc.collect()
+        gc.freeze()
+        log(f'Preloaded and warmed {warmed} pages ({failed} failed) in {time.monotonic() - started:.2f}s')
+
+    # Bound after warming, so the port only accepts once workers can answer
+    listener = socket.create_server((host or '0.0.0.0', int(port)), backlog=128)
+    listener.setblocking(False)
+    log(f'Listening on {options.bind} with {options.workers} workers of {options.threads} threads')
+    Master(listener, options.workers, options.threads, options.timeout, application).run()
+
+
+if __name__ == '__main__':
+    main()
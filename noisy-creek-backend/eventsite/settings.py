@@ -49,6 +49,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'eventlist.profiling.ProfilerMiddleware',
+    'eventlist.snapshots.SnapshotMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -64,9 +66,126 @@ CORS_ALLOW_CREDENTIALS = True
 # DRF settings
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10
+    'PAGE_SIZE': 10,
+    # orjson-backed when installed, stdlib json otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'eventlist.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'eventlist.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Event API response cache. Entries are invalidated by data generation (see
+# eventlist/cache.py); the timeout only bounds how long unused entries linger.
+# Cache misses are coalesced within a process; use a shared backend (Redis,
+# Memcached) to also coalesce them across worker processes.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+EVENT_CACHE_TIMEOUT = 300
+
+# How long an expired or outdated entry may still be served while a single
+# worker recomputes it
+EVENT_CACHE_STALE_TTL = 30
+
+# Upper bound on waiting for another worker's computation of the same entry
+EVENT_CACHE_LOCK_TIMEOUT = 10
+
+# Pages precomputed by `manage.py warm_event_cache`. A JSON file with "lists"
+# (query param dicts for /api/events/) and "details" (event ids); when unset,
+# the first page of each category and of upcoming events is warmed.
+EVENT_CACHE_WARM_MANIFEST = None
+
+# Base URL the warmed pages are cached under; must match what clients use,
+# since pagination links embed it
+EVENT_CACHE_WARM_BASE_URL = 'http://localhost:8000'
+
+# Events that started more than this many days ago are moved to the archive
+# table by `manage.py archive_events`
+EVENT_ARCHIVE_RETENTION_DAYS = 90
+
+# Background task queue (eventlist/taskqueue.py). Tasks are run by
+# `manage.py run_worker`, or by this many threads inside each web process.
+EVENT_TASK_WORKER_THREADS = 0
+
+# Tasks of one batch task claimed and run together
+EVENT_TASK_BATCH_SIZE = 100
+
+# First retry delay in seconds; doubles with each further attempt
+EVENT_TASK_RETRY_DELAY = 10
+
+# Seconds before a running task whose worker died is picked up again
+EVENT_TASK_LEASE = 300
+
+# Queue a background re-warm of the response cache after each write. Only
+# enable this where a worker runs, or the queue just grows.
+EVENT_CACHE_REWARM_ON_WRITE = False
+
+# Live change stream (/api/events/stream/, served under ASGI). Seconds between
+# heartbeat comments on idle connections
+EVENT_STREAM_HEARTBEAT = 15
+
+# Messages buffered per connection; slower clients are disconnected and
+# resume from Last-Event-ID
+EVENT_STREAM_QUEUE_SIZE = 64
+
+# Seconds between change feed reads that pick up writes made by other
+# processes; 0 only streams writes made in the serving process
+EVENT_STREAM_POLL_INTERVAL = 2
+
+# Most missed changes replayed on resume; beyond this the client gets a
+# "reset" event and should refetch
+EVENT_STREAM_REPLAY_LIMIT = 500
+
+# Reject events that overlap another event at the same venue, unless the
+# venue's capacity covers the expected attendance of both
+EVENT_PREVENT_DOUBLE_BOOKING = False
+
+# Queue new events for the similar-events index (needs numpy and a worker);
+# otherwise run `manage.py build_similar_events` on a schedule
+EVENT_SIMILAR_INDEX_ON_CREATE = False
+
+# Queue a background recount of the days an event write touched, which keeps
+# estimated list counts current (needs a worker); otherwise run
+# `manage.py refresh_event_counts` on a schedule
+EVENT_COUNT_REFRESH_ON_WRITE = False
+
+# On-demand request profiles (see eventlist/profiling.py): where they are
+# written (None for a directory under the system temp dir), how many of the
+# newest are kept, and how long a `request_profiles --token` stays valid
+EVENT_PROFILE_DIR = None
+EVENT_PROFILE_KEEP = 50
+EVENT_PROFILE_TOKEN_MAX_AGE = 60 * 60
+
+# Serve event reads from a read-only snapshot of the event tables, published
+# EVENT_SNAPSHOT_DELAY seconds after a burst of writes (needs a worker, or run
+# `manage.py publish_read_snapshot` after imports); reads lag writes until
+# then. EVENT_SNAPSHOT_KEEP generations are kept for in-flight readers.
+EVENT_READ_SNAPSHOTS = False
+EVENT_SNAPSHOT_DIR = BASE_DIR / 'snapshots'
+EVENT_SNAPSHOT_DELAY = 5
+EVENT_SNAPSHOT_KEEP = 3
+
+# Threads /api/events/multi/ runs its lists on (1 runs them one by one)
+EVENT_MULTI_QUERY_WORKERS = 4
+
+# Time zone of the region the venues are in. Events store the day and weekday
+# they start on there, for the ?on=, ?weekend= and ?weekday= list filters.
+# After changing it, run `manage.py refresh_local_dates`.
+EVENT_LOCAL_TIME_ZONE = 'America/Los_Angeles'
+
+# POST /api/events/bulk/: items accepted per request, and items written per
+# transaction (a failed chunk rolls back alone)
+EVENT_BULK_MAX_OPERATIONS = 1000
+EVENT_BULK_CHUNK_SIZE = 200
+
 ROOT_URLCONF = 'eventsite.urls'
 
 TEMPLATES = [
@@ -94,9 +213,19 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Read-only snapshot of the event tables; pointed at the current
+    # generation per request when EVENT_READ_SNAPSHOTS is set
+    'snapshot': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {'init_command': 'PRAGMA mmap_size=268435456'},
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
+DATABASE_ROUTERS = ['eventlist.snapshots.SnapshotRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators